@@ -61,6 +61,96 @@ def parse_args() -> argparse.Namespace:
         help="List of paths to include directories.",
     )
 
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        help="Path to a directory for caching parsed C++ declarations between runs.",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-parse header collections whose included files have changed, "
+        "and only re-list source directories that have changed.",
+    )
+
+    parser.add_argument(
+        "--castxml_pch",
+        type=str,
+        nargs="*",
+        help="List of third-party headers to precompile for castxml e.g. '<vector>'.",
+    )
+
+    parser.add_argument(
+        "--pch_compiler",
+        type=str,
+        help="Path to the clang compiler matching castxml, used to build the precompiled header.",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of CastXML processes to run in parallel.",
+    )
+
+    parser.add_argument(
+        "--shards",
+        type=int,
+        help="Number of header collections to parse in parallel. Defaults to one per module.",
+    )
+
+    parser.add_argument(
+        "--stream_xml",
+        action="store_true",
+        help="Drop out-of-tree declarations from the castxml output before reading it.",
+    )
+
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Reuse the source declarations from the previous run if the inputs are unchanged.",
+    )
+
+    parser.add_argument(
+        "--low_memory",
+        action="store_true",
+        help="Release declarations that are not referenced from the source tree after parsing.",
+    )
+
+    parser.add_argument(
+        "--template_instantiation",
+        choices=["explicit", "implicit"],
+        help="Instantiate all template class members, or only the class definitions.",
+    )
+
+    parser.add_argument(
+        "--parser",
+        choices=["castxml", "libclang"],
+        default="castxml",
+        help="Parse the source code with castxml, or in-process with libclang.",
+    )
+
+    parser.add_argument(
+        "--template_signatures",
+        choices=["text", "libclang"],
+        default="text",
+        help="Read class template signatures from the source text, or from declarations parsed with libclang.",
+    )
+
+    parser.add_argument(
+        "--compile_commands",
+        type=str,
+        help="Path to a compile_commands.json file to take include paths, definitions and the C++ standard from.",
+    )
+
+    parser.add_argument(
+        "--reachable_headers",
+        action="store_true",
+        help="Only collect headers included by the translation units in the compile_commands.json file.",
+    )
+
     parser.add_argument(
         "-q",
         "--quiet",
@@ -101,6 +191,20 @@ def generate(args: argparse.Namespace) -> None:
         package_info_path=args.package_info,
         castxml_binary=args.castxml_binary,
         castxml_cflags=castxml_cflags,
+        cache_dir=args.cache_dir,
+        incremental=args.incremental,
+        castxml_pch=args.castxml_pch,
+        pch_compiler=args.pch_compiler,
+        jobs=args.jobs,
+        shards=args.shards,
+        stream_xml=args.stream_xml,
+        snapshot=args.snapshot,
+        low_memory=args.low_memory,
+        template_instantiation=args.template_instantiation,
+        parser_backend=args.parser,
+        compile_commands=args.compile_commands,
+        reachable_headers=args.reachable_headers,
+        template_signatures=args.template_signatures,
     )
 
     generator.generate_wrapper()
@@ -1,28 +1,50 @@
 """Contains the main interface for generating Python wrappers."""
 
-import fnmatch
 import logging
 import os
 import re
+import shlex
+import shutil
 import subprocess
 import uuid
-from pathlib import Path
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import pygccxml.utils
 from pygccxml import __version__ as pygccxml_version
+from pygccxml.declarations import declaration_t
 
 from cppwg.input.class_info import CppClassInfo
 from cppwg.input.free_function_info import CppFreeFunctionInfo
 from cppwg.input.info_helper import CppInfoHelper
+from cppwg.input.module_info import ModuleInfo
 from cppwg.input.package_info import PackageInfo
+from cppwg.parsers.compile_commands import CppCompileCommands
+from cppwg.parsers.declaration_index import CppDeclarationIndex
+from cppwg.parsers.header_manifest import CppHeaderManifest
+from cppwg.parsers.header_scanner import CppHeaderScanner
+from cppwg.parsers.libclang_parser import CppLibclangParser, cindex
 from cppwg.parsers.package_info_parser import PackageInfoParser
-from cppwg.parsers.source_parser import CppSourceParser
+from cppwg.parsers.pch_builder import CppPchBuilder
+from cppwg.parsers.snapshot import CppDeclarationSnapshot
+from cppwg.parsers.source_parser import (
+    CppSourceParser,
+    merge_source_namespaces,
+    parse_in_worker,
+    prune_declarations,
+)
+from cppwg.parsers.template_index import CppTemplateIndex
+from cppwg.parsers.template_probe import CppTemplateProbe
 from cppwg.templates import pybind11_default as wrapper_templates
+from cppwg.utils import utils
 from cppwg.utils.constants import (
     CPPWG_DEFAULT_WRAPPER_DIR,
     CPPWG_EXT,
     CPPWG_HEADER_COLLECTION_FILENAME,
+    CPPWG_HEADER_COLLECTION_NAMESPACE,
+    CPPWG_HEADER_COLLECTION_SHARD_FILENAME,
+    CPPWG_INCREMENTAL_DIRNAME,
+    CPPWG_TEMPLATE_PROBE_FILENAME,
 )
 from cppwg.writers.header_collection_writer import CppHeaderCollectionWriter
 from cppwg.writers.module_writer import CppModuleWrapperWriter
@@ -44,12 +66,63 @@ class CppWrapperGenerator:
         The path to the castxml binary
     castxml_cflags : str
         Optional cflags to be passed to castxml e.g. "-std=c++17"
+    castxml_version : str
+        The version string reported by the castxml binary
     package_info_path : str
         The path to the package info yaml config file; defaults to "package_info.yaml"
+    cache_dir : str, optional
+        Directory for caching parsed declarations between runs; disabled if None
+    incremental : bool
+        Reuse declarations from the previous run for header collections whose
+        included files are unchanged, and the listings of unchanged source
+        directories
+    castxml_pch : List[str], optional
+        Third-party headers to precompile for CastXML; overrides the package info
+    pch_compiler : str, optional
+        The clang compiler used to build the precompiled header; must match
+        the clang that castxml is built against
+    jobs : int
+        The number of CastXML processes to run in parallel
+    shards : int, optional
+        The number of header collections to split the modules into for parallel
+        parsing; defaults to one per module
+    stream_xml : bool
+        Stream the CastXML output, dropping out-of-tree declarations before
+        pygccxml builds them
+    snapshot : bool
+        Save the source declarations to a snapshot in the wrapper root, and
+        load them from it instead of parsing if the inputs are unchanged
+    low_memory : bool
+        Release declarations that are not referenced from the source tree
+        once they have been filtered
+    template_instantiation : str, optional
+        How template classes are instantiated in the header collection; either
+        "explicit" or "implicit". Overrides the package info
+    parser_backend : str
+        The parser for the header collections; either "castxml" or "libclang"
+    compile_commands : CppCompileCommands, optional
+        The compiler options read from a compile_commands.json file, which are
+        added to the source includes and castxml cflags
+    reachable_headers : bool
+        Only collect the source headers included by the translation units in
+        the compilation database, instead of walking the source root
+    template_signatures : str
+        How class template signatures are read from the source files; either
+        "text" to scan the source text or "libclang" to parse the declarations
+    libclang_parsers : Dict[str, CppLibclangParser]
+        The libclang parsers for each header collection, kept so that their
+        translation units are reparsed if the wrappers are generated again
     source_ns : pygccxml.declarations.namespace_t
         The namespace containing C++ declarations parsed from the source tree
+    decl_index : CppDeclarationIndex
+        Name-keyed index of the classes and free functions in source_ns
     package_info : PackageInfo
         A data structure containing the information parsed from package_info_path
+    header_scanners : Dict[str, CppHeaderScanner]
+        The scanned source headers, keyed by path
+    wrapped_hpp_files : List[str], optional
+        The source headers that may declare classes or free functions for
+        modules that use all classes or free functions; None for all headers
     """
 
     def __init__(
@@ -60,6 +133,20 @@ class CppWrapperGenerator:
         castxml_binary: Optional[str] = None,
         package_info_path: Optional[str] = None,
         castxml_cflags: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        incremental: bool = False,
+        castxml_pch: Optional[List[str]] = None,
+        pch_compiler: Optional[str] = None,
+        jobs: int = 1,
+        shards: Optional[int] = None,
+        stream_xml: bool = False,
+        snapshot: bool = False,
+        low_memory: bool = False,
+        template_instantiation: Optional[str] = None,
+        parser_backend: str = "castxml",
+        compile_commands: Optional[str] = None,
+        reachable_headers: bool = False,
+        template_signatures: str = "text",
     ):
         logger = logging.getLogger()
 
@@ -86,17 +173,47 @@ class CppWrapperGenerator:
                 raise FileNotFoundError()
 
         # Check castxml and pygccxml versions
-        castxml_version: str = (
+        self.castxml_version: str = (
             subprocess.check_output([self.castxml_binary, "--version"])
             .decode("ascii")
             .strip()
         )
-        castxml_version = re.search(
-            r"castxml version \d+\.\d+\.\d+", castxml_version
+        self.castxml_version = re.search(
+            r"castxml version \d+\.\d+\.\d+", self.castxml_version
         ).group(0)
-        logger.info(castxml_version)
+        logger.info(self.castxml_version)
         logger.info(f"pygccxml version {pygccxml_version}")
 
+        # Check the parser backend
+        self.parser_backend: str = parser_backend
+
+        if self.parser_backend == "libclang":
+            if cindex is None:
+                logger.error("Could not import libclang - install cppwg[libclang].")
+                raise ImportError()
+
+            # Key cached declarations on the libclang version too
+            libclang_version = CppLibclangParser.libclang_version()
+            self.castxml_version += f", {libclang_version}"
+            logger.info(libclang_version)
+
+        elif self.parser_backend != "castxml":
+            logger.error(f"Unknown parser backend: {self.parser_backend}")
+            raise ValueError()
+
+        self.libclang_parsers: Dict[str, CppLibclangParser] = {}
+
+        self.template_signatures: str = template_signatures
+
+        if self.template_signatures == "libclang":
+            if cindex is None:
+                logger.error("Could not import libclang - install cppwg[libclang].")
+                raise ImportError()
+
+        elif self.template_signatures != "text":
+            logger.error(f"Unknown template signature source: {template_signatures}")
+            raise ValueError()
+
         # Sanitize castxml_cflags
         self.castxml_cflags: str = ""
         if castxml_cflags:
@@ -140,6 +257,36 @@ class CppWrapperGenerator:
         else:
             self.source_includes = [self.source_root]
 
+        # Sanitize compile_commands; the build's include paths, definitions and
+        # C++ standard are added to the ones given
+        self.compile_commands: Optional[CppCompileCommands] = None
+        if compile_commands:
+            if not os.path.isfile(compile_commands):
+                logger.error(f"Could not find compilation database: {compile_commands}")
+                raise FileNotFoundError()
+
+            self.compile_commands = CppCompileCommands(
+                os.path.abspath(compile_commands), self.source_root
+            )
+            self.compile_commands.parse()
+
+            for include_path in self.compile_commands.include_paths:
+                if include_path not in self.source_includes:
+                    self.source_includes.append(include_path)
+
+            cflags = [f"-D{define}" for define in self.compile_commands.defines]
+            if self.compile_commands.std and "-std=" not in self.castxml_cflags:
+                cflags.append(f"-std={self.compile_commands.std}")
+
+            self.castxml_cflags = " ".join(
+                [self.castxml_cflags] + [shlex.quote(cflag) for cflag in cflags]
+            ).strip()
+
+        self.reachable_headers: bool = reachable_headers
+        if self.reachable_headers and not self.compile_commands:
+            logger.error("Reachable headers require a compilation database.")
+            raise ValueError()
+
         # Sanitize package_info_path
         self.package_info_path: Optional[str] = None
         if package_info_path:
@@ -159,48 +306,336 @@ class CppWrapperGenerator:
             else:
                 logger.warning("No package info file found - using default settings.")
 
+        # Sanitize cache_dir; incremental runs keep their parse state in the
+        # wrapper root if no other cache directory is given
+        self.incremental: bool = incremental
+
+        self.cache_dir: Optional[str] = None
+        if cache_dir:
+            self.cache_dir = os.path.abspath(cache_dir)
+        elif self.incremental:
+            self.cache_dir = os.path.join(self.wrapper_root, CPPWG_INCREMENTAL_DIRNAME)
+
+        # Sanitize castxml_pch and pch_compiler
+        self.castxml_pch: Optional[List[str]] = castxml_pch
+
+        self.pch_compiler: Optional[str] = pch_compiler
+        if not self.pch_compiler:
+            self.pch_compiler = shutil.which("clang++")
+
+        # Sanitize jobs and shards
+        self.jobs: int = max(1, jobs)
+
+        self.shards: Optional[int] = None
+        if shards and shards > 0:
+            self.shards = shards
+
+        self.stream_xml: bool = stream_xml
+        self.snapshot: bool = snapshot
+        self.low_memory: bool = low_memory
+        self.template_instantiation: Optional[str] = template_instantiation
+
         # Initialize remaining attributes
         self.source_ns: Optional[pygccxml.declarations.namespace_t] = None
+        self.decl_index: Optional[CppDeclarationIndex] = None
 
         self.package_info: Optional[PackageInfo] = None
 
+        self.header_scanners: Dict[str, CppHeaderScanner] = {}
+        self.wrapped_hpp_files: Optional[List[str]] = None
+
         self.header_collection_filepath: str = os.path.join(
             self.wrapper_root, CPPWG_HEADER_COLLECTION_FILENAME
         )
 
+        # Header collections parsed separately, one per shard of modules
+        self.shard_header_collection_filepaths: List[str] = []
+
     def collect_source_hpp_files(self) -> None:
         """
         Collect *.hpp files from the source root.
 
         Walk through the source root and add any files matching the provided
-        patterns e.g. "*.hpp". Skip the wrapper root and wrappers to
-        avoid pollution.
+        patterns e.g. "*.hpp". Skip the wrapper root, hidden directories and
+        directories matching the source_hpp_excludes globs, and wrappers to
+        avoid pollution. With incremental parsing, directories unchanged since
+        the previous run are not listed again. If only reachable headers are
+        wanted, the headers included by the compilation database's translation
+        units are used instead of walking the tree.
         """
-        for root, _, filenames in os.walk(self.source_root, followlinks=True):
-            for pattern in self.package_info.source_hpp_patterns:
-                for filename in fnmatch.filter(filenames, pattern):
-                    filepath = os.path.abspath(os.path.join(root, filename))
+        patterns = self.package_info.source_hpp_patterns
+        excludes = self.package_info.source_hpp_excludes
+        prune_paths = [self.wrapper_root]
 
-                    # Skip files in wrapper root dir
-                    if Path(self.wrapper_root) in Path(filepath).parents:
-                        continue
+        if self.reachable_headers:
+            filepaths = self.find_reachable_hpp_files(patterns, excludes, prune_paths)
+        elif self.incremental:
+            filepaths = self.find_hpp_files_incrementally(
+                patterns, excludes, prune_paths
+            )
+        else:
+            filepaths = utils.find_source_files(
+                self.source_root, patterns, excludes, prune_paths
+            )
 
-                    # Skip files with the extensions like .cppwg.hpp
-                    suffix = os.path.splitext(os.path.splitext(filename)[0])[1]
-                    if suffix == CPPWG_EXT:
-                        continue
+        for filepath in filepaths:
+            # Skip files with the extensions like .cppwg.hpp
+            filename = os.path.basename(filepath)
+            suffix = os.path.splitext(os.path.splitext(filename)[0])[1]
+            if suffix == CPPWG_EXT:
+                continue
 
-                    self.package_info.source_hpp_files.append(filepath)
+            self.package_info.source_hpp_files.append(filepath)
 
         # Check if any source files were found
         if not self.package_info.source_hpp_files:
             logging.error(f"No header files found in source root: {self.source_root}")
             raise FileNotFoundError()
 
+    def find_hpp_files_incrementally(
+        self, patterns: List[str], excludes: List[str], prune_paths: List[str]
+    ) -> List[str]:
+        """
+        Find the source headers, reusing unchanged directory listings.
+
+        The listings of directories unchanged since the previous run are read
+        from the header manifest in the wrapper root, which is updated if any
+        listing changed.
+
+        Parameters
+        ----------
+        patterns : List[str]
+            Glob patterns for the header file names e.g. ["*.hpp"]
+        excludes : List[str]
+            Glob patterns for directories to skip, matched against the directory
+            name and its path relative to the source root
+        prune_paths : List[str]
+            Directories to skip e.g. the wrapper root
+
+        Returns
+        -------
+        List[str]
+            The sorted paths of the headers matching the patterns
+        """
+        logger = logging.getLogger()
+
+        manifest = CppHeaderManifest(self.wrapper_root)
+        manifest_key = CppHeaderManifest.key(
+            self.source_root, patterns, excludes, prune_paths
+        )
+        previous_listings = manifest.load(manifest_key)
+        listings = dict(previous_listings)
+
+        filepaths = utils.find_source_files(
+            self.source_root, patterns, excludes, prune_paths, listings=listings
+        )
+
+        num_reused = sum(
+            1
+            for dir_path, listing in listings.items()
+            if previous_listings.get(dir_path) is listing
+        )
+        if num_reused:
+            logger.info(
+                f"Reused {num_reused} of {len(listings)} directory listings "
+                "from the header manifest."
+            )
+
+        if num_reused < len(listings) or len(listings) < len(previous_listings):
+            manifest.store(manifest_key, listings)
+
+        return filepaths
+
+    def find_reachable_hpp_files(
+        self, patterns: List[str], excludes: List[str], prune_paths: List[str]
+    ) -> List[str]:
+        """
+        Find the source headers included by the compilation database's sources.
+
+        Parameters
+        ----------
+        patterns : List[str]
+            Glob patterns for the header file names e.g. ["*.hpp"]
+        excludes : List[str]
+            Glob patterns for directories to skip, matched against the directory
+            name and its path relative to the source root
+        prune_paths : List[str]
+            Directories to skip e.g. the wrapper root
+
+        Returns
+        -------
+        List[str]
+            The sorted paths of the reachable headers matching the patterns
+        """
+        logger = logging.getLogger()
+
+        pattern_regex = utils.compile_globs(patterns)
+        exclude_regex = utils.compile_globs(excludes)
+        prune_prefixes = [os.path.join(path, "") for path in prune_paths]
+
+        filepaths: List[str] = []
+
+        for filepath in self.compile_commands.find_reachable_headers():
+            if not pattern_regex or not pattern_regex.match(os.path.basename(filepath)):
+                continue
+
+            if any(filepath.startswith(prefix) for prefix in prune_prefixes):
+                continue
+
+            # Apply the same directory filters as walking the source root
+            rel_dir = os.path.relpath(os.path.dirname(filepath), self.source_root)
+            dir_names = [] if rel_dir == "." else rel_dir.split(os.sep)
+
+            excluded = False
+            for idx, dir_name in enumerate(dir_names, 1):
+                rel_path = "/".join(dir_names[:idx])
+                if dir_name.startswith(".") or (
+                    exclude_regex
+                    and (exclude_regex.match(dir_name) or exclude_regex.match(rel_path))
+                ):
+                    excluded = True
+                    break
+
+            if not excluded:
+                filepaths.append(filepath)
+
+        logger.info(
+            f"Found {len(filepaths)} headers reachable from the compilation database."
+        )
+
+        return sorted(filepaths)
+
+    def get_header_scanner(self, hpp_file_path: str) -> CppHeaderScanner:
+        """
+        Get the scan of a source header, scanning it if needed.
+
+        Parameters
+        ----------
+        hpp_file_path : str
+            The path to the header
+
+        Returns
+        -------
+        CppHeaderScanner
+            The scanned header
+        """
+        if hpp_file_path not in self.header_scanners:
+            scanner = CppHeaderScanner(hpp_file_path)
+            scanner.scan()
+            self.header_scanners[hpp_file_path] = scanner
+
+        return self.header_scanners[hpp_file_path]
+
+    def select_source_hpp_files(self) -> None:
+        """
+        Select the headers that declare the classes and free functions to wrap.
+
+        The source headers are scanned for the classes and free functions they
+        declare. Listed classes that were not mapped to a header by name, and
+        listed free functions, are mapped to the first header declaring them.
+        Modules that use all classes or free functions only include the headers
+        that may declare some, so other headers are only parsed if a wrapped
+        header includes them.
+        """
+        module_info_collection = self.package_info.module_info_collection
+
+        use_all_classes = any(
+            module_info.use_all_classes for module_info in module_info_collection
+        )
+        use_all_free_functions = any(
+            module_info.use_all_free_functions for module_info in module_info_collection
+        )
+
+        unmapped_infos = []
+        for module_info in module_info_collection:
+            for class_info in module_info.class_info_collection:
+                if not (class_info.source_file or class_info.source_file_full_path):
+                    unmapped_infos.append(class_info)
+            for free_function_info in module_info.free_function_info_collection:
+                if not free_function_info.source_file_full_path:
+                    unmapped_infos.append(free_function_info)
+
+        if not (unmapped_infos or use_all_classes or use_all_free_functions):
+            return
+
+        class_hpp_files: Dict[str, str] = {}
+        free_function_hpp_files: Dict[str, str] = {}
+        wrapped_hpp_files: List[str] = []
+
+        for hpp_file_path in self.package_info.source_hpp_files:
+            scanner = self.get_header_scanner(hpp_file_path)
+
+            for class_name in scanner.class_names:
+                class_hpp_files.setdefault(class_name, hpp_file_path)
+            for free_function_name in scanner.free_function_names:
+                free_function_hpp_files.setdefault(free_function_name, hpp_file_path)
+
+            if (
+                scanner.has_macro_decls
+                or (use_all_classes and scanner.class_names)
+                or (use_all_free_functions and scanner.free_function_names)
+            ):
+                wrapped_hpp_files.append(hpp_file_path)
+
+        for feature_info in unmapped_infos:
+            if isinstance(feature_info, CppClassInfo):
+                hpp_file_path = class_hpp_files.get(feature_info.name)
+            else:
+                hpp_file_path = free_function_hpp_files.get(feature_info.name)
+
+            if hpp_file_path:
+                feature_info.source_file_full_path = hpp_file_path
+            else:
+                logging.getLogger().warning(
+                    f"Could not find a header declaring {feature_info.name}."
+                )
+
+        if use_all_classes or use_all_free_functions:
+            self.wrapped_hpp_files = wrapped_hpp_files
+            logging.getLogger().info(
+                f"Selected {len(wrapped_hpp_files)} of "
+                f"{len(self.package_info.source_hpp_files)} headers for the header collection."
+            )
+
     def extract_templates_from_source(self) -> None:
         """Extract template arguments for each class from the associated source file."""
+        class_infos = [
+            class_info
+            for module_info in self.package_info.module_info_collection
+            for class_info in module_info.class_info_collection
+            if class_info.source_file_full_path and not class_info.template_arg_lists
+        ]
+
+        template_index: CppTemplateIndex
+        if self.template_signatures == "libclang":
+            # Parse the class templates and substitution signatures together
+            substitution_signatures: List[str] = []
+            for class_info in class_infos:
+                for template_substitution in class_info.hierarchy_attribute_gather(
+                    "template_substitutions"
+                ):
+                    signature = template_substitution["signature"]
+                    if signature not in substitution_signatures:
+                        substitution_signatures.append(signature)
+
+            libclang_parser = self.get_libclang_parsers(
+                [self.header_collection_filepath]
+            )[0]
+            template_index = CppTemplateProbe(
+                os.path.join(self.wrapper_root, CPPWG_TEMPLATE_PROBE_FILENAME),
+                libclang_parser.get_parse_args(),
+                substitution_signatures,
+            )
+        else:
+            # Scan each source file once for template signatures, in parallel
+            template_index = CppTemplateIndex()
+
+        template_index.build(
+            [class_info.source_file_full_path for class_info in class_infos]
+        )
+
         for module_info in self.package_info.module_info_collection:
-            info_helper = CppInfoHelper(module_info)
+            info_helper = CppInfoHelper(module_info, template_index)
             for class_info in module_info.class_info_collection:
                 info_helper.extract_templates_from_source(class_info)
 
@@ -209,32 +644,434 @@ class CppWrapperGenerator:
         Map each class to a header file.
 
         Attempt to map source file paths to each class, assuming the containing
-        file name is the class name.
+        file name is the class name. If several headers have the class name,
+        those matching the class's source_file or under the module's source
+        locations are preferred, and any remaining ambiguity is reported
+        before taking the first header.
         """
+        logger = logging.getLogger()
+
+        # Index the headers by file name without the extension e.g. "Point"
+        hpp_file_index: Dict[str, List[str]] = {}
+        for hpp_file_path in self.package_info.source_hpp_files:
+            hpp_file_stem = os.path.splitext(os.path.basename(hpp_file_path))[0]
+            hpp_file_index.setdefault(hpp_file_stem, []).append(hpp_file_path)
+
         for module_info in self.package_info.module_info_collection:
+            location_paths = module_info.get_source_location_paths()
+            if location_paths is not None:
+                location_paths = set(location_paths)
+
             for class_info in module_info.class_info_collection:
-                for hpp_file_path in self.package_info.source_hpp_files:
-                    hpp_file_name = os.path.basename(hpp_file_path)
-                    if class_info.name == os.path.splitext(hpp_file_name)[0]:
-                        class_info.source_file_full_path = hpp_file_path
-                        if class_info.source_file is None:
-                            class_info.source_file = hpp_file_name
+                hpp_file_paths = hpp_file_index.get(class_info.name)
+                if not hpp_file_paths:
+                    continue
 
-    def parse_header_collection(self) -> None:
+                if len(hpp_file_paths) > 1 and class_info.source_file:
+                    # e.g. source_file: geometry/Point.hpp
+                    hpp_file_paths = [
+                        hpp_file_path
+                        for hpp_file_path in hpp_file_paths
+                        if hpp_file_path.endswith(os.sep + class_info.source_file)
+                    ] or hpp_file_paths
+
+                if len(hpp_file_paths) > 1 and location_paths is not None:
+                    hpp_file_paths = [
+                        hpp_file_path
+                        for hpp_file_path in hpp_file_paths
+                        if utils.find_path_prefix(hpp_file_path, location_paths)
+                    ] or hpp_file_paths
+
+                if len(hpp_file_paths) > 1:
+                    logger.warning(
+                        f"Found {len(hpp_file_paths)} headers for class "
+                        f"{class_info.name}: {', '.join(hpp_file_paths)}. "
+                        f"Using {hpp_file_paths[0]} - set source_file to choose another."
+                    )
+
+                class_info.source_file_full_path = hpp_file_paths[0]
+                if class_info.source_file is None:
+                    class_info.source_file = os.path.basename(hpp_file_paths[0])
+
+    def build_pch(self) -> Optional[str]:
         """
-        Parse the hpp files to collect C++ declarations.
+        Build a precompiled header of third-party headers for CastXML.
 
-        Parse the headers with pygccxml and castxml to populate the source
-        namespace with C++ declarations collected from the source tree.
+        Returns
+        -------
+        Optional[str]
+            The path to the precompiled header, or None if not used
         """
-        source_parser = CppSourceParser(
-            self.source_root,
-            self.header_collection_filepath,
+        pch_headers = self.castxml_pch
+        if pch_headers is None:
+            pch_headers = self.package_info.castxml_pch
+
+        if not pch_headers:
+            return None
+
+        if not self.pch_compiler:
+            logging.getLogger().warning(
+                "No clang compiler found for building the precompiled header."
+            )
+            return None
+
+        pch_builder = CppPchBuilder(
+            pch_headers,
+            self.pch_compiler,
             self.castxml_binary,
             self.source_includes,
             self.castxml_cflags,
+            self.wrapper_root,
+            self.cache_dir or self.wrapper_root,
         )
-        self.source_ns = source_parser.parse()
+        return pch_builder.build()
+
+    def get_castxml_start_namespaces(self) -> Optional[List[str]]:
+        """
+        Get the namespaces to restrict the CastXML output to.
+
+        Restricting CastXML to the project's namespaces keeps the standard
+        library and other third-party declarations out of its output. If the
+        namespaces are not specified in the package info, they are derived by
+        scanning the source headers; this is only possible if every source
+        header declares everything within named namespaces. A single namespace
+        may be given as a string instead of a list.
+
+        Returns
+        -------
+        Optional[List[str]]
+            The namespaces to start from, or None if the output is unrestricted
+        """
+        logger = logging.getLogger()
+
+        start_namespaces = self.package_info.castxml_start_namespaces
+
+        if utils.is_option_ALL(start_namespaces):
+            return None
+
+        # A single namespace may be given as a string e.g. `castxml_start: foo`
+        if isinstance(start_namespaces, str):
+            start_namespaces = [start_namespaces]
+
+        elif start_namespaces and not isinstance(start_namespaces, list):
+            logger.error(
+                "castxml_start_namespaces must be a namespace or a list of "
+                f"namespaces, not: {start_namespaces}"
+            )
+            raise ValueError()
+
+        if not start_namespaces:
+            start_namespaces = set()
+
+            for hpp_file_path in self.package_info.source_hpp_files:
+                scanner = self.get_header_scanner(hpp_file_path)
+
+                if scanner.has_global_decls:
+                    logger.info(
+                        f"Not restricting castxml output: {hpp_file_path} "
+                        "has declarations outside a named namespace."
+                    )
+                    return None
+
+                start_namespaces.update(scanner.top_level_namespaces)
+
+            if not start_namespaces:
+                return None
+
+        # Include the typedefs from the header collection
+        start_namespaces = sorted(set(start_namespaces))
+        start_namespaces.append(CPPWG_HEADER_COLLECTION_NAMESPACE)
+
+        logger.info(f"Restricting castxml output to: {', '.join(start_namespaces)}")
+
+        return start_namespaces
+
+    def parse_header_collection(self) -> None:
+        """
+        Parse the hpp files to collect C++ declarations.
+
+        Parse the headers with pygccxml and castxml to populate the source
+        namespace with C++ declarations collected from the source tree. If the
+        modules have been split into shards, the shard header collections are
+        parsed separately (in a process pool if jobs > 1) and the declarations
+        merged. With incremental parsing, only shards with changed headers are
+        re-parsed, and a cold build parses the whole header collection once to
+        seed the shards' cache entries. With a snapshot, unchanged inputs skip
+        parsing altogether. With the libclang backend, the headers are parsed
+        in-process instead, and a header collection is reparsed if the wrappers
+        are regenerated.
+        """
+        castxml_start = self.get_castxml_start_namespaces()
+
+        castxml_pch: Optional[str] = None
+        if self.parser_backend == "libclang":
+            if self.castxml_pch or self.package_info.castxml_pch:
+                logging.getLogger().warning("Ignoring castxml_pch with libclang.")
+        else:
+            castxml_pch = self.build_pch()
+
+        header_collection_filepaths = self.shard_header_collection_filepaths
+        if len(header_collection_filepaths) < 2:
+            header_collection_filepaths = [self.header_collection_filepath]
+
+        # Load the source declarations from the previous run if nothing changed
+        snapshot: Optional[CppDeclarationSnapshot] = None
+        if self.snapshot:
+            snapshot = CppDeclarationSnapshot(self.wrapper_root)
+            snapshot_key = snapshot.key(
+                header_collection_filepaths,
+                self.castxml_cflags,
+                self.source_includes,
+                self.castxml_version,
+                castxml_start,
+                self.stream_xml,
+                self.low_memory,
+                castxml_pch,
+            )
+            self.source_ns = snapshot.load(snapshot_key)
+            if self.source_ns is not None:
+                return
+
+        if self.parser_backend == "libclang":
+            source_parsers = self.get_libclang_parsers(header_collection_filepaths)
+        else:
+            source_parsers = self.get_castxml_parsers(
+                header_collection_filepaths, castxml_start, castxml_pch
+            )
+
+        # Every shard of a cold incremental build would re-read the same
+        # third-party headers, so parse the whole header collection once and
+        # seed the shards' cache entries from it instead
+        seed_parsers: List[CppSourceParser] = []
+        if (
+            self.incremental
+            and len(source_parsers) > 1
+            and all(source_parser.cache for source_parser in source_parsers)
+            and not any(
+                source_parser.cache.has_entry(source_parser.get_cache_key())
+                for source_parser in source_parsers
+            )
+        ):
+            logging.getLogger().info(
+                "No incremental parse state found - parsing the whole header collection."
+            )
+            seed_parsers = source_parsers
+
+            if self.parser_backend == "libclang":
+                whole_parser = self.get_libclang_parsers(
+                    [self.header_collection_filepath]
+                )[0]
+            else:
+                whole_parser = self.get_castxml_parsers(
+                    [self.header_collection_filepath], castxml_start, castxml_pch
+                )[0]
+
+            # The shards' cache entries take the place of the whole collection's
+            whole_parser.cache = None
+            whole_parser.track_dependencies = True
+            source_parsers = [whole_parser]
+
+        if len(source_parsers) == 1 or self.jobs == 1:
+            # Parse in this process, as there is nothing to parse in parallel
+            source_namespaces = [
+                source_parser.parse() for source_parser in source_parsers
+            ]
+
+        else:
+            # Parse each shard's header collection in a separate process
+            # and merge the resulting declarations into a single namespace
+            logging.getLogger().info(
+                f"Parsing {len(source_parsers)} header collections with {self.jobs} jobs."
+            )
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                results = list(executor.map(parse_in_worker, source_parsers))
+
+            source_namespaces = []
+            for source_parser, (source_ns, dependencies) in zip(
+                source_parsers, results
+            ):
+                source_namespaces.append(source_ns)
+                source_parser.dependencies = dependencies
+
+        if len(source_namespaces) == 1:
+            self.source_ns = source_namespaces[0]
+        else:
+            self.source_ns = merge_source_namespaces(source_namespaces)
+
+        if seed_parsers:
+            self.seed_shard_caches(source_parsers[0], seed_parsers)
+
+        if snapshot:
+            self.store_snapshot(snapshot, snapshot_key, source_parsers)
+
+    def store_snapshot(
+        self,
+        snapshot: CppDeclarationSnapshot,
+        snapshot_key: str,
+        source_parsers: List[CppSourceParser],
+    ) -> None:
+        """
+        Store the source declarations in the snapshot.
+
+        Out-of-tree declarations that the source tree does not reference are
+        pruned first, as they would otherwise be pickled through the parents of
+        the source declarations.
+
+        Parameters
+        ----------
+        snapshot : CppDeclarationSnapshot
+            The snapshot in the wrapper root
+        snapshot_key : str
+            The snapshot key for the current inputs
+        source_parsers : List[CppSourceParser]
+            The parsers for the header collections that were parsed
+        """
+        logger = logging.getLogger()
+
+        # A parser's dependencies come from the cache entry it loaded, as the
+        # depfile on disk may be from a parse of different inputs
+        dependencies: List[str] = []
+        for source_parser in source_parsers:
+            if not source_parser.dependencies:
+                logger.warning(
+                    "Not storing declaration snapshot: no header dependencies for "
+                    f"{source_parser.wrapper_header_collection}."
+                )
+                return
+            dependencies += source_parser.dependencies
+
+        prune_declarations(self.source_ns.declarations)
+
+        snapshot.store(snapshot_key, self.source_ns, dependencies)
+
+    def seed_shard_caches(
+        self, whole_parser: CppSourceParser, shard_parsers: List[CppSourceParser]
+    ) -> None:
+        """
+        Store the declarations of the whole header collection for each shard.
+
+        Each shard's header collection includes a subset of the whole header
+        collection's headers, so its parse cache entry can hold the whole set
+        of declarations, filtered down to the source tree when it is loaded.
+        The declarations are stored once under the whole header collection's
+        key, and each shard's entry refers to them. Declarations located in the
+        whole header collection, such as explicit instantiations, are located
+        in the shard's header collection when the shard's entry is loaded. The
+        entries depend on every header in the whole collection, as the shards'
+        own dependencies are not known without parsing them. The first change
+        after seeding therefore reparses every shard, after which each shard is
+        only reparsed when its own headers change.
+
+        Parameters
+        ----------
+        whole_parser : CppSourceParser
+            The parser that parsed the whole header collection
+        shard_parsers : List[CppSourceParser]
+            The parsers for the shard header collections
+        """
+        logger = logging.getLogger()
+
+        dependencies = whole_parser.dependencies
+        source_decls = whole_parser.source_ns.declarations
+        if not dependencies or not source_decls:
+            logger.warning("Could not seed the incremental parse state.")
+            return
+
+        # Only keep the declarations that the shards' source namespaces use
+        if whole_parser.global_ns is not None:
+            prune_declarations(source_decls)
+
+        global_ns = source_decls[0]
+        while global_ns.parent is not None:
+            global_ns = global_ns.parent
+
+        whole_key = whole_parser.get_cache_key()
+        shard_parsers[0].cache.store(whole_key, [global_ns], dependencies)
+
+        for shard_parser in shard_parsers:
+            shard_parser.cache.store_reference(
+                shard_parser.get_cache_key(),
+                whole_key,
+                whole_parser.wrapper_header_collection,
+                dependencies,
+            )
+
+    def get_castxml_parsers(
+        self,
+        header_collection_filepaths: List[str],
+        castxml_start: Optional[List[str]],
+        castxml_pch: Optional[str],
+    ) -> List[CppSourceParser]:
+        """
+        Create the CastXML parsers for the header collections.
+
+        Parameters
+        ----------
+        header_collection_filepaths : List[str]
+            The header collections to parse
+        castxml_start : Optional[List[str]]
+            The namespaces to restrict the CastXML output to
+        castxml_pch : Optional[str]
+            The path to the precompiled header, if any
+
+        Returns
+        -------
+        List[CppSourceParser]
+            A parser for each header collection
+        """
+        return [
+            CppSourceParser(
+                self.source_root,
+                header_collection_filepath,
+                self.castxml_binary,
+                self.source_includes,
+                self.castxml_cflags,
+                self.castxml_version,
+                self.cache_dir,
+                castxml_pch,
+                castxml_start,
+                self.stream_xml,
+                self.snapshot,
+                self.low_memory,
+                self.pch_compiler,
+            )
+            for header_collection_filepath in header_collection_filepaths
+        ]
+
+    def get_libclang_parsers(
+        self, header_collection_filepaths: List[str]
+    ) -> List[CppSourceParser]:
+        """
+        Get the libclang parsers for the header collections, creating them if needed.
+
+        Parameters
+        ----------
+        header_collection_filepaths : List[str]
+            The header collections to parse
+
+        Returns
+        -------
+        List[CppSourceParser]
+            A parser for each header collection
+        """
+        for header_collection_filepath in header_collection_filepaths:
+            if header_collection_filepath not in self.libclang_parsers:
+                self.libclang_parsers[header_collection_filepath] = CppLibclangParser(
+                    self.source_root,
+                    header_collection_filepath,
+                    self.castxml_binary,
+                    self.source_includes,
+                    self.castxml_cflags,
+                    self.castxml_version,
+                    self.cache_dir,
+                    self.snapshot,
+                    self.low_memory,
+                )
+
+        return [
+            self.libclang_parsers[header_collection_filepath]
+            for header_collection_filepath in header_collection_filepaths
+        ]
 
     def parse_package_info(self) -> None:
         """Parse the package info file to create a PackageInfo object."""
@@ -247,6 +1084,65 @@ class CppWrapperGenerator:
             # If no package info file exists, create a PackageInfo object with default settings
             self.package_info = PackageInfo("cppwg_package", self.source_root)
 
+    def assign_decls_to_modules(
+        self, decls: List[declaration_t], module_infos: List[ModuleInfo]
+    ) -> List[Tuple[declaration_t, ModuleInfo]]:
+        """
+        Assign declarations to the modules whose source locations contain them.
+
+        Each declaration is assigned to the module with the longest source
+        location containing the declaration's file e.g. a class in
+        src/geometry/shapes/ goes to a module with source location
+        src/geometry/shapes rather than one with src/geometry. The first module
+        without source locations takes any declarations not under another
+        module's source locations. The decision is made once per file by walking
+        up the file's parent directories, so the cost doesn't grow with the
+        number of modules and source locations.
+
+        Parameters
+        ----------
+        decls : List[declaration_t]
+            The declarations to assign
+        module_infos : List[ModuleInfo]
+            The modules to assign the declarations to
+
+        Returns
+        -------
+        List[Tuple[declaration_t, ModuleInfo]]
+            The assigned declarations with their modules, in declaration order
+        """
+        location_modules: Dict[str, ModuleInfo] = {}
+        default_module: Optional[ModuleInfo] = None
+
+        for module_info in module_infos:
+            location_paths = module_info.get_source_location_paths()
+
+            if location_paths is None:
+                if default_module is None:
+                    default_module = module_info
+                continue
+
+            for location_path in location_paths:
+                location_modules.setdefault(location_path, module_info)
+
+        file_modules: Dict[str, Optional[ModuleInfo]] = {}
+        assigned_decls: List[Tuple[declaration_t, ModuleInfo]] = []
+
+        for decl in decls:
+            file_name = decl.location.file_name
+
+            if file_name not in file_modules:
+                # Find the longest source location containing the file
+                location_path = utils.find_path_prefix(file_name, location_modules)
+                file_modules[file_name] = location_modules.get(
+                    location_path, default_module
+                )
+
+            if file_modules[file_name]:
+                assigned_decls.append((decl, file_modules[file_name]))
+
+        return assigned_decls
+
     def update_class_info(self) -> None:
         """
         Add decls to class info objects.
@@ -254,28 +1150,32 @@ class CppWrapperGenerator:
         Update the class info with class declarations parsed by pygccxml from
         the C++ source code.
         """
-        for module_info in self.package_info.module_info_collection:
-            if module_info.use_all_classes:
-                # Create class info objects for all class declarations found
-                # from parsing the source code with pygccxml.
-                # Note: as module_info.use_all_classes  == True, no class info
-                # objects were created while parsing the package info yaml file.
-                class_decls = self.source_ns.classes(allow_empty=True)
-                for class_decl in class_decls:
-                    if module_info.is_decl_in_source_path(class_decl):
-                        class_info = CppClassInfo(class_decl.name)
-                        class_info.module_info = module_info
-                        class_info.decl = class_decl
-                        module_info.class_info_collection.append(class_info)
+        # Create class info objects for all class declarations found from
+        # parsing the source code with pygccxml, for modules that use all
+        # classes. Note: as module_info.use_all_classes == True, no class info
+        # objects were created while parsing the package info yaml file.
+        use_all_modules = [
+            module_info
+            for module_info in self.package_info.module_info_collection
+            if module_info.use_all_classes
+        ]
+        if use_all_modules:
+            class_decls = self.source_ns.classes(allow_empty=True)
+            for class_decl, module_info in self.assign_decls_to_modules(
+                class_decls, use_all_modules
+            ):
+                class_info = CppClassInfo(class_decl.name)
+                class_info.module_info = module_info
+                class_info.decl = class_decl
+                module_info.class_info_collection.append(class_info)
 
-            else:
+        for module_info in self.package_info.module_info_collection:
+            if not module_info.use_all_classes:
                 # As module_info.use_all_classes  == False, class info objects
                 # have already been created while parsing the package info file.
                 # We only need to add the decl from pygccxml's output.
                 for class_info in module_info.class_info_collection:
-                    class_decls = self.source_ns.classes(
-                        class_info.name, allow_empty=True
-                    )
+                    class_decls = self.decl_index.classes(class_info.name)
                     if len(class_decls) == 1:
                         class_info.decl = class_decls[0]
 
@@ -286,45 +1186,85 @@ class CppWrapperGenerator:
         Update the free function info  with declarations parsed by pygccxml from
         the C++ source code.
         """
-        for module_info in self.package_info.module_info_collection:
-            if module_info.use_all_free_functions:
-                # Create free function info objects for all free function
-                # declarations found from parsing the source code with pygccxml.
-                # Note: as module_info.use_all_free_functions  == True, no class info
-                # objects were created while parsing the package info yaml file.
-                free_functions = self.source_ns.free_functions(allow_empty=True)
-                for free_function in free_functions:
-                    if module_info.is_decl_in_source_path(free_function):
-                        function_info = CppFreeFunctionInfo(free_function.name)
-                        function_info.module_info = module_info
-                        function_info.decl = free_function
-                        module_info.free_function_info_collection.append(function_info)
+        # Create free function info objects for all free function declarations
+        # found from parsing the source code with pygccxml, for modules that use
+        # all free functions. Note: as module_info.use_all_free_functions ==
+        # True, no free function info objects were created while parsing the
+        # package info yaml file.
+        use_all_modules = [
+            module_info
+            for module_info in self.package_info.module_info_collection
+            if module_info.use_all_free_functions
+        ]
+        if use_all_modules:
+            free_functions = self.source_ns.free_functions(allow_empty=True)
+            for free_function, module_info in self.assign_decls_to_modules(
+                free_functions, use_all_modules
+            ):
+                function_info = CppFreeFunctionInfo(free_function.name)
+                function_info.module_info = module_info
+                function_info.decl = free_function
+                module_info.free_function_info_collection.append(function_info)
 
-            else:
+        for module_info in self.package_info.module_info_collection:
+            if not module_info.use_all_free_functions:
                 # As module_info.use_all_free_functions  == False, free function
                 # info objects have already been created while parsing the
                 # package info file. We only need to add the decl from pygccxml's output.
                 for free_function_info in module_info.free_function_info_collection:
-                    free_functions = self.source_ns.free_functions(
-                        free_function_info.name, allow_empty=True
+                    free_functions = self.decl_index.free_functions(
+                        free_function_info.name
                     )
                     if len(free_functions) == 1:
                         free_function_info.decl = free_functions[0]
 
     def write_header_collection(self) -> None:
-        """Write the header collection to file."""
+        """
+        Write the header collection to file.
+
+        When parsing in parallel or incrementally, also write a header
+        collection for each shard of modules. Modules are distributed over the
+        shards round-robin.
+        """
         header_collection_writer = CppHeaderCollectionWriter(
             self.package_info,
             self.wrapper_root,
             self.header_collection_filepath,
+            template_instantiation=self.template_instantiation,
+            source_hpp_files=self.wrapped_hpp_files,
         )
         header_collection_writer.write()
 
+        # Write a separate header collection for each shard of modules
+        self.shard_header_collection_filepaths = []
+
+        if self.jobs < 2 and not self.incremental:
+            return
+
+        module_info_collection = self.package_info.module_info_collection
+        num_shards = self.shards or len(module_info_collection)
+        num_shards = min(num_shards, len(module_info_collection))
+
+        for idx in range(num_shards):
+            header_collection_filepath = os.path.join(
+                self.wrapper_root, CPPWG_HEADER_COLLECTION_SHARD_FILENAME.format(idx)
+            )
+            header_collection_writer = CppHeaderCollectionWriter(
+                self.package_info,
+                self.wrapper_root,
+                header_collection_filepath,
+                module_info_collection[idx::num_shards],
+                self.template_instantiation,
+                self.wrapped_hpp_files,
+            )
+            header_collection_writer.write()
+            self.shard_header_collection_filepaths.append(header_collection_filepath)
+
     def write_wrappers(self) -> None:
         """Write all the wrappers required for the package."""
         for module_info in self.package_info.module_info_collection:
             module_writer = CppModuleWrapperWriter(
-                self.source_ns,
+                self.decl_index,
                 module_info,
                 wrapper_templates.template_collection,
                 self.wrapper_root,
@@ -342,6 +1282,9 @@ class CppWrapperGenerator:
         # Map each class to a header file
         self.map_classes_to_hpp_files()
 
+        # Scan the headers for the classes and free functions to wrap
+        self.select_source_hpp_files()
+
         # Attempt to extract templates for each class from the source files
         self.extract_templates_from_source()
 
@@ -351,11 +1294,17 @@ class CppWrapperGenerator:
         # Parse the headers with pygccxml and castxml
         self.parse_header_collection()
 
+        # Index the parsed declarations by name
+        self.decl_index = CppDeclarationIndex(self.source_ns)
+
         # Update the Class Info from the parsed code
         self.update_class_info()
 
         # Update the Free Function Info from the parsed code
         self.update_free_function_info()
 
+        # Resolve the configuration of the features added from the parsed code
+        self.package_info.resolve_hierarchy_attributes()
+
         # Write all the wrappers required
         self.write_wrappers()
@@ -1,6 +1,62 @@
 """Generic information structure."""
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from cppwg.utils.type_matcher import CppTypeMatcher
+
+
+class ReadOnlyDict(dict):
+    """A dictionary that raises TypeError on modification, and can be pickled."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        """Pickle as a read-only copy of the contents."""
+        return (type(self), (dict(self),))
+
+
+# Name replacements for features that do not override them
+DEFAULT_NAME_REPLACEMENTS: Mapping[str, str] = ReadOnlyDict(
+    {
+        "double": "Double",
+        "unsigned int": "Unsigned",
+        "Unsigned int": "Unsigned",
+        "unsigned": "Unsigned",
+        "std::vector": "Vector",
+        "std::pair": "Pair",
+        "std::map": "Map",
+        "std::string": "String",
+        "boost::shared_ptr": "SharedPtr",
+        "*": "Ptr",
+        "c_vector": "CVector",
+        "std::set": "Set",
+    }
+)
+
+# Attributes taken from the nearest feature in the hierarchy that sets them
+HIERARCHY_ATTRIBUTES = (
+    "common_include_file",
+    "pointer_call_policy",
+    "reference_call_policy",
+    "smart_ptr_type",
+)
+
+# Type exclusion attributes matched against any part of a type
+SUBSTRING_EXCLUDE_ATTRIBUTES = ("constructor_arg_type_excludes",)
+
+# Attributes gathered from the feature and all of its parents
+HIERARCHY_GATHER_ATTRIBUTES = (
+    "arg_type_excludes",
+    "calldef_excludes",
+    "constructor_arg_type_excludes",
+    "return_type_excludes",
+    "source_includes",
+    "template_substitutions",
+)
 
 
 class BaseInfo:
@@ -19,7 +75,10 @@ class BaseInfo:
     source_includes : List[str]
         A list of source files to be included with the feature.
     calldef_excludes : List[str]
-        Do not include calldefs matching these patterns.
+        Do not include calldefs matching these patterns. Type names match the
+        whole type; patterns prefixed with "glob:" or "regex:" are matched as
+        globs or regexes against the type without whitespace, as with the other
+        type exclusion lists.
     smart_ptr_type : str, optional
         Handle classes with this smart pointer type.
     template_substitutions : Dict[str, List[Any]]
@@ -39,16 +98,52 @@ class BaseInfo:
     excluded_variables : List[str]
         Do not include these variables.
     constructor_arg_type_excludes : List[str]
-        List of exclude patterns for ctors.
+        List of exclude patterns for ctors; type names match any part of an
+        argument type.
     return_type_excludes : List[str]
         List of exclude patterns for return types.
     arg_type_excludes : List[str]
         List of exclude patterns for arg types.
-    name_replacements : Dict[str, str]
+    name_replacements : Mapping[str, str]
         A dictionary of name replacements e.g. {"double":"Double", "unsigned
-        int":"Unsigned"}
+        int":"Unsigned"}. Features share the read-only default table until
+        they are assigned their own
+    resolved_attributes : Mapping[str, Any], optional
+        A read-only view of the hierarchy attributes resolved for the feature,
+        with gathered attributes as tuples; None until resolved
+    exclude_matchers : Dict[str, CppTypeMatcher], optional
+        The compiled type exclusion patterns, keyed by attribute name
+    extra_config : Dict[str, Any], optional
+        Config settings that are not attributes of the info object
+
+    Info objects use __slots__, as packages using all classes can have tens of
+    thousands of them. Subclasses declare slots for their own attributes. There
+    is deliberately no __getattr__ fallback to extra_config, as defining one
+    slows down every attribute lookup.
     """
 
+    __slots__ = (
+        "name",
+        "source_includes",
+        "calldef_excludes",
+        "smart_ptr_type",
+        "template_substitutions",
+        "pointer_call_policy",
+        "reference_call_policy",
+        "extra_code",
+        "prefix_code",
+        "custom_generator",
+        "excluded_methods",
+        "excluded_variables",
+        "constructor_arg_type_excludes",
+        "return_type_excludes",
+        "arg_type_excludes",
+        "_name_replacements",
+        "resolved_attributes",
+        "exclude_matchers",
+        "extra_config",
+    )
+
     def __init__(self, name):
         self.name: str = name
         self.source_includes: List[str] = []
@@ -65,21 +160,50 @@ class BaseInfo:
         self.constructor_arg_type_excludes: List[str] = []
         self.return_type_excludes: List[str] = []
         self.arg_type_excludes: List[str] = []
-        self.name_replacements: Dict[str, str] = {
-            "double": "Double",
-            "unsigned int": "Unsigned",
-            "Unsigned int": "Unsigned",
-            "unsigned": "Unsigned",
-            "double": "Double",
-            "std::vector": "Vector",
-            "std::pair": "Pair",
-            "std::map": "Map",
-            "std::string": "String",
-            "boost::shared_ptr": "SharedPtr",
-            "*": "Ptr",
-            "c_vector": "CVector",
-            "std::set": "Set",
-        }
+        self._name_replacements: Optional[Dict[str, str]] = None
+        self.resolved_attributes: Optional[Mapping[str, Any]] = None
+        self.exclude_matchers: Optional[Dict[str, CppTypeMatcher]] = None
+        self.extra_config: Optional[Dict[str, Any]] = None
+
+    def apply_config(self, config: Dict[str, Any]) -> None:
+        """
+        Set attributes from a dictionary of config settings.
+
+        Settings that are not attributes of the info object are kept in
+        extra_config, as slotted objects can't have other attributes set.
+
+        Parameters
+        ----------
+        config : Dict[str, Any]
+            The config settings e.g. {"smart_ptr_type": "boost::shared_ptr"}
+        """
+        for key, value in config.items():
+            try:
+                setattr(self, key, value)
+            except AttributeError:
+                if self.extra_config is None:
+                    self.extra_config = {}
+                self.extra_config[key] = value
+
+    @property
+    def name_replacements(self) -> Mapping[str, str]:
+        """
+        Get the name replacements for this feature.
+
+        Features without their own table share the read-only default table,
+        which is not copied on read. A table assigned to the feature is copied,
+        so changing it later only affects this feature.
+
+        Returns
+        -------
+        Mapping[str, str]
+            The name replacements e.g. {"unsigned int": "Unsigned"}
+        """
+        return self._name_replacements or DEFAULT_NAME_REPLACEMENTS
+
+    @name_replacements.setter
+    def name_replacements(self, name_replacements: Mapping[str, str]) -> None:
+        self._name_replacements = dict(name_replacements)
 
     @property
     def parent(self) -> Optional["BaseInfo"]:
@@ -115,6 +239,10 @@ class BaseInfo:
         Any
             The attribute value.
         """
+        resolved_attributes = self.resolved_attributes
+        if resolved_attributes is not None and attribute_name in resolved_attributes:
+            return resolved_attributes[attribute_name]
+
         if hasattr(self, attribute_name) and getattr(self, attribute_name) is not None:
             return getattr(self, attribute_name)
 
@@ -123,7 +251,7 @@ class BaseInfo:
 
         return None
 
-    def hierarchy_attribute_gather(self, attribute_name: str) -> List[Any]:
+    def hierarchy_attribute_gather(self, attribute_name: str) -> Sequence[Any]:
         """
         Get a list of attribute values from this object and its parents.
 
@@ -136,9 +264,13 @@ class BaseInfo:
 
         Returns
         -------
-        List[Any]
-            The list of attribute values.
+        Sequence[Any]
+            The attribute values; a shared tuple if the attribute is resolved.
         """
+        resolved_attributes = self.resolved_attributes
+        if resolved_attributes is not None and attribute_name in resolved_attributes:
+            return resolved_attributes[attribute_name]
+
         att_list: List[Any] = []
 
         if hasattr(self, attribute_name) and getattr(self, attribute_name) is not None:
@@ -148,3 +280,61 @@ class BaseInfo:
             att_list.extend(self.parent.hierarchy_attribute_gather(attribute_name))
 
         return att_list
+
+    def resolve_hierarchy_attributes(self) -> None:
+        """
+        Resolve the hierarchy attributes of this feature once.
+
+        The writers look up the same attributes for every method and constructor
+        of a class, so the values found by walking up the hierarchy are stored in
+        a read-only view. Parents should be resolved first so the walk stops at
+        them. Resolve again if the configuration of this feature or one of its
+        parents changes.
+        """
+        self.resolved_attributes = None
+        self.exclude_matchers = None
+
+        resolved_attributes: Dict[str, Any] = {}
+
+        for attribute_name in HIERARCHY_ATTRIBUTES:
+            resolved_attributes[attribute_name] = self.hierarchy_attribute(
+                attribute_name
+            )
+
+        for attribute_name in HIERARCHY_GATHER_ATTRIBUTES:
+            resolved_attributes[attribute_name] = tuple(
+                self.hierarchy_attribute_gather(attribute_name)
+            )
+
+        self.resolved_attributes = ReadOnlyDict(resolved_attributes)
+
+    def get_exclude_matcher(self, attribute_name: str) -> CppTypeMatcher:
+        """
+        Get the compiled type exclusion patterns from this object and its parents.
+
+        The patterns are compiled on first use and kept until the hierarchy
+        attributes are resolved again.
+
+        Parameters
+        ----------
+        attribute_name : str
+            The exclusion attribute e.g. "calldef_excludes"
+
+        Returns
+        -------
+        CppTypeMatcher
+            The matcher for the gathered patterns.
+        """
+        if self.exclude_matchers is None:
+            self.exclude_matchers = {}
+
+        exclude_matcher = self.exclude_matchers.get(attribute_name)
+
+        if exclude_matcher is None:
+            exclude_matcher = CppTypeMatcher(
+                self.hierarchy_attribute_gather(attribute_name),
+                substring=attribute_name in SUBSTRING_EXCLUDE_ATTRIBUTES,
+            )
+            self.exclude_matchers[attribute_name] = exclude_matcher
+
+        return exclude_matcher
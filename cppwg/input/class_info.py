@@ -8,6 +8,8 @@ from cppwg.input.cpp_type_info import CppTypeInfo
 class CppClassInfo(CppTypeInfo):
     """An information structure for individual C++ classes to be wrapped."""
 
+    __slots__ = ()
+
     def __init__(self, name: str, class_config: Optional[Dict[str, Any]] = None):
 
         super(CppClassInfo, self).__init__(name, class_config)
@@ -1,6 +1,6 @@
 """C++ type information structure."""
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from pygccxml.declarations import declaration_t
 
@@ -25,10 +25,30 @@ class CppTypeInfo(BaseInfo):
         List of template replacement arguments for the type e.g. [[2, 2], [3, 3]]
     decl : declaration_t
         The pygccxml declaration associated with this type
+    short_names : Tuple[str, ...]
+        The Python names for the type e.g. ("Foo2_2", "Foo3_3"); cached until
+        template_arg_lists, name_override or name_replacements are reassigned
+    full_names : Tuple[str, ...]
+        The C++ names for the type e.g. ("Foo<2,2 >", "Foo<3,3 >"); cached until
+        template_arg_lists is reassigned
     """
 
+    __slots__ = (
+        "module_info",
+        "source_file_full_path",
+        "source_file",
+        "decl",
+        "_name_override",
+        "_template_arg_lists",
+        "_short_names",
+        "_full_names",
+    )
+
     def __init__(self, name: str, type_config: Optional[Dict[str, Any]] = None):
 
+        self._short_names: Optional[Tuple[str, ...]] = None
+        self._full_names: Optional[Tuple[str, ...]] = None
+
         super(CppTypeInfo, self).__init__(name)
 
         self.module_info: Optional["ModuleInfo"] = None  # noqa: F821
@@ -39,14 +59,97 @@ class CppTypeInfo(BaseInfo):
         self.decl: Optional[declaration_t] = None
 
         if type_config:
-            for key, value in type_config.items():
-                setattr(self, key, value)
+            self.apply_config(type_config)
+
+    @property
+    def name_override(self) -> Optional[str]:
+        """The name override specified in config."""
+        return self._name_override
+
+    @name_override.setter
+    def name_override(self, name_override: Optional[str]) -> None:
+        self._name_override = name_override
+        self._short_names = None
+
+    @property
+    def name_replacements(self) -> Mapping[str, str]:
+        """The name replacements for the Python names."""
+        return super(CppTypeInfo, self).name_replacements
+
+    @name_replacements.setter
+    def name_replacements(self, name_replacements: Mapping[str, str]) -> None:
+        self._name_replacements = dict(name_replacements)
+        self._short_names = None
+
+    @property
+    def template_arg_lists(self) -> Optional[List[List[Any]]]:
+        """The template replacement arguments for the type."""
+        return self._template_arg_lists
+
+    @template_arg_lists.setter
+    def template_arg_lists(self, template_arg_lists: Optional[List[List[Any]]]) -> None:
+        self._template_arg_lists = template_arg_lists
+        self._short_names = None
+        self._full_names = None
+
+    @property
+    def short_names(self) -> Tuple[str, ...]:
+        """
+        Get the Python names for the class e.g. ("Foo2_2",).
+
+        The names are computed on first use; see get_short_names.
+
+        Returns
+        -------
+        Tuple[str, ...]
+            The short names
+        """
+        if self._short_names is None:
+            self._short_names = tuple(self.make_short_names())
+        return self._short_names
+
+    @property
+    def full_names(self) -> Tuple[str, ...]:
+        """
+        Get the C++ names for the class e.g. ("Foo<2,2 >",).
+
+        The names are computed on first use; see get_full_names.
+
+        Returns
+        -------
+        Tuple[str, ...]
+            The full names
+        """
+        if self._full_names is None:
+            self._full_names = tuple(self.make_full_names())
+        return self._full_names
 
-    # TODO: Consider setting short and full names on init as read-only properties
     def get_short_names(self) -> List[str]:
         """
         Get the Python name for the class e.g. Foo2_2.
 
+        Returns
+        -------
+        List[str]
+            The list of short names
+        """
+        return list(self.short_names)
+
+    def get_full_names(self) -> List[str]:
+        """
+        Get the C++ name for the class e.g. Foo<2,2>.
+
+        Returns
+        -------
+        List[str]
+            The list of full names
+        """
+        return list(self.full_names)
+
+    def make_short_names(self) -> List[str]:
+        """
+        Build the Python names for the class e.g. Foo2_2.
+
         Return the name of the class as it will appear on the Python side. This
         collapses template arguments, separating them by underscores and removes
         special characters. The return type is a list, as a class can have
@@ -115,9 +218,9 @@ class CppTypeInfo(BaseInfo):
 
         return short_names
 
-    def get_full_names(self) -> List[str]:
+    def make_full_names(self) -> List[str]:
         """
-        Get the C++ name for the class e.g. Foo<2,2>.
+        Build the C++ names for the class e.g. Foo<2,2>.
 
         Return the name (declaration) of the class as it appears on the C++
         side. The return type is a list, as a class can have multiple names
@@ -8,6 +8,8 @@ from cppwg.input.cpp_type_info import CppTypeInfo
 class CppFreeFunctionInfo(CppTypeInfo):
     """An information structure for individual free functions to be wrapped."""
 
+    __slots__ = ()
+
     def __init__(
         self, name: str, free_function_config: Optional[Dict[str, Any]] = None
     ):
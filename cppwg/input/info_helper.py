@@ -2,12 +2,12 @@
 
 import logging
 import os
-import re
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from cppwg.input.base_info import BaseInfo
 from cppwg.input.class_info import CppClassInfo
 from cppwg.input.module_info import ModuleInfo
+from cppwg.parsers.template_index import CppTemplateIndex
 
 
 class CppInfoHelper:
@@ -24,12 +24,21 @@ class CppInfoHelper:
         The module info object that this helper is working with.
     class_dict : dict
         A dictionary of class info objects keyed by class name.
+    template_index : CppTemplateIndex
+        The template class signatures in the source files, shared between
+        helpers so that each file is only read once.
     """
 
-    def __init__(self, module_info: ModuleInfo):
+    def __init__(
+        self,
+        module_info: ModuleInfo,
+        template_index: Optional[CppTemplateIndex] = None,
+    ):
 
         self.module_info: ModuleInfo = module_info
 
+        self.template_index: CppTemplateIndex = template_index or CppTemplateIndex()
+
         # For convenience, collect class info in a dict keyed by name
         self.class_dict: Dict[str, CppClassInfo] = {
             class_info.name: class_info
@@ -48,9 +57,7 @@ class CppInfoHelper:
         """
         logger = logging.getLogger()
 
-        if isinstance(feature_info, CppClassInfo):
-            feature_type = "class"
-        else:
+        if not isinstance(feature_info, CppClassInfo):
             logger.error(f"Unsupported feature type: {type(feature_info)}")
             raise TypeError()
 
@@ -77,61 +84,12 @@ class CppInfoHelper:
         if len(template_substitutions) == 0:
             return
 
-        # Remove spaces from template signatures
-        # e.g. <unsigned DIM_A, unsigned DIM_B> -> <unsignedDIM_A,unsignedDIM_B>
-        for tpl_sub in template_substitutions:
-            tpl_sub["signature"] = tpl_sub["signature"].replace(" ", "")
-
-        # Remove whitespaces, blank lines, and directives from the source file
-        whitespace_regex = re.compile(r"\s+")
-        with open(source_path, "r") as in_file:
-            lines = [re.sub(whitespace_regex, "", line) for line in in_file]
-            lines = [line for line in lines if line and not line.startswith("#")]
-
-        # Search for template signatures in the source file lines
-        for idx in range(len(lines) - 1):
-            curr_line = lines[idx]
-            next_line = lines[idx + 1]
-
-            for template_substitution in template_substitutions:
-                # e.g. template<unsignedDIM_A,unsignedDIM_B>
-                signature: str = "template" + template_substitution["signature"]
-
-                # e.g. [[2,2], [3,3]]
-                replacement: List[List[Any]] = template_substitution["replacement"]
-
-                if signature in curr_line:
-                    feature_string = feature_type + feature_info.name  # e.g. "classFoo"
-
-                    declaration_found = False
-
-                    if feature_string == next_line:
-                        # template<unsignedDIM_A,unsignedDIM_B>
-                        # classFoo
-                        declaration_found = True
-
-                    elif next_line.startswith(feature_string + "{"):
-                        # template<unsignedDIM_A,unsignedDIM_B>
-                        # classFoo{
-                        declaration_found = True
-
-                    elif next_line.startswith(feature_string + ":"):
-                        # template<unsignedDIM_A,unsignedDIM_B>
-                        # classFoo:publicBar<DIM_A,DIM_B>
-                        declaration_found = True
-
-                    elif curr_line == signature + feature_string:
-                        # template<unsignedDIM_A,unsignedDIM_B>classFoo
-                        declaration_found = True
-
-                    elif curr_line.startswith(signature + feature_string + "{"):
-                        # template<unsignedDIM_A,unsignedDIM_B>classFoo{
-                        declaration_found = True
-
-                    elif curr_line.startswith(signature + feature_string + ":"):
-                        # template<unsignedDIM_A,unsignedDIM_B>classFoo:publicBar<DIM_A,DIM_B>
-                        declaration_found = True
+        # Match the class's template definitions in the source file; the index
+        # compares signatures without whitespace e.g. <unsignedDIM_A,unsignedDIM_B>
+        template_substitution = self.template_index.find_substitution(
+            source_path, feature_info.name, template_substitutions
+        )
 
-                    if declaration_found:
-                        feature_info.template_arg_lists = replacement
-                        break
+        if template_substitution:
+            # e.g. [[2,2], [3,3]]
+            feature_info.template_arg_lists = template_substitution["replacement"]
@@ -15,6 +15,8 @@ class CppMethodInfo(CppTypeInfo):
         The class info parent object associated with this method
     """
 
+    __slots__ = ("class_info",)
+
     def __init__(self, name: str, _):
 
         super(CppMethodInfo, self).__init__(name)
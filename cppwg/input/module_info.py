@@ -3,8 +3,6 @@
 import os
 from typing import Any, Dict, List, Optional
 
-from pygccxml.declarations import declaration_t
-
 from cppwg.input.base_info import BaseInfo
 
 
@@ -30,8 +28,28 @@ class ModuleInfo(BaseInfo):
         Use all free functions in the module
     use_all_variables : bool
         Use all variables in the module
+    classes : List[Any]
+        The class configs from the package info, or "CPPWG_ALL"
+    free_functions : List[Any]
+        The free function configs from the package info, or "CPPWG_ALL"
+    variables : List[Any]
+        The variable configs from the package info, or "CPPWG_ALL"
     """
 
+    __slots__ = (
+        "package_info",
+        "source_locations",
+        "class_info_collection",
+        "free_function_info_collection",
+        "variable_info_collection",
+        "use_all_classes",
+        "use_all_free_functions",
+        "use_all_variables",
+        "classes",
+        "free_functions",
+        "variables",
+    )
+
     def __init__(self, name: str, module_config: Optional[Dict[str, Any]] = None):
 
         super(ModuleInfo, self).__init__(name)
@@ -44,36 +62,43 @@ class ModuleInfo(BaseInfo):
         self.use_all_classes: bool = False
         self.use_all_free_functions: bool = False
         self.use_all_variables: bool = False
+        self.classes: List[Any] = []
+        self.free_functions: List[Any] = []
+        self.variables: List[Any] = []
 
         if module_config:
-            for key, value in module_config.items():
-                setattr(self, key, value)
+            self.apply_config(module_config)
 
     @property
     def parent(self) -> "PackageInfo":  # noqa: F821
         """Returns the parent package info object."""
         return self.package_info
 
-    def is_decl_in_source_path(self, decl: declaration_t) -> bool:
-        """
-        Check if the declaration is associated with a file in the specified source paths.
+    def resolve_hierarchy_attributes(self) -> None:
+        """Resolve the hierarchy attributes of the module and its features."""
+        super(ModuleInfo, self).resolve_hierarchy_attributes()
 
-        Parameters
-        ----------
-        decl : declaration_t
-            The declaration to check
+        for feature_info in (
+            self.class_info_collection
+            + self.free_function_info_collection
+            + self.variable_info_collection
+        ):
+            feature_info.resolve_hierarchy_attributes()
+
+    def get_source_location_paths(self) -> Optional[List[str]]:
+        """
+        Get the normalized paths of the module's source locations.
 
         Returns
         -------
-        bool
-            True if the declaration is associated with a file in a specified source path
+        Optional[List[str]]
+            The source location paths under the source root, or None if the
+            module has no source locations and so covers the whole source tree
         """
         if self.source_locations is None:
-            return True
-
-        for source_location in self.source_locations:
-            full_path = os.path.join(self.package_info.source_root, source_location)
-            if full_path in decl.location.file_name:
-                return True
+            return None
 
-        return False
+        return [
+            os.path.normpath(os.path.join(self.package_info.source_root, location))
+            for location in self.source_locations
+        ]
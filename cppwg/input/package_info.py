@@ -3,6 +3,7 @@
 from typing import Any, Dict, List, Optional
 
 from cppwg.input.base_info import BaseInfo
+from cppwg.utils.constants import CPPWG_DEFAULT_TEMPLATE_INSTANTIATION
 
 
 class PackageInfo(BaseInfo):
@@ -21,12 +22,37 @@ class PackageInfo(BaseInfo):
         The root directory of the C++ source code
     source_hpp_patterns : List[str]
         A list of source file patterns to include
+    source_hpp_excludes : List[str]
+        A list of directory globs to skip when collecting source files, matched
+        against directory names and paths relative to the source root
     source_hpp_files : List[str]
         A list of source file names to include
     common_include_file : bool
         Use a common include file for all source files
+    castxml_pch : List[str]
+        A list of third-party headers to precompile for CastXML e.g. ["<vector>"]
+    castxml_start_namespaces : Optional[List[str]]
+        Namespaces to restrict the CastXML output to; derived from the source
+        headers if None, or unrestricted if "CPPWG_ALL"
+    template_instantiation : str
+        How template classes are instantiated in the header collection; either
+        "explicit" e.g. `template class Foo<2,2>;` or "implicit", which only
+        instantiates the class definition e.g. `static_assert(sizeof(Foo<2,2>) > 0, "");`
     """
 
+    __slots__ = (
+        "source_locations",
+        "module_info_collection",
+        "source_root",
+        "source_hpp_patterns",
+        "source_hpp_excludes",
+        "source_hpp_files",
+        "common_include_file",
+        "castxml_pch",
+        "castxml_start_namespaces",
+        "template_instantiation",
+    )
+
     def __init__(
         self,
         name: str,
@@ -55,14 +81,24 @@ class PackageInfo(BaseInfo):
         self.module_info_collection: List["ModuleInfo"] = []  # noqa: F821
         self.source_root: str = source_root
         self.source_hpp_patterns: List[str] = ["*.hpp"]
+        self.source_hpp_excludes: List[str] = []
         self.source_hpp_files: List[str] = []
         self.common_include_file: bool = False
+        self.castxml_pch: List[str] = []
+        self.castxml_start_namespaces: Optional[List[str]] = None
+        self.template_instantiation: str = CPPWG_DEFAULT_TEMPLATE_INSTANTIATION
 
         if package_config:
-            for key, value in package_config.items():
-                setattr(self, key, value)
+            self.apply_config(package_config)
 
     @property
     def parent(self) -> None:
         """Returns None as this is the top level object in the hierarchy."""
         return None
+
+    def resolve_hierarchy_attributes(self) -> None:
+        """Resolve the hierarchy attributes of the package and all its features."""
+        super(PackageInfo, self).resolve_hierarchy_attributes()
+
+        for module_info in self.module_info_collection:
+            module_info.resolve_hierarchy_attributes()
@@ -0,0 +1,219 @@
+"""Streaming filter for CastXML output."""
+
+import logging
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterator, List, Set, Tuple
+from xml.sax.saxutils import quoteattr
+
+# Attributes holding the id of a single referenced element
+REF_ATTRIBUTES = ("type", "returns", "context", "basetype", "original_type", "comment")
+
+# Attributes holding a space-separated list of referenced element ids
+REF_LIST_ATTRIBUTES = ("bases", "overrides", "befriending", "throw")
+
+
+class CastXmlFilter:
+    """
+    Streaming filter that removes out-of-tree declarations from CastXML output.
+
+    CastXML output for a typical header collection is dominated by third-party
+    headers, and pygccxml builds a declaration object for every element before
+    cppwg filters the declarations down to the source tree. This filter keeps
+    only declarations located in the source tree and the elements they
+    reference (types, enclosing scopes, base classes etc.), so that pygccxml
+    only builds the declarations cppwg uses. Referenced declarations from
+    outside the source tree, such as third-party base classes, are kept without
+    their members.
+
+    The XML is streamed with iterparse twice. CastXML writes the File elements
+    last, so the first pass records the references between element ids and the
+    second pass writes the elements to keep. Only one top-level element is held
+    at a time, but the reference ids of every element are kept in memory
+    between the passes, so memory use grows with the size of the XML rather
+    than being bounded.
+
+    Attributes
+    ----------
+    xml_path : str
+        The path to the XML file written by CastXML
+    is_source_file : Callable[[str], bool]
+        Checks whether the declarations in a file should be kept
+    """
+
+    def __init__(self, xml_path: str, is_source_file: Callable[[str], bool]):
+        self.xml_path: str = xml_path
+        self.is_source_file: Callable[[str], bool] = is_source_file
+
+    def iter_elements(self) -> Iterator[Tuple[ET.Element, ET.Element]]:
+        """
+        Stream the top-level elements of the XML.
+
+        Each element is removed from the root once the caller has processed
+        it, so only one top-level element is held in memory at a time.
+
+        Returns
+        -------
+        Iterator[Tuple[ET.Element, ET.Element]]
+            The root element and each complete top-level element in turn
+        """
+        depth = 0
+        for event, element in ET.iterparse(self.xml_path, events=("start", "end")):
+            if event == "start":
+                if depth == 0:
+                    root = element
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth == 1:
+                yield root, element
+                del root[:]
+
+    def element_refs(self, element: ET.Element) -> List[str]:
+        """
+        Get the ids of the elements referenced by an element.
+
+        Parameters
+        ----------
+        element : ET.Element
+            A top-level element from the CastXML output
+
+        Returns
+        -------
+        List[str]
+            The referenced element ids, excluding members and files
+        """
+        refs = []
+
+        # Arguments and base classes are nested in their parent element
+        for item in element.iter():
+            for attribute in REF_ATTRIBUTES:
+                ref = item.get(attribute)
+                if ref:
+                    refs.append(ref)
+
+        for attribute in REF_LIST_ATTRIBUTES:
+            for ref in element.get(attribute, "").split():
+                # Base classes may be prefixed with their access e.g. "private:_12"
+                refs.append(ref.rpartition(":")[2])
+
+        return refs
+
+    def scan(self) -> Tuple[Set[str], Set[str]]:
+        """
+        Scan the XML for the elements and files to keep.
+
+        Returns
+        -------
+        Tuple[Set[str], Set[str]]
+            The ids of the elements to keep and the ids of the files to keep
+        """
+        refs: Dict[str, List[str]] = {}
+        members: Dict[str, List[str]] = {}
+        element_files: Dict[str, str] = {}
+        file_names: Dict[str, str] = {}
+
+        for _, element in self.iter_elements():
+            element_id = element.get("id")
+
+            if element.tag == "File":
+                file_names[element_id] = element.get("name", "")
+                continue
+
+            refs[element_id] = self.element_refs(element)
+
+            if "file" in element.attrib:
+                element_files[element_id] = element.get("file")
+                if "members" in element.attrib:
+                    members[element_id] = element.get("members").split()
+
+        # Elements can only be classified as in-tree or out-of-tree once the
+        # File elements at the end have been scanned
+        is_source_file: Dict[str, bool] = {
+            file_id: self.is_source_file(file_name)
+            for file_id, file_name in file_names.items()
+        }
+
+        # Keep in-tree declarations, along with everything they reference
+        stack = [
+            element_id
+            for element_id, file_id in element_files.items()
+            if is_source_file.get(file_id, False)
+        ]
+        kept_ids: Set[str] = set()
+
+        while stack:
+            element_id = stack.pop()
+            if element_id in kept_ids or element_id not in refs:
+                continue
+            kept_ids.add(element_id)
+
+            stack.extend(refs[element_id])
+
+            # Keep all members of in-tree classes, but only the referenced
+            # members of out-of-tree classes and namespaces
+            if is_source_file.get(element_files.get(element_id), False):
+                stack.extend(members.get(element_id, []))
+
+        kept_files = {element_files[e] for e in kept_ids if e in element_files}
+
+        return kept_ids, kept_files
+
+    def filter(self, output_path: str) -> None:
+        """
+        Write the filtered XML.
+
+        CastXML always writes at least the global namespace, so XML without
+        any elements below the root is rejected.
+
+        Parameters
+        ----------
+        output_path : str
+            The path to write the filtered XML to
+        """
+        logger = logging.getLogger()
+
+        kept_ids, kept_files = self.scan()
+
+        root = None
+        num_elements = 0
+        with open(output_path, "w") as xml_file:
+            xml_file.write('<?xml version="1.0"?>\n')
+
+            for root, element in self.iter_elements():
+                if num_elements == 0:
+                    # The root element holds the CastXML format version
+                    attributes = "".join(
+                        f" {key}={quoteattr(value)}" for key, value in root.items()
+                    )
+                    xml_file.write(f"<{root.tag}{attributes}>\n")
+                num_elements += 1
+
+                element_id = element.get("id")
+                if element_id not in kept_ids and element_id not in kept_files:
+                    continue
+
+                # Drop members that have been filtered out
+                if "members" in element.attrib:
+                    element.set(
+                        "members",
+                        " ".join(
+                            member
+                            for member in element.get("members").split()
+                            if member in kept_ids
+                        ),
+                    )
+
+                element.tail = "\n"
+                xml_file.write(ET.tostring(element, encoding="unicode"))
+
+            if root is None:
+                logger.error(f"No CastXML elements found in {self.xml_path}")
+                raise ValueError()
+
+            xml_file.write(f"</{root.tag}>\n")
+
+        logger.info(
+            f"Kept {len(kept_ids)} of {num_elements} CastXML elements from "
+            f"{len(kept_files)} files."
+        )
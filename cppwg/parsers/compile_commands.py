@@ -0,0 +1,223 @@
+"""Reader for compile_commands.json compilation databases."""
+
+import json
+import logging
+import os
+import re
+import shlex
+from typing import Dict, List, Optional, Set, Tuple
+
+# Matches #include directives, capturing the delimiter and the header name
+INCLUDE_REGEX = re.compile(
+    r'^[ \t]*#[ \t]*include[ \t]*([<"])([^>"\n]+)[>"]', re.MULTILINE
+)
+
+# Options naming an include directory, either joined to or followed by the path
+INCLUDE_OPTIONS = ("-isystem", "-iquote", "-idirafter", "-I")
+
+
+class CppCompileCommands:
+    """
+    Compiler options taken from a compilation database.
+
+    Build systems such as CMake write the compiler command for each translation
+    unit to compile_commands.json. The include paths, macro definitions and C++
+    standard used to compile the translation units in the source tree are
+    collected so the headers are parsed with the same options as the build.
+
+    Attributes
+    ----------
+    compile_commands_path : str
+        The path to the compile_commands.json file
+    source_root : str
+        The root directory of the C++ source code
+    source_files : List[str]
+        The translation units in the source tree
+    include_paths : List[str]
+        The include directories, in the order they are first used
+    defines : List[str]
+        The macro definitions e.g. ["NDEBUG", "USE_MPI=1"]
+    std : str, optional
+        The C++ standard e.g. "c++17"
+    """
+
+    def __init__(self, compile_commands_path: str, source_root: str):
+        self.compile_commands_path: str = compile_commands_path
+        self.source_root: str = source_root
+
+        self.source_files: List[str] = []
+        self.include_paths: List[str] = []
+        self.defines: List[str] = []
+        self.std: Optional[str] = None
+
+    def parse(self) -> None:
+        """Read the commands for the translation units in the source tree."""
+        logger = logging.getLogger()
+
+        try:
+            with open(self.compile_commands_path, "r") as compile_commands_file:
+                entries = json.load(compile_commands_file)
+        except ValueError:
+            logger.error(
+                f"Could not read compilation database: {self.compile_commands_path}"
+            )
+            raise
+
+        source_prefix = os.path.join(self.source_root, "")
+
+        for entry in entries:
+            directory = entry.get("directory", "")
+            source_file = os.path.normpath(os.path.join(directory, entry["file"]))
+
+            # Skip translation units from other projects in the same build
+            if not source_file.startswith(source_prefix):
+                continue
+
+            if "arguments" in entry:
+                arguments = entry["arguments"]
+            else:
+                arguments = shlex.split(entry["command"])
+
+            self.source_files.append(source_file)
+            self.add_arguments(arguments, directory)
+
+        if not self.source_files:
+            logger.error(
+                f"No translation units under {self.source_root} found in "
+                f"compilation database: {self.compile_commands_path}"
+            )
+            raise ValueError()
+
+        logger.info(
+            f"Read {len(self.include_paths)} include paths and "
+            f"{len(self.defines)} definitions from {len(self.source_files)} "
+            "translation units in the compilation database."
+        )
+
+    def add_arguments(self, arguments: List[str], directory: str) -> None:
+        """
+        Collect the include paths, definitions and standard from a command.
+
+        Parameters
+        ----------
+        arguments : List[str]
+            The compiler command e.g. ["c++", "-Iinclude", "-c", "Foo.cpp"]
+        directory : str
+            The working directory of the command
+        """
+        logger = logging.getLogger()
+
+        # Definitions of the same macro in different commands keep the first
+        defined_names = {define.split("=")[0] for define in self.defines}
+
+        idx = 0
+        while idx < len(arguments):
+            argument = arguments[idx]
+            idx += 1
+
+            value = None
+            for option in INCLUDE_OPTIONS:
+                if argument.startswith(option):
+                    option_length = len(option)
+                    value = argument[option_length:]
+                    break
+            else:
+                if argument.startswith("--include-directory="):
+                    value = argument.split("=", 1)[1]
+
+            if value is not None:
+                if not value and idx < len(arguments):
+                    value = arguments[idx]
+                    idx += 1
+
+                include_path = os.path.normpath(os.path.join(directory, value))
+                if include_path not in self.include_paths:
+                    self.include_paths.append(include_path)
+                continue
+
+            if argument.startswith("-D") or argument.startswith("--define-macro="):
+                if argument.startswith("-D"):
+                    define = argument[2:]
+                else:
+                    define = argument.split("=", 1)[1]
+
+                if not define and idx < len(arguments):
+                    define = arguments[idx]
+                    idx += 1
+
+                name = define.split("=")[0]
+                if name not in defined_names:
+                    defined_names.add(name)
+                    self.defines.append(define)
+                continue
+
+            if argument.startswith("-std=") or argument.startswith("--std="):
+                std = argument.split("=", 1)[1]
+                if self.std is None:
+                    self.std = std
+                elif std != self.std:
+                    logger.warning(
+                        f"Translation units use different standards: {self.std} "
+                        f"and {std} - using {self.std}."
+                    )
+
+    def find_reachable_headers(self) -> Set[str]:
+        """
+        Find the source tree headers included by the translation units.
+
+        The #include directives of the translation units are followed through
+        the headers in the source tree, resolving names against the include
+        paths. Directives are not preprocessed, so headers included under
+        conditions that are false in the build are still reported.
+
+        Returns
+        -------
+        Set[str]
+            The paths of the headers in the source tree that can be reached
+        """
+        source_prefix = os.path.join(self.source_root, "")
+
+        # Resolved paths keyed by the including directory (None for <...>)
+        # and the header name
+        resolved: Dict[Tuple[Optional[str], str], Optional[str]] = {}
+
+        def resolve(includer_dir: Optional[str], name: str) -> Optional[str]:
+            key = (includer_dir, name)
+            if key not in resolved:
+                search_paths = self.include_paths
+                if includer_dir:
+                    search_paths = [includer_dir] + search_paths
+
+                resolved[key] = None
+                for search_path in search_paths:
+                    path = os.path.normpath(os.path.join(search_path, name))
+                    if os.path.isfile(path):
+                        resolved[key] = path
+                        break
+
+            return resolved[key]
+
+        visited: Set[str] = set()
+        pending = list(self.source_files)
+
+        while pending:
+            filepath = pending.pop()
+            if filepath in visited:
+                continue
+            visited.add(filepath)
+
+            try:
+                with open(filepath, "r", errors="replace") as source_file:
+                    content = source_file.read()
+            except OSError:
+                continue
+
+            includer_dir = os.path.dirname(filepath)
+            for delimiter, name in INCLUDE_REGEX.findall(content):
+                path = resolve(includer_dir if delimiter == '"' else None, name)
+
+                # Headers outside the source tree are not wrapped
+                if path and path.startswith(source_prefix) and path not in visited:
+                    pending.append(path)
+
+        return visited.difference(self.source_files)
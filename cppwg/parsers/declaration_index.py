@@ -0,0 +1,148 @@
+"""Name-keyed index of C++ declarations."""
+
+from typing import Dict, List, Set
+
+from pygccxml.declarations import declaration_t, templates
+from pygccxml.declarations.class_declaration import class_t
+from pygccxml.declarations.free_calldef import free_function_t
+from pygccxml.declarations.namespace import namespace_t
+
+
+class CppDeclarationIndex:
+    """
+    Index of source classes and free functions keyed by name.
+
+    pygccxml name queries such as `source_ns.class_("Foo<2,2>")` run the query
+    matchers over every declaration of the requested type, as template names
+    can't be looked up in pygccxml's own name tables. The index is built once
+    after parsing and maps every name a declaration can be queried by to the
+    declarations with that name, so that each lookup is a dictionary access.
+    Names are normalized as in pygccxml, so that `Foo<2, 2>` and `Foo<2,2>` are
+    equivalent, and the lookups return the same declarations as the queries.
+
+    Attributes
+    ----------
+    source_ns : namespace_t
+        The namespace containing C++ declarations from the source tree
+    class_decls : Dict[str, List[class_t]]
+        The source classes keyed by name e.g. {"Foo<2,2>": [...]}
+    free_function_decls : Dict[str, List[free_function_t]]
+        The source free functions keyed by name e.g. {"foo": [...]}
+    """
+
+    def __init__(self, source_ns: namespace_t):
+        self.source_ns: namespace_t = source_ns
+
+        self.class_decls: Dict[str, List[class_t]] = {}
+        for class_decl in source_ns.classes(allow_empty=True):
+            for name in self.decl_names(class_decl):
+                self.class_decls.setdefault(name, []).append(class_decl)
+
+        self.free_function_decls: Dict[str, List[free_function_t]] = {}
+        for free_function in source_ns.free_functions(allow_empty=True):
+            for name in self.decl_names(free_function):
+                self.free_function_decls.setdefault(name, []).append(free_function)
+
+    @staticmethod
+    def decl_names(decl: declaration_t) -> Set[str]:
+        """
+        Get the names that a declaration can be looked up by.
+
+        Parameters
+        ----------
+        decl : declaration_t
+            The declaration
+
+        Returns
+        -------
+        Set[str]
+            The declaration's name and full name, as written and normalized
+            e.g. {"Foo<2, 2>", "Foo<2,2>", "::ns::Foo<2,2>", "ns::Foo<2,2>"}
+        """
+        names = {
+            decl.name,
+            decl.partial_name,
+            templates.normalize_name(decl),
+            templates.normalize_partial_name(decl),
+        }
+
+        for full_name in (
+            templates.normalize_full_name_true(decl),
+            templates.normalize_full_name_false(decl),
+        ):
+            names.add(full_name)
+            names.add(full_name.lstrip(":"))
+
+        return names
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """
+        Normalize a name to look up.
+
+        Parameters
+        ----------
+        name : str
+            The name to normalize e.g. "Foo< 2, 2 >"
+
+        Returns
+        -------
+        str
+            The normalized name e.g. "Foo<2,2>"
+        """
+        if templates.is_instantiation(name):
+            return templates.normalize(name)
+        return name
+
+    def classes(self, name: str) -> List[class_t]:
+        """
+        Get the source classes with a name.
+
+        Parameters
+        ----------
+        name : str
+            The class name or full name e.g. "Foo<2,2>"
+
+        Returns
+        -------
+        List[class_t]
+            The matching class declarations; empty if there are none
+        """
+        return self.class_decls.get(self.normalize(name), [])
+
+    def class_(self, name: str) -> class_t:
+        """
+        Get the single source class with a name.
+
+        Parameters
+        ----------
+        name : str
+            The class name or full name e.g. "Foo<2,2>"
+
+        Returns
+        -------
+        class_t
+            The matching class declaration
+        """
+        class_decls = self.classes(name)
+        if len(class_decls) == 1:
+            return class_decls[0]
+
+        # Let pygccxml report missing or ambiguous declarations as usual
+        return self.source_ns.class_(name)
+
+    def free_functions(self, name: str) -> List[free_function_t]:
+        """
+        Get the source free functions with a name.
+
+        Parameters
+        ----------
+        name : str
+            The function name or full name e.g. "foo"
+
+        Returns
+        -------
+        List[free_function_t]
+            The matching free function declarations; empty if there are none
+        """
+        return self.free_function_decls.get(self.normalize(name), [])
@@ -0,0 +1,126 @@
+"""Manifest of the source headers found by the previous run."""
+
+import hashlib
+import logging
+import os
+import pickle
+from typing import Dict, List, Optional, Tuple
+
+from cppwg.utils.constants import CPPWG_HEADER_MANIFEST_FILENAME
+
+
+class CppHeaderManifest:
+    """
+    Directory listings from the previous search for source headers.
+
+    The manifest in the wrapper root stores the headers and subdirectories
+    found in each directory of the source tree, with the directory's
+    modification time. Adding, removing or renaming an entry updates the
+    modification time of its directory, so a rerun only lists the directories
+    that changed and reuses the stored listings for the rest.
+
+    Attributes
+    ----------
+    manifest_path : str
+        The path to the manifest file
+    """
+
+    def __init__(self, wrapper_root: str):
+        self.manifest_path: str = os.path.join(
+            wrapper_root, CPPWG_HEADER_MANIFEST_FILENAME
+        )
+
+    @staticmethod
+    def key(
+        source_root: str,
+        patterns: List[str],
+        excludes: List[str],
+        prune_paths: List[str],
+    ) -> str:
+        """
+        Compute the manifest key for a search.
+
+        Parameters
+        ----------
+        source_root : str
+            The directory searched
+        patterns : List[str]
+            Glob patterns for the header file names e.g. ["*.hpp"]
+        excludes : List[str]
+            Glob patterns for directories skipped
+        prune_paths : List[str]
+            Directories skipped e.g. the wrapper root
+
+        Returns
+        -------
+        str
+            The manifest key
+        """
+        sig = hashlib.sha1()
+        sig.update(repr((source_root, patterns, excludes, prune_paths)).encode("utf-8"))
+        return sig.hexdigest()
+
+    def load(self, key: str) -> Dict[str, Tuple[Optional[int], List[str], List[str]]]:
+        """
+        Load the directory listings if the manifest matches the key.
+
+        Parameters
+        ----------
+        key : str
+            The manifest key for the current search
+
+        Returns
+        -------
+        Dict[str, Tuple[Optional[int], List[str], List[str]]]
+            The modification time, headers and subdirectories of each directory,
+            keyed by directory path; empty if there is no valid manifest
+        """
+        logger = logging.getLogger()
+
+        if not os.path.isfile(self.manifest_path):
+            return {}
+
+        try:
+            with open(self.manifest_path, "rb") as manifest_file:
+                manifest_key: str = pickle.load(manifest_file)
+                if manifest_key != key:
+                    logger.info("Header manifest is stale: search options changed.")
+                    return {}
+
+                listings: Dict[str, Tuple[Optional[int], List[str], List[str]]] = (
+                    pickle.load(manifest_file)
+                )
+
+        except (
+            pickle.UnpicklingError,
+            AttributeError,
+            EOFError,
+            ImportError,
+            ValueError,
+        ):
+            logger.warning(f"Ignoring corrupt header manifest: {self.manifest_path}")
+            return {}
+
+        return listings
+
+    def store(
+        self, key: str, listings: Dict[str, Tuple[Optional[int], List[str], List[str]]]
+    ) -> None:
+        """
+        Write the directory listings to the manifest.
+
+        Parameters
+        ----------
+        key : str
+            The manifest key for the current search
+        listings : Dict[str, Tuple[Optional[int], List[str], List[str]]]
+            The modification time, headers and subdirectories of each directory
+        """
+        # Replace the manifest in one step, as another run may be reading it
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "wb") as manifest_file:
+            pickle.dump(key, manifest_file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(listings, manifest_file, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp_path, self.manifest_path)
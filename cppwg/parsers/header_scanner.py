@@ -0,0 +1,255 @@
+"""Lightweight scanner for C++ header files."""
+
+import re
+from typing import List, Set
+
+# Matches comments, string and character literals, and preprocessor directives
+# (including continuation lines) so they can be blanked out before tokenizing
+STRIP_REGEX = re.compile(
+    r"//[^\n]*"
+    r"|/\*.*?\*/"
+    r'|"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])*'"
+    r"|^[ \t]*#(?:\\\n|[^\n])*",
+    re.DOTALL | re.MULTILINE,
+)
+
+TOKEN_REGEX = re.compile(r"[A-Za-z_]\w*|::|\S")
+
+# Keywords that can be followed by "(" in a declaration without naming a function
+NON_FUNCTION_KEYWORDS = {
+    "alignas",
+    "alignof",
+    "auto",
+    "bool",
+    "char",
+    "char8_t",
+    "char16_t",
+    "char32_t",
+    "decltype",
+    "double",
+    "explicit",
+    "float",
+    "int",
+    "long",
+    "noexcept",
+    "operator",
+    "requires",
+    "short",
+    "signed",
+    "sizeof",
+    "static_assert",
+    "throw",
+    "unsigned",
+    "void",
+    "wchar_t",
+    "__attribute__",
+    "__declspec",
+}
+
+
+class CppHeaderScanner:
+    """
+    Cheap token-level scanner for C++ headers.
+
+    The scanner does not preprocess or parse the header; it strips comments,
+    literals and directives and tracks braces to find out how the header's
+    top-level declarations are organised into namespaces, and which classes and
+    free functions it declares at namespace scope. It errs on the side of
+    reporting declarations, e.g. macro invocations at global scope are counted
+    as global declarations, and macro invocations at namespace scope are
+    reported as they may declare classes or functions.
+
+    Attributes
+    ----------
+    filepath : str
+        The path to the header file
+    top_level_namespaces : Set[str]
+        The names of namespaces defined at global scope e.g. {"foo"}
+    has_global_decls : bool
+        Whether the header declares anything outside a named namespace
+    class_names : Set[str]
+        The unqualified names of classes defined at namespace scope e.g. {"Foo"}
+    free_function_names : Set[str]
+        The unqualified names of functions declared at namespace scope
+    has_macro_decls : bool
+        Whether the header invokes macros at namespace scope
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath: str = filepath
+        self.top_level_namespaces: Set[str] = set()
+        self.has_global_decls: bool = False
+        self.class_names: Set[str] = set()
+        self.free_function_names: Set[str] = set()
+        self.has_macro_decls: bool = False
+
+    @property
+    def has_wrappable_decls(self) -> bool:
+        """Whether the header may declare classes or free functions."""
+        return bool(
+            self.class_names or self.free_function_names or self.has_macro_decls
+        )
+
+    def tokenize(self) -> List[str]:
+        """
+        Read the header and split it into tokens.
+
+        Returns
+        -------
+        List[str]
+            The tokens in the header, excluding comments, literals and directives
+        """
+        with open(self.filepath, "r", errors="replace") as hpp_file:
+            content = hpp_file.read()
+
+        content = STRIP_REGEX.sub(" ", content)
+
+        return TOKEN_REGEX.findall(content)
+
+    def scan(self) -> None:
+        """Scan the header for namespaces, classes, functions and global declarations."""
+        tokens = self.tokenize()
+
+        # Stack of open braces; True for braces that open a named namespace or
+        # a linkage specification e.g. `extern "C" {`
+        scopes: List[bool] = []
+
+        # The position in the current declaration at namespace scope, and
+        # whether the declaration has named a function yet
+        decl_length = 0
+        paren_depth = 0
+        has_function = False
+
+        idx = 0
+        while idx < len(tokens):
+            token = tokens[idx]
+            next_token = tokens[idx + 1] if idx + 1 < len(tokens) else ""
+
+            if token in ("{", "}", ";"):
+                decl_length = 0
+                paren_depth = 0
+                has_function = False
+            else:
+                decl_length += 1
+
+            if token == "{":
+                prev_token = tokens[idx - 1] if idx > 0 else ""
+                scopes.append(all(scopes) and prev_token == "extern")
+
+            elif token == "}":
+                if scopes:
+                    scopes.pop()
+
+            elif all(scopes) and token == "inline" and next_token == "namespace":
+                # e.g. `inline namespace v1 {`
+                pass
+
+            elif all(scopes) and token == "namespace":
+                # Collect the namespace name e.g. `namespace a::b {`
+                names = []
+                idx += 1
+                while idx < len(tokens) and tokens[idx] not in ("{", "=", ";"):
+                    if tokens[idx] != "::":
+                        names.append(tokens[idx])
+                    idx += 1
+
+                decl_length = 0
+                if idx < len(tokens) and tokens[idx] == "{":
+                    if names:
+                        if not scopes:
+                            self.top_level_namespaces.add(names[0])
+                        scopes.append(True)
+                    else:
+                        # Anonymous namespaces are visible from the enclosing scope
+                        if not scopes:
+                            self.has_global_decls = True
+                        scopes.append(False)
+
+            elif not scopes and token == "using" and next_token == "namespace":
+                # Skip using directives e.g. `using namespace std;`
+                while idx < len(tokens) and tokens[idx] != ";":
+                    idx += 1
+                decl_length = 0
+
+            else:
+                if not scopes and token != ";":
+                    # Anything else at global scope is a declaration
+                    self.has_global_decls = True
+
+                if all(scopes):
+                    if token == "(":
+                        paren_depth += 1
+                    elif token == ")":
+                        paren_depth -= 1
+                    elif paren_depth == 0 and next_token == "(" and not has_function:
+                        has_function = self.scan_function(tokens, idx, decl_length)
+                    elif token in ("class", "struct", "union"):
+                        self.scan_class(tokens, idx)
+
+            idx += 1
+
+    def scan_function(self, tokens: List[str], idx: int, decl_length: int) -> bool:
+        """
+        Record a function declared at namespace scope.
+
+        Parameters
+        ----------
+        tokens : List[str]
+            The tokens in the header
+        idx : int
+            The index of a name followed by "(" e.g. "foo" in `void foo(int x);`
+        decl_length : int
+            The number of tokens in the declaration up to and including the name
+
+        Returns
+        -------
+        bool
+            True if the name is a function name
+        """
+        token = tokens[idx]
+
+        if not (token[0].isalpha() or token[0] == "_"):
+            return False
+
+        if token in NON_FUNCTION_KEYWORDS:
+            return False
+
+        if decl_length == 1:
+            # A name at the start of a declaration is a macro e.g. `DECLARE(Foo)`
+            self.has_macro_decls = True
+            return False
+
+        # Skip out-of-class definitions of members e.g. `void Foo::bar()`
+        if tokens[idx - 1] == "::":
+            return True
+
+        self.free_function_names.add(token)
+        return True
+
+    def scan_class(self, tokens: List[str], idx: int) -> None:
+        """
+        Record a class defined at namespace scope.
+
+        Parameters
+        ----------
+        tokens : List[str]
+            The tokens in the header
+        idx : int
+            The index of a class key e.g. "class" in `class Foo : public Bar {`
+        """
+        # The class name is the last name before the base list or body, skipping
+        # any export macros e.g. `class EXPORT Foo final {`
+        name = None
+        idx += 1
+        while idx < len(tokens) and tokens[idx] not in ("{", ":", "final"):
+            token = tokens[idx]
+            if token != "::":
+                if not (token[0].isalpha() or token[0] == "_"):
+                    # Not a definition e.g. `class Foo;` or `template <class T>`
+                    return
+                name = token
+            idx += 1
+
+        if name and idx < len(tokens):
+            self.class_names.add(name)
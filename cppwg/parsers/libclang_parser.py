@@ -0,0 +1,1879 @@
+"""Parser for C++ source code using libclang in-process."""
+
+import ctypes
+import hashlib
+import logging
+import os
+import pickle
+import re
+import shlex
+import subprocess
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pygccxml import declarations, utils
+from pygccxml.declarations import declaration_t
+from pygccxml.declarations.namespace import namespace_t
+from pygccxml.parser import patcher
+
+from cppwg.parsers.parse_cache import find_stale_dependency, sign_dependencies
+from cppwg.parsers.source_parser import CppSourceParser
+
+try:
+    from clang import cindex
+except ImportError:
+    cindex = None
+
+# CXTranslationUnit_CreatePreambleOnFirstParse, missing from the Python bindings
+PARSE_CREATE_PREAMBLE_ON_FIRST_PARSE = 0x100
+
+# pygccxml names of the builtin types, keyed by libclang type kind
+FUNDAMENTAL_TYPE_NAMES = {
+    "VOID": "void",
+    "BOOL": "bool",
+    "CHAR_S": "char",
+    "CHAR_U": "char",
+    "SCHAR": "signed char",
+    "UCHAR": "unsigned char",
+    "WCHAR": "wchar_t",
+    "SHORT": "short int",
+    "USHORT": "short unsigned int",
+    "INT": "int",
+    "UINT": "unsigned int",
+    "LONG": "long int",
+    "ULONG": "long unsigned int",
+    "LONGLONG": "long long int",
+    "ULONGLONG": "long long unsigned int",
+    "INT128": "__int128_t",
+    "UINT128": "__uint128_t",
+    "FLOAT": "float",
+    "DOUBLE": "double",
+    "LONGDOUBLE": "long double",
+}
+
+RECORD_CURSOR_KINDS = ("CLASS_DECL", "STRUCT_DECL", "UNION_DECL")
+
+TEMPLATE_CURSOR_KINDS = (
+    "CLASS_TEMPLATE",
+    "CLASS_TEMPLATE_PARTIAL_SPECIALIZATION",
+    "FUNCTION_TEMPLATE",
+)
+
+TEMPLATE_PARAMETER_CURSOR_KINDS = (
+    "TEMPLATE_TYPE_PARAMETER",
+    "TEMPLATE_NON_TYPE_PARAMETER",
+    "TEMPLATE_TEMPLATE_PARAMETER",
+)
+
+# Integer literal suffixes printed by newer clang versions e.g. Foo<2U>
+INTEGER_SUFFIX_REGEX = re.compile(r"\b(\d+)(?:[uU](?:ll|LL|l|L)?|(?:ll|LL|l|L)[uU]?)\b")
+
+# Elaborated type keywords, which CastXML leaves out of type names
+TYPE_KEYWORD_REGEX = re.compile(r"\b(?:typename|struct|class|union|enum)\s+")
+
+# The size of an array type spelling e.g. "double[2]"
+ARRAY_SIZE_REGEX = re.compile(r"\[\s*(\d+)\s*\]$")
+
+
+def normalize_type_name(type_name: str) -> str:
+    """
+    Normalize a type name printed by libclang to the form CastXML prints.
+
+    Parameters
+    ----------
+    type_name : str
+        The type name e.g. "struct std::array<double, 2UL>"
+
+    Returns
+    -------
+    str
+        The normalized type name e.g. "std::array<double, 2>"
+    """
+    type_name = TYPE_KEYWORD_REGEX.sub("", type_name)
+    return INTEGER_SUFFIX_REGEX.sub(r"\1", type_name).strip()
+
+
+def split_scope(type_name: str) -> List[str]:
+    """
+    Split a qualified type name into its scopes, ignoring template arguments.
+
+    Parameters
+    ----------
+    type_name : str
+        The qualified type name e.g. "std::vector<std::shared_ptr<Foo>>"
+
+    Returns
+    -------
+    List[str]
+        The scope names e.g. ["std", "vector<std::shared_ptr<Foo>>"]
+    """
+    names = [""]
+    depth = 0
+    idx = 0
+
+    while idx < len(type_name):
+        char = type_name[idx]
+        if char == "<":
+            depth += 1
+        elif char == ">":
+            depth -= 1
+        elif depth == 0 and type_name.startswith("::", idx):
+            names.append("")
+            idx += 2
+            continue
+        names[-1] += char
+        idx += 1
+
+    return [name for name in names if name]
+
+
+class TemplateSubstitution:
+    """
+    Template arguments for a class template instantiation.
+
+    libclang doesn't expose the members of template instantiations, so they
+    are built from the members of the class template, substituting the
+    template arguments into the template parameters' types.
+
+    Attributes
+    ----------
+    pattern : cindex.Cursor
+        The class template the instantiation is built from
+    class_decl : class_t
+        The class declaration of the instantiation
+    arguments : Dict[str, Tuple[Optional[cindex.Type], str]]
+        The type (for type arguments) and spelling of each template argument,
+        keyed by template parameter name e.g. {"DIM": (None, "2")}
+    """
+
+    def __init__(
+        self,
+        pattern: "cindex.Cursor",
+        class_decl: declarations.class_t,
+        arguments: Dict[str, Tuple[Optional["cindex.Type"], str]],
+    ):
+        self.pattern: "cindex.Cursor" = pattern
+        self.class_decl: declarations.class_t = class_decl
+        self.arguments: Dict[str, Tuple[Optional["cindex.Type"], str]] = arguments
+
+        self.parameter_regex: Optional[re.Pattern] = None
+        if self.arguments:
+            names = "|".join(re.escape(name) for name in self.arguments)
+            self.parameter_regex = re.compile(rf"(?<![\w:.])({names})\b")
+
+    def apply(self, type_name: str) -> str:
+        """
+        Substitute the template arguments into a type name.
+
+        Parameters
+        ----------
+        type_name : str
+            The type name in the class template e.g. "std::array<double, DIM>"
+
+        Returns
+        -------
+        str
+            The type name in the instantiation e.g. "std::array<double, 2>"
+        """
+        if not self.parameter_regex:
+            return type_name
+
+        return self.parameter_regex.sub(
+            lambda match: self.arguments[match.group(1)][1], type_name
+        )
+
+
+class CppLibclangConverter:
+    """
+    Builds pygccxml declarations from a libclang translation unit.
+
+    Only declarations from the source tree are built in full. Declarations
+    from outside the source tree are built on demand, when they are named by
+    the types or bases of source declarations, and without their members.
+    Variables, operators, destructors, namespace-scope enumerations and
+    implicit copy constructors are not built, as the writers don't use them.
+
+    Attributes
+    ----------
+    is_source_file : Callable[[str], bool]
+        Checks whether the declarations in a file belong to the source tree
+    cxx_std : utils.cxx_standard
+        The C++ standard, for qualifying enumerators in default values as
+        pygccxml does
+    global_ns : namespace_t
+        The global namespace holding the built declarations
+    decls : Dict[int, declaration_t]
+        The built declarations, keyed by the hash of their canonical cursor
+    class_names : Dict[str, object]
+        Classes and class cursors keyed by qualified name e.g. "std::array<double, 2>",
+        for resolving types that depend on template parameters
+    namespaces : Dict[Tuple[int, str], namespace_t]
+        The built namespaces, keyed by parent and name
+    implicit_default_deleted : Dict[int, bool]
+        Whether each class's implicit default constructor is deleted, keyed by
+        class cursor hash
+    """
+
+    def __init__(
+        self, is_source_file: Callable[[str], bool], cxx_std: utils.cxx_standard
+    ):
+        self.is_source_file: Callable[[str], bool] = is_source_file
+        self.cxx_std: utils.cxx_standard = cxx_std
+
+        self.global_ns: namespace_t = namespace_t(name="::")
+        self.decls: Dict[int, declaration_t] = {}
+        self.class_names: Dict[str, object] = {}
+        self.namespaces: Dict[Tuple[int, str], namespace_t] = {}
+        self.implicit_default_deleted: Dict[int, bool] = {}
+
+        # The printing functions are not wrapped by the Python bindings
+        self.lib = cindex.conf.lib
+        self.lib.clang_getCursorPrintingPolicy.argtypes = [cindex.Cursor]
+        self.lib.clang_getCursorPrintingPolicy.restype = ctypes.c_void_p
+        self.lib.clang_getCursorPrettyPrinted.argtypes = [
+            cindex.Cursor,
+            ctypes.c_void_p,
+        ]
+        self.lib.clang_getCursorPrettyPrinted.restype = cindex._CXString
+        self.lib.clang_PrintingPolicy_dispose.argtypes = [ctypes.c_void_p]
+
+    def convert(self, translation_unit: "cindex.TranslationUnit") -> namespace_t:
+        """
+        Build the declarations from a translation unit.
+
+        Parameters
+        ----------
+        translation_unit : cindex.TranslationUnit
+            The parsed header collection
+
+        Returns
+        -------
+        namespace_t
+            The global namespace
+        """
+        source_cursors: List[cindex.Cursor] = []
+        self.collect_source_cursors(translation_unit.cursor, source_cursors)
+
+        # Register the instantiations in the header collection first, so that
+        # types naming them can be resolved while building other classes
+        for cursor in source_cursors:
+            kind = cursor.kind.name
+            if kind in ("TYPEDEF_DECL", "TYPE_ALIAS_DECL"):
+                record = cursor.underlying_typedef_type.get_canonical()
+            elif kind in RECORD_CURSOR_KINDS:
+                record = cursor.type.get_canonical()
+            else:
+                continue
+
+            if record.kind.name == "RECORD":
+                record_cursor = record.get_declaration()
+                self.class_names.setdefault(
+                    normalize_type_name(record.spelling), record_cursor
+                )
+
+        for cursor in source_cursors:
+            self.convert_source_cursor(cursor)
+
+        # Apply the fixes pygccxml makes to declarations read from CastXML
+        decls = declarations.make_flatten(self.global_ns)
+        patcher.update_unnamed_class(decls)
+        patcher.fix_calldef_decls(
+            [decl for decl in decls if isinstance(decl, declarations.calldef_t)],
+            [decl for decl in decls if isinstance(decl, declarations.enumeration_t)],
+            self.cxx_std,
+        )
+
+        return self.global_ns
+
+    def collect_source_cursors(
+        self, cursor: "cindex.Cursor", source_cursors: List["cindex.Cursor"]
+    ) -> None:
+        """
+        Collect the namespace-scope cursors located in the source tree.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The translation unit or namespace to collect from
+        source_cursors : List[cindex.Cursor]
+            The list to add the source cursors to
+        """
+        for child in cursor.get_children():
+            if not self.is_source_cursor(child):
+                continue
+
+            if child.kind.name in ("NAMESPACE", "LINKAGE_SPEC"):
+                self.collect_source_cursors(child, source_cursors)
+            else:
+                source_cursors.append(child)
+
+    def convert_source_cursor(self, cursor: "cindex.Cursor") -> None:
+        """
+        Build the declaration for a namespace-scope cursor from the source tree.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The cursor to build the declaration for
+        """
+        kind = cursor.kind.name
+
+        if kind in RECORD_CURSOR_KINDS:
+            # Explicit instantiations and specializations name the class
+            # through its type, other classes are built from their definition
+            if cursor.is_definition() or self.specialized_template(cursor):
+                self.declaration_for(cursor.type.get_canonical().get_declaration())
+
+        elif kind in ("TYPEDEF_DECL", "TYPE_ALIAS_DECL"):
+            self.declaration_for(cursor)
+
+        elif kind == "FUNCTION_DECL":
+            key = cursor.canonical.hash
+            if key in self.decls:
+                return
+
+            decl = self.convert_calldef(cursor)
+            if decl is not None:
+                self.decls[key] = decl
+                self.scope_for(cursor.semantic_parent).adopt_declaration(decl)
+
+    def is_source_cursor(self, cursor: "cindex.Cursor") -> bool:
+        """
+        Check whether a cursor is located in the source tree.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The cursor to check
+
+        Returns
+        -------
+        bool
+            True if the cursor's file is in the source tree or is the header collection
+        """
+        file = cursor.location.file
+        return file is not None and self.is_source_file(file.name)
+
+    def is_dependent(self, cursor: "cindex.Cursor") -> bool:
+        """
+        Check whether a declaration is part of a template.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The declaration cursor
+
+        Returns
+        -------
+        bool
+            True if the declaration or any enclosing scope is a template
+        """
+        while cursor is not None and cursor.kind.name != "TRANSLATION_UNIT":
+            if cursor.kind.name in TEMPLATE_CURSOR_KINDS:
+                return True
+            cursor = cursor.semantic_parent
+        return False
+
+    def specialized_template(
+        self, cursor: "cindex.Cursor"
+    ) -> Optional["cindex.Cursor"]:
+        """
+        Get the template that a class is an instantiation or specialization of.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The class cursor
+
+        Returns
+        -------
+        Optional[cindex.Cursor]
+            The class template or partial specialization, or None
+        """
+        template = self.lib.clang_getSpecializedCursorTemplate(cursor)
+        if template is None or template.kind.name not in TEMPLATE_CURSOR_KINDS:
+            return None
+        return template
+
+    def pretty_print(self, cursor: "cindex.Cursor") -> str:
+        """
+        Print a declaration as clang does.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The declaration cursor
+
+        Returns
+        -------
+        str
+            The printed declaration e.g. "double z = 0."
+        """
+        policy = self.lib.clang_getCursorPrintingPolicy(cursor)
+        try:
+            return cindex._CXString.from_result(
+                self.lib.clang_getCursorPrettyPrinted(cursor, policy)
+            )
+        finally:
+            self.lib.clang_PrintingPolicy_dispose(policy)
+
+    def location(self, cursor: "cindex.Cursor") -> Optional[declarations.location_t]:
+        """
+        Get the location of a declaration.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The declaration cursor
+
+        Returns
+        -------
+        Optional[declarations.location_t]
+            The file and line of the declaration, or None for builtins
+        """
+        location = cursor.location
+        if location.file is None:
+            return None
+        return declarations.location_t(file_name=location.file.name, line=location.line)
+
+    def scope_for(self, cursor: "cindex.Cursor") -> declarations.scopedef_t:
+        """
+        Get the namespace or class declaration for a scope cursor.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The semantic parent of a declaration
+
+        Returns
+        -------
+        declarations.scopedef_t
+            The scope to adopt the declaration into
+        """
+        kind = cursor.kind.name
+
+        if kind == "NAMESPACE":
+            parent = self.scope_for(cursor.semantic_parent)
+            key = (id(parent), cursor.spelling)
+            if key not in self.namespaces:
+                namespace = namespace_t(name=cursor.spelling)
+                parent.adopt_declaration(namespace)
+                self.namespaces[key] = namespace
+            return self.namespaces[key]
+
+        if kind in RECORD_CURSOR_KINDS:
+            class_decl = self.declaration_for(cursor)
+            if isinstance(class_decl, declarations.class_t):
+                return class_decl
+
+        if kind == "LINKAGE_SPEC":
+            return self.scope_for(cursor.semantic_parent)
+
+        return self.global_ns
+
+    def adopt(
+        self,
+        scope: declarations.scopedef_t,
+        decl: declaration_t,
+        cursor: "cindex.Cursor",
+    ) -> None:
+        """
+        Add a declaration to its namespace or class.
+
+        Parameters
+        ----------
+        scope : declarations.scopedef_t
+            The namespace or class
+        decl : declaration_t
+            The declaration to add
+        cursor : cindex.Cursor
+            The declaration's cursor, for its access
+        """
+        if isinstance(scope, declarations.class_t):
+            scope.adopt_declaration(decl, self.access_type(cursor))
+        else:
+            scope.adopt_declaration(decl)
+
+    def access_type(self, cursor: "cindex.Cursor") -> str:
+        """
+        Get the access of a class member.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The member cursor
+
+        Returns
+        -------
+        str
+            "public", "protected" or "private"
+        """
+        access = cursor.access_specifier.name.lower()
+        if access not in declarations.ACCESS_TYPES.ALL:
+            return declarations.ACCESS_TYPES.PUBLIC
+        return access
+
+    def declaration_for(self, cursor: "cindex.Cursor") -> Optional[declaration_t]:
+        """
+        Get the declaration for a class, enumeration or typedef, building it if needed.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The declaration cursor
+
+        Returns
+        -------
+        Optional[declaration_t]
+            The declaration, or None if it can't be represented
+        """
+        key = cursor.canonical.hash
+        if key in self.decls:
+            return self.decls[key]
+
+        kind = cursor.kind.name
+        if kind in RECORD_CURSOR_KINDS or kind == "ENUM_DECL":
+            cursor = cursor.get_definition() or cursor
+        elif kind not in ("TYPEDEF_DECL", "TYPE_ALIAS_DECL"):
+            return None
+
+        # Use the class built from its name if it was named in a template
+        if kind in RECORD_CURSOR_KINDS:
+            class_decl = self.class_names.get(normalize_type_name(cursor.type.spelling))
+            if isinstance(class_decl, declarations.class_t):
+                self.decls[key] = class_decl
+                return class_decl
+
+        scope = self.scope_for(cursor.semantic_parent)
+
+        # Nested declarations may have been built along with their parent
+        if key in self.decls:
+            return self.decls[key]
+
+        if kind in RECORD_CURSOR_KINDS:
+            decl = self.convert_class(cursor, scope, key=key)
+
+        elif kind == "ENUM_DECL":
+            decl = self.convert_enumeration(cursor)
+            self.decls[key] = decl
+            self.adopt(scope, decl, cursor)
+
+        else:
+            decl = declarations.typedef_t(name=cursor.spelling)
+            decl.location = self.location(cursor)
+            self.decls[key] = decl
+            self.adopt(scope, decl, cursor)
+            self.set_typedef_type(decl, cursor)
+
+        return decl
+
+    def template_parameters(self, pattern: "cindex.Cursor") -> List["cindex.Cursor"]:
+        """
+        Get the template parameters of a class template.
+
+        Parameters
+        ----------
+        pattern : cindex.Cursor
+            The class template
+
+        Returns
+        -------
+        List[cindex.Cursor]
+            The template parameter cursors, in order
+        """
+        return [
+            child
+            for child in pattern.get_children()
+            if child.kind.name in TEMPLATE_PARAMETER_CURSOR_KINDS
+        ]
+
+    def template_argument(
+        self,
+        cursor: "cindex.Cursor",
+        idx: int,
+        parameter: Optional["cindex.Cursor"],
+    ) -> Tuple[Optional["cindex.Type"], Optional[str]]:
+        """
+        Get a template argument of a class template instantiation.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The instantiation cursor
+        idx : int
+            The index of the template argument
+        parameter : Optional[cindex.Cursor]
+            The template parameter, for the type of integral arguments
+
+        Returns
+        -------
+        Tuple[Optional[cindex.Type], Optional[str]]
+            The type (for type arguments) and spelling of the argument e.g.
+            (None, "2"), or (None, None) if it can't be represented
+        """
+        argument_kind = cursor.get_template_argument_kind(idx).name
+
+        if argument_kind == "TYPE":
+            argument_type = cursor.get_template_argument_type(idx)
+            return argument_type, normalize_type_name(argument_type.spelling)
+
+        if argument_kind == "INTEGRAL":
+            parameter_kind = ""
+            if parameter is not None:
+                parameter_kind = parameter.type.get_canonical().kind.name
+
+            if parameter_kind == "BOOL":
+                value = str(bool(cursor.get_template_argument_value(idx))).lower()
+            elif parameter_kind in ("UINT", "ULONG", "ULONGLONG", "USHORT", "UCHAR"):
+                value = str(cursor.get_template_argument_unsigned_value(idx))
+            else:
+                value = str(cursor.get_template_argument_value(idx))
+            return None, value
+
+        return None, None
+
+    def template_arguments(
+        self, cursor: "cindex.Cursor", pattern: "cindex.Cursor"
+    ) -> Dict[str, Tuple[Optional["cindex.Type"], str]]:
+        """
+        Get the template arguments of a class template instantiation.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The instantiation cursor
+        pattern : cindex.Cursor
+            The class template
+
+        Returns
+        -------
+        Dict[str, Tuple[Optional[cindex.Type], str]]
+            The type and spelling of each argument, keyed by parameter name
+        """
+        arguments: Dict[str, Tuple[Optional[cindex.Type], str]] = {}
+        num_arguments = cursor.get_num_template_arguments()
+
+        for idx, parameter in enumerate(
+            self.template_parameters(pattern)[:num_arguments]
+        ):
+            argument_type, spelling = self.template_argument(cursor, idx, parameter)
+            if parameter.spelling and spelling is not None:
+                arguments[parameter.spelling] = (argument_type, spelling)
+
+        return arguments
+
+    def class_name(self, cursor: "cindex.Cursor") -> str:
+        """
+        Get the name of a class as CastXML reports it.
+
+        Newer clang versions leave out template arguments that match their
+        defaults, whereas CastXML only leaves out trailing type arguments e.g.
+        `Foo<double, 2>` rather than `Foo<double>` for
+        `template <typename T, unsigned N = 2> class Foo`.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The class cursor
+
+        Returns
+        -------
+        str
+            The unqualified class name e.g. "Foo<double, 2>"
+        """
+        name = split_scope(normalize_type_name(cursor.type.spelling))[-1]
+
+        num_arguments = cursor.get_num_template_arguments()
+        if num_arguments <= 0:
+            return name
+
+        template_name, arguments = declarations.templates.split(name)
+
+        # Add the defaulted arguments up to the last non-type argument
+        last_value_idx = max(
+            (
+                idx
+                for idx in range(num_arguments)
+                if cursor.get_template_argument_kind(idx).name != "TYPE"
+            ),
+            default=-1,
+        )
+        if last_value_idx < len(arguments):
+            return name
+
+        parameters: List[Optional[cindex.Cursor]] = [None] * num_arguments
+        pattern = self.specialized_template(cursor)
+        if pattern is not None:
+            parameters = self.template_parameters(pattern) + parameters
+
+        for idx in range(len(arguments), last_value_idx + 1):
+            _, spelling = self.template_argument(cursor, idx, parameters[idx])
+            if spelling is None:
+                return name
+            arguments.append(spelling)
+
+        return f"{template_name}<{', '.join(arguments)}>"
+
+    def convert_class(
+        self,
+        cursor: "cindex.Cursor",
+        scope: declarations.scopedef_t,
+        key: Optional[int] = None,
+        substitution: Optional[TemplateSubstitution] = None,
+    ) -> declarations.class_t:
+        """
+        Build a class declaration.
+
+        Classes from the source tree are built with their members. Template
+        instantiations are built from the class template's members if the
+        class template is in the source tree.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The class definition cursor
+        scope : declarations.scopedef_t
+            The namespace or class to add the class to
+        key : Optional[int]
+            The key to register the class declaration under
+        substitution : Optional[TemplateSubstitution]
+            The enclosing template instantiation, for classes nested in a class template
+
+        Returns
+        -------
+        declarations.class_t
+            The class declaration
+        """
+        class_type = {
+            "STRUCT_DECL": declarations.CLASS_TYPES.STRUCT,
+            "UNION_DECL": declarations.CLASS_TYPES.UNION,
+        }.get(cursor.kind.name, declarations.CLASS_TYPES.CLASS)
+
+        if substitution:
+            name = cursor.spelling
+        elif cursor.is_anonymous():
+            name = ""
+        else:
+            name = self.class_name(cursor)
+
+        class_decl = declarations.class_t(name=name, class_type=class_type)
+        class_decl.location = self.location(cursor)
+
+        self.adopt(scope, class_decl, cursor)
+
+        if key is not None:
+            self.decls[key] = class_decl
+            self.class_names[normalize_type_name(cursor.type.spelling)] = class_decl
+            self.class_names[declarations.full_name(class_decl).lstrip(":")] = (
+                class_decl
+            )
+
+        members_cursor = cursor
+        if substitution is None:
+            class_decl.is_abstract = cursor.is_abstract_record()
+
+            pattern = self.specialized_template(cursor)
+            if pattern is not None:
+                # Members of instantiations of templates from outside the
+                # source tree and of partial specializations are not needed
+                if pattern.kind.name != "CLASS_TEMPLATE" or not self.is_source_cursor(
+                    pattern
+                ):
+                    return class_decl
+
+                substitution = TemplateSubstitution(
+                    pattern, class_decl, self.template_arguments(cursor, pattern)
+                )
+                members_cursor = pattern
+
+        self.convert_bases(class_decl, members_cursor, substitution)
+
+        if substitution or self.is_source_cursor(cursor):
+            self.convert_members(class_decl, members_cursor, substitution)
+
+        return class_decl
+
+    def convert_bases(
+        self,
+        class_decl: declarations.class_t,
+        cursor: "cindex.Cursor",
+        substitution: Optional[TemplateSubstitution],
+    ) -> None:
+        """
+        Add the base classes to a class declaration.
+
+        Parameters
+        ----------
+        class_decl : declarations.class_t
+            The class declaration
+        cursor : cindex.Cursor
+            The class or class template cursor
+        substitution : Optional[TemplateSubstitution]
+            The template arguments, if the class is a template instantiation
+        """
+        logger = logging.getLogger()
+
+        for child in cursor.get_children():
+            if child.kind.name != "CXX_BASE_SPECIFIER":
+                continue
+
+            base_type = declarations.remove_cv(
+                self.convert_type(child.type, substitution)
+            )
+            base_decl = getattr(base_type, "declaration", None)
+
+            if not isinstance(base_decl, declarations.class_t) and substitution:
+                base_decl = self.convert_template_base(child, substitution)
+
+            if not isinstance(base_decl, declarations.class_t):
+                logger.debug(
+                    f"Could not resolve base class {child.type.spelling} of "
+                    f"{class_decl.name}."
+                )
+                continue
+
+            access = self.access_type(child)
+            is_virtual = any(
+                token.spelling == "virtual" for token in child.get_tokens()
+            )
+
+            class_decl.bases.append(
+                declarations.hierarchy_info_t(base_decl, access, is_virtual)
+            )
+            base_decl.derived.append(
+                declarations.hierarchy_info_t(class_decl, access, is_virtual)
+            )
+
+    def convert_template_base(
+        self, cursor: "cindex.Cursor", substitution: TemplateSubstitution
+    ) -> Optional[declarations.class_t]:
+        """
+        Build a base class instantiated from a class template's base e.g. std::vector<T>.
+
+        The instantiation is built without its members, as for other classes
+        from outside the source tree.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The base specifier cursor in the class template
+        substitution : TemplateSubstitution
+            The template arguments of the derived class
+
+        Returns
+        -------
+        Optional[declarations.class_t]
+            The base class declaration, or None if the base is not a class template
+        """
+        template = cursor.type.get_declaration()
+        if template.kind.name != "CLASS_TEMPLATE":
+            return None
+
+        type_name = substitution.apply(normalize_type_name(cursor.type.spelling))
+        type_name = type_name.lstrip(":")
+
+        class_decl = declarations.class_t(name=split_scope(type_name)[-1])
+        class_decl.location = self.location(template)
+        self.adopt(self.scope_for(template.semantic_parent), class_decl, template)
+        self.class_names[type_name] = class_decl
+
+        return class_decl
+
+    def convert_members(
+        self,
+        class_decl: declarations.class_t,
+        cursor: "cindex.Cursor",
+        substitution: Optional[TemplateSubstitution],
+    ) -> None:
+        """
+        Add the members to a class declaration.
+
+        Parameters
+        ----------
+        class_decl : declarations.class_t
+            The class declaration
+        cursor : cindex.Cursor
+            The class or class template cursor
+        substitution : Optional[TemplateSubstitution]
+            The template arguments, if the class is a template instantiation
+        """
+        for child in cursor.get_children():
+            kind = child.kind.name
+            decl: Optional[declaration_t] = None
+
+            if kind in ("CONSTRUCTOR", "CXX_METHOD"):
+                decl = self.convert_calldef(child, substitution, class_decl)
+
+            elif kind in ("TYPEDEF_DECL", "TYPE_ALIAS_DECL"):
+                if substitution is None:
+                    self.declaration_for(child)
+                    continue
+                decl = declarations.typedef_t(name=child.spelling)
+                decl.location = self.location(child)
+                class_decl.adopt_declaration(decl, self.access_type(child))
+                self.set_typedef_type(decl, child, substitution)
+                continue
+
+            elif kind == "ENUM_DECL":
+                if substitution is None:
+                    self.declaration_for(child)
+                    continue
+                decl = self.convert_enumeration(child)
+
+            elif kind in RECORD_CURSOR_KINDS and child.is_definition():
+                if substitution is None:
+                    self.declaration_for(child)
+                else:
+                    self.convert_class(child, class_decl, substitution=substitution)
+                continue
+
+            if decl is not None:
+                class_decl.adopt_declaration(decl, self.access_type(child))
+
+        self.add_artificial_constructor(class_decl, cursor)
+
+    def add_artificial_constructor(
+        self, class_decl: declarations.class_t, cursor: "cindex.Cursor"
+    ) -> None:
+        """
+        Add the implicit default constructor that CastXML reports for a class.
+
+        The implicit copy constructor is not added, as the writers leave it out.
+
+        Parameters
+        ----------
+        class_decl : declarations.class_t
+            The class declaration
+        cursor : cindex.Cursor
+            The class or class template cursor
+        """
+        if any(
+            child.kind.name == "CONSTRUCTOR" for child in cursor.get_children()
+        ) or self.is_implicit_default_deleted(cursor):
+            return
+
+        constructor = declarations.constructor_t(
+            name=declarations.templates.name(class_decl.name)
+        )
+        constructor.is_artificial = True
+        constructor.location = class_decl.location
+        constructor.virtuality = declarations.VIRTUALITY_TYPES.NOT_VIRTUAL
+        constructor.has_const = False
+        constructor.has_static = False
+        class_decl.adopt_declaration(constructor, declarations.ACCESS_TYPES.PUBLIC)
+
+    def class_members_cursor(
+        self, cursor: "cindex.Cursor"
+    ) -> Optional["cindex.Cursor"]:
+        """
+        Get the cursor holding the members of a class.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The class cursor
+
+        Returns
+        -------
+        Optional[cindex.Cursor]
+            The class definition, the class template definition for template
+            instantiations, or None if the class is not defined
+        """
+        pattern = self.specialized_template(cursor)
+        if pattern is not None:
+            cursor = pattern
+        return cursor.get_definition()
+
+    def is_default_constructible(self, cursor: "cindex.Cursor") -> bool:
+        """
+        Check whether a derived class's implicit default constructor can use a class's.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The class definition cursor
+
+        Returns
+        -------
+        bool
+            True unless the default constructor is deleted, private or not declared
+        """
+        constructors = [
+            child for child in cursor.get_children() if child.kind.name == "CONSTRUCTOR"
+        ]
+        default_constructors = [
+            child for child in constructors if child.is_default_constructor()
+        ]
+
+        if default_constructors:
+            return any(
+                not child.is_deleted_method()
+                and child.access_specifier.name != "PRIVATE"
+                for child in default_constructors
+            )
+
+        return not constructors and not self.is_implicit_default_deleted(cursor)
+
+    def is_implicit_default_deleted(self, cursor: "cindex.Cursor") -> bool:
+        """
+        Check whether a class's implicit default constructor is deleted.
+
+        CastXML leaves out deleted implicit members. The default constructor is
+        deleted by reference fields without initializers, and by bases and
+        fields that can't be default constructed.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The class definition cursor
+
+        Returns
+        -------
+        bool
+            True if the default constructor is deleted, or False if unknown
+        """
+        key = cursor.hash
+        if key in self.implicit_default_deleted:
+            return self.implicit_default_deleted[key]
+        self.implicit_default_deleted[key] = False
+
+        is_deleted = False
+        for child in cursor.get_children():
+            kind = child.kind.name
+            if kind not in ("CXX_BASE_SPECIFIER", "FIELD_DECL"):
+                continue
+
+            record_type = child.type.get_canonical()
+            if kind == "FIELD_DECL":
+                has_initializer = any(
+                    grandchild.kind.is_expression()
+                    for grandchild in child.get_children()
+                )
+                if (
+                    record_type.kind.name in ("LVALUEREFERENCE", "RVALUEREFERENCE")
+                    and not has_initializer
+                ):
+                    is_deleted = True
+                    break
+                while record_type.kind.name == "CONSTANTARRAY":
+                    record_type = record_type.element_type
+
+            if record_type.kind.name != "RECORD":
+                continue
+
+            record_cursor = self.class_members_cursor(record_type.get_declaration())
+            if record_cursor is not None and not self.is_default_constructible(
+                record_cursor
+            ):
+                is_deleted = True
+                break
+
+        self.implicit_default_deleted[key] = is_deleted
+        return is_deleted
+
+    def convert_calldef(
+        self,
+        cursor: "cindex.Cursor",
+        substitution: Optional[TemplateSubstitution] = None,
+        class_decl: Optional[declarations.class_t] = None,
+    ) -> Optional[declarations.calldef_t]:
+        """
+        Build a function, method or constructor declaration.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The function cursor
+        substitution : Optional[TemplateSubstitution]
+            The template arguments, if the class is a template instantiation
+        class_decl : Optional[declarations.class_t]
+            The class declaration, for class members
+
+        Returns
+        -------
+        Optional[declarations.calldef_t]
+            The declaration, or None for operators, deleted functions and
+            functions using rvalue references
+        """
+        name = cursor.spelling
+        if re.match(r"operator\W", name):
+            return None
+
+        if class_decl is not None and cursor.is_deleted_method():
+            return None
+
+        # CastXML leaves out functions taking or returning rvalue references
+        argument_cursors = list(cursor.get_arguments())
+        if cursor.result_type.kind.name == "RVALUEREFERENCE" or any(
+            argument.type.kind.name == "RVALUEREFERENCE"
+            for argument in argument_cursors
+        ):
+            return None
+
+        kind = cursor.kind.name
+
+        if kind == "CONSTRUCTOR":
+            decl = declarations.constructor_t()
+            name = declarations.templates.name(class_decl.name)
+        elif kind == "CXX_METHOD":
+            decl = declarations.member_function_t()
+        else:
+            decl = declarations.free_function_t()
+
+        decl.name = name
+        decl.location = self.location(cursor)
+
+        if class_decl is not None:
+            decl.has_const = cursor.is_const_method()
+            decl.has_static = cursor.is_static_method()
+            if cursor.is_pure_virtual_method():
+                decl.virtuality = declarations.VIRTUALITY_TYPES.PURE_VIRTUAL
+            elif cursor.is_virtual_method():
+                decl.virtuality = declarations.VIRTUALITY_TYPES.VIRTUAL
+            else:
+                decl.virtuality = declarations.VIRTUALITY_TYPES.NOT_VIRTUAL
+
+        if kind != "CONSTRUCTOR":
+            decl.return_type = self.convert_type(cursor.result_type, substitution)
+
+        arguments = []
+        for idx, argument in enumerate(argument_cursors):
+            arguments.append(
+                declarations.argument_t(
+                    name=argument.spelling or f"arg{idx}",
+                    decl_type=self.convert_type(argument.type, substitution),
+                    default_value=self.default_value(argument),
+                )
+            )
+
+        if (
+            cursor.type.kind.name == "FUNCTIONPROTO"
+            and cursor.type.is_function_variadic()
+        ):
+            arguments.append(
+                declarations.argument_t(decl_type=declarations.ellipsis_t())
+            )
+
+        decl.arguments = arguments
+
+        return decl
+
+    def default_value(self, cursor: "cindex.Cursor") -> Optional[str]:
+        """
+        Get the default value of a function argument.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The argument cursor
+
+        Returns
+        -------
+        Optional[str]
+            The default value as printed by clang e.g. "0.", or None
+        """
+        expressions = [
+            child for child in cursor.get_children() if child.kind.is_expression()
+        ]
+        if not expressions:
+            return None
+
+        _, separator, value = self.pretty_print(cursor).partition(" = ")
+        if not separator:
+            return None
+
+        # CastXML qualifies names that are unqualified in the source e.g.
+        # `Foo::kSize` for `kSize`, so do the same for names in the expression
+        qualified_names: Dict[str, str] = {}
+        for expression in expressions:
+            for child in expression.walk_preorder():
+                if child.kind.name != "DECL_REF_EXPR" or any(
+                    ref.kind.name in ("NAMESPACE_REF", "TYPE_REF", "TEMPLATE_REF")
+                    for ref in child.get_children()
+                ):
+                    continue
+
+                scope_names = self.scope_names(child.referenced)
+                if scope_names:
+                    qualified_names[child.spelling] = "::".join(
+                        scope_names + [child.spelling]
+                    )
+
+        for name, qualified_name in qualified_names.items():
+            value = re.sub(rf"(?<![\w:.>]){re.escape(name)}\b", qualified_name, value)
+
+        return value
+
+    def scope_names(self, cursor: Optional["cindex.Cursor"]) -> List[str]:
+        """
+        Get the names of the namespaces and classes enclosing a declaration.
+
+        Parameters
+        ----------
+        cursor : Optional[cindex.Cursor]
+            The declaration cursor
+
+        Returns
+        -------
+        List[str]
+            The enclosing scope names, outermost first e.g. ["foo", "Bar"], or
+            an empty list for declarations in functions or the global namespace
+        """
+        if cursor is None:
+            return []
+
+        scope_names: List[str] = []
+        scope = cursor.semantic_parent
+
+        while scope is not None and scope.kind.name != "TRANSLATION_UNIT":
+            kind = scope.kind.name
+            if kind in ("NAMESPACE", "CLASS_TEMPLATE") or kind in RECORD_CURSOR_KINDS:
+                scope_names.insert(0, scope.spelling)
+            elif kind == "ENUM_DECL":
+                # Unscoped enumerators are in the enclosing scope
+                if scope.is_scoped_enum():
+                    scope_names.insert(0, scope.spelling)
+            elif kind != "LINKAGE_SPEC":
+                return []
+            scope = scope.semantic_parent
+
+        return scope_names
+
+    def convert_enumeration(
+        self, cursor: "cindex.Cursor"
+    ) -> declarations.enumeration_t:
+        """
+        Build an enumeration declaration.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The enumeration cursor
+
+        Returns
+        -------
+        declarations.enumeration_t
+            The enumeration declaration
+        """
+        values = [
+            (child.spelling, child.enum_value)
+            for child in cursor.get_children()
+            if child.kind.name == "ENUM_CONSTANT_DECL"
+        ]
+
+        decl = declarations.enumeration_t(name=cursor.spelling, values=values)
+        decl.location = self.location(cursor)
+
+        return decl
+
+    def set_typedef_type(
+        self,
+        decl: declarations.typedef_t,
+        cursor: "cindex.Cursor",
+        substitution: Optional[TemplateSubstitution] = None,
+    ) -> None:
+        """
+        Set the type of a typedef, once it has been registered.
+
+        Parameters
+        ----------
+        decl : declarations.typedef_t
+            The typedef declaration
+        cursor : cindex.Cursor
+            The typedef cursor
+        substitution : Optional[TemplateSubstitution]
+            The template arguments, if the typedef is in a template instantiation
+        """
+        decl.decl_type = self.convert_type(cursor.underlying_typedef_type, substitution)
+
+        # Record the typedef as an alias of the class it names
+        aliased = getattr(decl.decl_type, "declaration", None)
+        if isinstance(aliased, declarations.class_t):
+            aliased.aliases.append(decl)
+
+    def convert_type(
+        self,
+        clang_type: "cindex.Type",
+        substitution: Optional[TemplateSubstitution] = None,
+    ) -> declarations.type_t:
+        """
+        Build a pygccxml type from a libclang type.
+
+        Parameters
+        ----------
+        clang_type : cindex.Type
+            The libclang type
+        substitution : Optional[TemplateSubstitution]
+            The template arguments, if the type is in a template instantiation
+
+        Returns
+        -------
+        declarations.type_t
+            The pygccxml type
+        """
+        decl_type = self.convert_unqualified_type(clang_type, substitution)
+
+        if clang_type.is_volatile_qualified() and not isinstance(
+            decl_type, declarations.volatile_t
+        ):
+            decl_type = declarations.volatile_t(decl_type)
+
+        if clang_type.is_const_qualified() and not isinstance(
+            decl_type, declarations.const_t
+        ):
+            decl_type = declarations.const_t(decl_type)
+
+        return decl_type
+
+    def convert_unqualified_type(
+        self,
+        clang_type: "cindex.Type",
+        substitution: Optional[TemplateSubstitution],
+    ) -> declarations.type_t:
+        """
+        Build a pygccxml type from a libclang type, ignoring its cv-qualifiers.
+
+        Parameters
+        ----------
+        clang_type : cindex.Type
+            The libclang type
+        substitution : Optional[TemplateSubstitution]
+            The template arguments, if the type is in a template instantiation
+
+        Returns
+        -------
+        declarations.type_t
+            The pygccxml type
+        """
+        kind = clang_type.kind.name
+
+        if kind in FUNDAMENTAL_TYPE_NAMES:
+            return declarations.FUNDAMENTAL_TYPES[FUNDAMENTAL_TYPE_NAMES[kind]]
+
+        if kind == "POINTER":
+            return declarations.pointer_t(
+                self.convert_type(clang_type.get_pointee(), substitution)
+            )
+
+        if kind == "LVALUEREFERENCE":
+            return declarations.reference_t(
+                self.convert_type(clang_type.get_pointee(), substitution)
+            )
+
+        if kind == "RVALUEREFERENCE":
+            base_type = self.convert_type(clang_type.get_pointee(), substitution)
+            return declarations.dummy_type_t(f"{base_type.decl_string} &&")
+
+        # Keep the qualified spelling of dependent types e.g. std::vector<T>
+        if kind == "ELABORATED":
+            named_type = clang_type.get_named_type()
+            if named_type.kind.name != "UNEXPOSED":
+                return self.convert_type(named_type, substitution)
+
+        if kind == "CONSTANTARRAY":
+            return declarations.array_t(
+                self.convert_type(clang_type.element_type, substitution),
+                clang_type.element_count,
+            )
+
+        # Arrays sized by a template parameter e.g. T[N]
+        if kind == "DEPENDENTSIZEDARRAY" and substitution:
+            size = ARRAY_SIZE_REGEX.search(substitution.apply(clang_type.spelling))
+            if size:
+                return declarations.array_t(
+                    self.convert_type(clang_type.element_type, substitution),
+                    int(size.group(1)),
+                )
+
+        if kind == "INCOMPLETEARRAY":
+            return declarations.array_t(
+                self.convert_type(clang_type.element_type, substitution),
+                declarations.array_t.SIZE_UNKNOWN,
+            )
+
+        if kind in ("FUNCTIONPROTO", "FUNCTIONNOPROTO"):
+            return declarations.free_function_type_t(
+                return_type=self.convert_type(clang_type.get_result(), substitution),
+                arguments_types=[
+                    self.convert_type(argument_type, substitution)
+                    for argument_type in clang_type.argument_types()
+                ],
+            )
+
+        if kind == "MEMBERPOINTER":
+            class_type = self.convert_type(clang_type.get_class_type(), substitution)
+            pointee = clang_type.get_pointee()
+            if pointee.kind.name == "FUNCTIONPROTO":
+                return declarations.pointer_t(
+                    declarations.member_function_type_t(
+                        class_inst=class_type,
+                        return_type=self.convert_type(
+                            pointee.get_result(), substitution
+                        ),
+                        arguments_types=[
+                            self.convert_type(argument_type, substitution)
+                            for argument_type in pointee.argument_types()
+                        ],
+                        has_const=pointee.spelling.endswith("const"),
+                    )
+                )
+            return declarations.pointer_t(
+                declarations.member_variable_type_t(
+                    class_inst=class_type,
+                    variable_type=self.convert_type(pointee, substitution),
+                )
+            )
+
+        if kind in ("RECORD", "ENUM", "TYPEDEF"):
+            decl_cursor = clang_type.get_declaration()
+
+            if substitution and self.is_dependent(decl_cursor):
+                # The class itself, or a member of it, named in its template
+                if decl_cursor == substitution.pattern:
+                    return declarations.declarated_t(substitution.class_decl)
+                if decl_cursor.semantic_parent == substitution.pattern:
+                    for member in substitution.class_decl.declarations:
+                        if member.name == decl_cursor.spelling and isinstance(
+                            member,
+                            (
+                                declarations.typedef_t,
+                                declarations.class_t,
+                                declarations.enumeration_t,
+                            ),
+                        ):
+                            return declarations.declarated_t(member)
+
+            elif not self.is_dependent(decl_cursor):
+                decl = self.declaration_for(decl_cursor)
+                if decl is not None:
+                    return declarations.declarated_t(decl)
+
+        # Template parameters e.g. T in `std::vector<T>`
+        spelling = self.unqualified_spelling(clang_type)
+        if substitution and spelling in substitution.arguments:
+            argument_type, _ = substitution.arguments[spelling]
+            if argument_type is not None:
+                return self.convert_type(argument_type)
+
+        # Sugared types e.g. template specializations, decltype
+        canonical_type = clang_type.get_canonical()
+        if canonical_type.kind.name not in ("UNEXPOSED", "DEPENDENT", "INVALID") and (
+            canonical_type.kind.name != kind
+        ):
+            return self.convert_unqualified_type(canonical_type, substitution)
+
+        return self.spelled_type(spelling, substitution)
+
+    def unqualified_spelling(self, clang_type: "cindex.Type") -> str:
+        """
+        Get the spelling of a type without its cv-qualifiers.
+
+        Parameters
+        ----------
+        clang_type : cindex.Type
+            The libclang type
+
+        Returns
+        -------
+        str
+            The type spelling e.g. "std::array<double, DIM>"
+        """
+        spelling = clang_type.spelling
+        while True:
+            for qualifier in ("const ", "volatile "):
+                if spelling.startswith(qualifier):
+                    _, _, spelling = spelling.partition(qualifier)
+                    break
+            else:
+                return spelling
+
+    def spelled_type(
+        self, spelling: str, substitution: Optional[TemplateSubstitution]
+    ) -> declarations.type_t:
+        """
+        Build a type from its spelling, for types that depend on template parameters.
+
+        Parameters
+        ----------
+        spelling : str
+            The type spelling e.g. "std::array<double, DIM>"
+        substitution : Optional[TemplateSubstitution]
+            The template arguments, if the type is in a template instantiation
+
+        Returns
+        -------
+        declarations.type_t
+            The type of the class with the substituted name if it has been
+            built, or a type with the substituted name otherwise
+        """
+        type_name = normalize_type_name(spelling)
+        if substitution:
+            type_name = substitution.apply(type_name)
+        type_name = type_name.lstrip(":")
+
+        # Names in a class template may be relative to its enclosing scopes
+        candidates = [type_name]
+        if substitution:
+            scope_names = self.scope_names(substitution.pattern)
+            for idx in range(len(scope_names), 0, -1):
+                candidates.append("::".join(scope_names[:idx] + [type_name]))
+
+        class_decl = None
+        for candidate in candidates:
+            class_decl = self.class_names.get(candidate)
+            if class_decl is not None:
+                break
+
+        if class_decl is not None and not isinstance(class_decl, declaration_t):
+            class_decl = self.declaration_for(class_decl)
+
+        if class_decl is not None:
+            return declarations.declarated_t(class_decl)
+
+        return declarations.dummy_type_t(f"::{type_name}")
+
+
+class CppLibclangParser(CppSourceParser):
+    """
+    Parser for C++ source code using libclang's Python bindings.
+
+    The header collection is parsed in-process with libclang, and pygccxml
+    declarations are built directly from the translation unit, without
+    running CastXML or reading its XML output. Only the declarations that the
+    writers use are built: classes with their bases, constructors, methods,
+    enumerations and typedefs, and free functions. libclang is configured with
+    the system include paths that CastXML uses, so that the same headers are
+    parsed. Function bodies are skipped, as only declarations are needed.
+    Declarations are cached in the parse cache as for CastXML.
+
+    A long-lived parser keeps its translation unit and reparses it when the
+    declarations have to be rebuilt, which reuses the precompiled preamble
+    of the header collection. If a cache directory is given, the translation
+    unit is also saved to it, and loaded instead of parsing while none of
+    the files it includes have changed e.g. if the parse cache entry has
+    been evicted.
+
+    Attributes
+    ----------
+    system_includes : Optional[List[str]]
+        The system include paths used by CastXML
+    ast_path : Optional[str]
+        The path to the saved translation unit, if caching
+    translation_unit : Optional[cindex.TranslationUnit]
+        The translation unit from the last parse, for reparsing; not kept in
+        low memory mode
+    """
+
+    def __init__(
+        self,
+        source_root: str,
+        wrapper_header_collection: str,
+        castxml_binary: str,
+        source_includes: List[str],
+        castxml_cflags: str = "",
+        castxml_version: str = "",
+        cache_dir: Optional[str] = None,
+        track_dependencies: bool = False,
+        low_memory: bool = False,
+    ):
+        super(CppLibclangParser, self).__init__(
+            source_root,
+            wrapper_header_collection,
+            castxml_binary,
+            source_includes,
+            castxml_cflags,
+            castxml_version,
+            cache_dir,
+            track_dependencies=track_dependencies,
+            low_memory=low_memory,
+        )
+
+        self.system_includes: Optional[List[str]] = None
+
+        self.ast_path: Optional[str] = None
+        if cache_dir:
+            path_hash = hashlib.sha1(wrapper_header_collection.encode("utf-8"))
+            self.ast_path = os.path.join(
+                os.path.abspath(cache_dir), f"cppwg_{path_hash.hexdigest()}.ast"
+            )
+
+        self.translation_unit: Optional[cindex.TranslationUnit] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle the parser without its translation unit e.g. for a worker."""
+        state = self.__dict__.copy()
+        state["translation_unit"] = None
+        return state
+
+    @staticmethod
+    def libclang_version() -> str:
+        """
+        Get the libclang version string.
+
+        Returns
+        -------
+        str
+            The version string e.g. "libclang version 18.1.1"
+        """
+        lib = cindex.conf.lib
+        lib.clang_getClangVersion.restype = cindex._CXString
+        version = cindex._CXString.from_result(lib.clang_getClangVersion())
+
+        match = re.search(r"\d+\.\d+\.\d+", version)
+        return f"libclang version {match.group(0) if match else version}"
+
+    def get_system_includes(self) -> List[str]:
+        """
+        Get the system include paths that CastXML uses.
+
+        Returns
+        -------
+        List[str]
+            The system include paths, including the clang builtin headers
+        """
+        if self.system_includes is None:
+            output = subprocess.run(
+                [self.castxml_binary, "-E", "-v", "-x", "c++", os.devnull]
+                + shlex.split(self.castxml_cflags),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            ).stderr.decode("utf-8", errors="replace")
+
+            match = re.search(
+                r"#include <\.\.\.> search starts here:\n(.*?)End of search list",
+                output,
+                re.DOTALL,
+            )
+
+            self.system_includes = []
+            if match:
+                self.system_includes = [
+                    line.strip()
+                    for line in match.group(1).splitlines()
+                    if os.path.isdir(line.strip())
+                ]
+
+        return self.system_includes
+
+    def get_parse_args(self) -> List[str]:
+        """
+        Get the command line arguments for libclang.
+
+        Returns
+        -------
+        List[str]
+            The arguments e.g. ["-x", "c++", "-std=c++17", "-I/src"]
+        """
+        args = ["-x", "c++"] + shlex.split(self.castxml_cflags)
+        args += [f"-I{include_path}" for include_path in self.source_includes]
+
+        # Use CastXML's system headers in place of libclang's own, which are
+        # missing from some installations
+        system_includes = self.get_system_includes()
+        if system_includes:
+            args += ["-nostdinc", "-nostdinc++"]
+            for include_path in system_includes:
+                args += ["-isystem", include_path]
+
+        return args
+
+    def get_dependencies(self, translation_unit: "cindex.TranslationUnit") -> List[str]:
+        """
+        Get the files included in a translation unit.
+
+        Parameters
+        ----------
+        translation_unit : cindex.TranslationUnit
+            The parsed header collection
+
+        Returns
+        -------
+        List[str]
+            The header collection and every file it includes
+        """
+        filepaths = {self.wrapper_header_collection}
+        for include in translation_unit.get_includes():
+            filepaths.add(os.path.abspath(include.include.name))
+
+        return sorted(filepaths)
+
+    def write_depfile(self, dependencies: List[str]) -> None:
+        """
+        Write the header dependencies in the format CastXML writes them.
+
+        Parameters
+        ----------
+        dependencies : List[str]
+            The header collection and every file it includes
+        """
+        filepaths = [filepath.replace(" ", "\\ ") for filepath in dependencies]
+
+        with open(self.depfile, "w") as depfile:
+            depfile.write(f"{self.wrapper_header_collection}.o: \\\n  ")
+            depfile.write(" \\\n  ".join(filepaths) + "\n")
+
+    def load_translation_unit(
+        self, cache_key: str
+    ) -> Optional["cindex.TranslationUnit"]:
+        """
+        Load the saved translation unit if its inputs are unchanged.
+
+        Parameters
+        ----------
+        cache_key : str
+            The parse cache key for the current inputs
+
+        Returns
+        -------
+        Optional[cindex.TranslationUnit]
+            The translation unit, or None if there is no valid saved one
+        """
+        logger = logging.getLogger()
+
+        signature_path = f"{self.ast_path}.sig"
+        if not os.path.isfile(self.ast_path) or not os.path.isfile(signature_path):
+            return None
+
+        try:
+            with open(signature_path, "rb") as signature_file:
+                ast_key: str = pickle.load(signature_file)
+                dependencies: Dict[str, Tuple[int, int, str]] = pickle.load(
+                    signature_file
+                )
+        except (pickle.UnpicklingError, EOFError, ValueError):
+            logger.warning(f"Ignoring corrupt translation unit: {signature_path}")
+            return None
+
+        if ast_key != cache_key:
+            return None
+
+        stale_filepath = find_stale_dependency(dependencies)
+        if stale_filepath:
+            logger.info(f"Translation unit is stale: {stale_filepath} changed.")
+            return None
+
+        try:
+            translation_unit = cindex.TranslationUnit.from_ast_file(self.ast_path)
+        except cindex.TranslationUnitLoadError:
+            logger.warning(f"Ignoring corrupt translation unit: {self.ast_path}")
+            return None
+
+        logger.info(f"Loaded translation unit: {self.ast_path}")
+
+        return translation_unit
+
+    def save_translation_unit(
+        self, translation_unit: "cindex.TranslationUnit", cache_key: str
+    ) -> None:
+        """
+        Save the translation unit to the cache directory.
+
+        Parameters
+        ----------
+        translation_unit : cindex.TranslationUnit
+            The parsed header collection
+        cache_key : str
+            The parse cache key for the current inputs
+        """
+        logger = logging.getLogger()
+
+        os.makedirs(os.path.dirname(self.ast_path), exist_ok=True)
+
+        try:
+            translation_unit.save(self.ast_path)
+        except cindex.TranslationUnitSaveError:
+            logger.warning(f"Could not save translation unit: {self.ast_path}")
+            return
+
+        with open(f"{self.ast_path}.sig", "wb") as signature_file:
+            pickle.dump(cache_key, signature_file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(
+                sign_dependencies(self.get_dependencies(translation_unit)),
+                signature_file,
+                pickle.HIGHEST_PROTOCOL,
+            )
+
+        logger.info(f"Saved translation unit: {self.ast_path}")
+
+    def parse_translation_unit(self) -> "cindex.TranslationUnit":
+        """
+        Parse the header collection with libclang.
+
+        The translation unit from a previous parse is reparsed, and a saved
+        translation unit is loaded if its inputs are unchanged.
+
+        Returns
+        -------
+        cindex.TranslationUnit
+            The parsed header collection
+        """
+        logger = logging.getLogger()
+
+        if self.translation_unit is not None:
+            logger.info("Reparsing translation unit.")
+            self.translation_unit.reparse()
+            return self.translation_unit
+
+        cache_key = ""
+        if self.ast_path:
+            cache_key = self.get_cache_key()
+            translation_unit = self.load_translation_unit(cache_key)
+            if translation_unit is not None:
+                return translation_unit
+
+        logger.info("Parsing source code for declarations with libclang.")
+
+        options = (
+            cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES
+            | cindex.TranslationUnit.PARSE_PRECOMPILED_PREAMBLE
+        )
+
+        # Translation units saved with a preamble can't be loaded, so only
+        # build it up front if not saving; it's built on reparse otherwise
+        if not self.ast_path:
+            options |= PARSE_CREATE_PREAMBLE_ON_FIRST_PARSE
+
+        translation_unit = cindex.Index.create().parse(
+            self.wrapper_header_collection,
+            args=self.get_parse_args(),
+            options=options,
+        )
+
+        if self.ast_path:
+            self.save_translation_unit(translation_unit, cache_key)
+
+        if not self.low_memory:
+            self.translation_unit = translation_unit
+
+        return translation_unit
+
+    def run_castxml(self) -> List[declaration_t]:
+        """
+        Parse the header collection with libclang in place of CastXML.
+
+        Returns
+        -------
+        List[declaration_t]
+            The global namespace built from the translation unit
+        """
+        logger = logging.getLogger()
+
+        translation_unit = self.parse_translation_unit()
+
+        errors = [
+            diagnostic
+            for diagnostic in translation_unit.diagnostics
+            if diagnostic.severity >= cindex.Diagnostic.Error
+        ]
+        if errors:
+            for diagnostic in errors:
+                logger.error(str(diagnostic))
+            raise RuntimeError(f"Error parsing {self.wrapper_header_collection}")
+
+        if self.cache or self.track_dependencies:
+            self.write_depfile(self.get_dependencies(translation_unit))
+
+        converter = CppLibclangConverter(
+            self.is_source_file, utils.cxx_standard(self.castxml_cflags)
+        )
+
+        return [converter.convert(translation_unit)]
@@ -15,7 +15,10 @@ from cppwg.input.free_function_info import CppFreeFunctionInfo
 from cppwg.input.module_info import ModuleInfo
 from cppwg.input.package_info import PackageInfo
 from cppwg.utils import utils
-from cppwg.utils.constants import CPPWG_SOURCEROOT_STRING
+from cppwg.utils.constants import (
+    CPPWG_DEFAULT_TEMPLATE_INSTANTIATION,
+    CPPWG_SOURCEROOT_STRING,
+)
 
 
 class PackageInfoParser:
@@ -134,6 +137,10 @@ class PackageInfoParser:
             "name": "cppwg_package",
             "common_include_file": True,
             "source_hpp_patterns": ["*.hpp"],
+            "source_hpp_excludes": [],
+            "castxml_pch": [],
+            "castxml_start_namespaces": None,
+            "template_instantiation": CPPWG_DEFAULT_TEMPLATE_INSTANTIATION,
         }
         package_config.update(global_config)
 
@@ -256,4 +263,7 @@ class PackageInfoParser:
                     variable_info.module_info = module_info
                     module_info.variable_info_collection.append(variable_info)
 
+        # Resolve the configuration inherited through the hierarchy up front
+        self.package_info.resolve_hierarchy_attributes()
+
         return self.package_info
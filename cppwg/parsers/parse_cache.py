@@ -0,0 +1,375 @@
+"""On-disk cache for C++ declarations parsed by CastXML and pygccxml."""
+
+import hashlib
+import logging
+import os
+import pickle
+from typing import Dict, List, Optional, Tuple, Union
+
+from pygccxml import __version__ as pygccxml_version
+from pygccxml.declarations import declaration_t, make_flatten
+from pygccxml.parser.declarations_cache import file_signature
+
+from cppwg.utils.constants import CPPWG_CACHE_EXT, CPPWG_DEFAULT_CACHE_MAX_SIZE
+
+
+def sign_dependencies(dependencies: List[str]) -> Dict[str, Tuple[int, int, str]]:
+    """
+    Record the stat and content hash of each dependency.
+
+    Parameters
+    ----------
+    dependencies : List[str]
+        The paths to the files to sign
+
+    Returns
+    -------
+    Dict[str, Tuple[int, int, str]]
+        The mtime, size and hash of each existing file, keyed by path
+    """
+    signatures: Dict[str, Tuple[int, int, str]] = {}
+
+    for filepath in sorted(dependencies):
+        if os.path.isfile(filepath):
+            stat = os.stat(filepath)
+            signatures[filepath] = (
+                stat.st_mtime_ns,
+                stat.st_size,
+                file_signature(filepath),
+            )
+
+    return signatures
+
+
+def find_stale_dependency(signatures: Dict[str, Tuple[int, int, str]]) -> Optional[str]:
+    """
+    Find a dependency that has changed since it was signed.
+
+    Parameters
+    ----------
+    signatures : Dict[str, Tuple[int, int, str]]
+        The dependency signatures from sign_dependencies
+
+    Returns
+    -------
+    Optional[str]
+        The path to the first removed or changed file, or None if none changed
+    """
+    for filepath, (mtime_ns, size, signature) in signatures.items():
+        if not os.path.isfile(filepath):
+            return filepath
+
+        # Only hash files whose stat has changed e.g. touched files
+        stat = os.stat(filepath)
+        if stat.st_mtime_ns == mtime_ns and stat.st_size == size:
+            continue
+
+        if file_signature(filepath) != signature:
+            return filepath
+
+    return None
+
+
+class CppParseCache:
+    """
+    Content-addressed on-disk cache for parsed C++ declarations.
+
+    Each cache entry is keyed by a hash of the header collection path and
+    contents, the CastXML cflags, the source include paths, the CastXML
+    version, the precompiled header and the parse modes that change the
+    declarations stored. An entry
+    also records a hash of every file included while parsing, as reported in
+    the CastXML depfile, so that a change to any transitively included header
+    invalidates it, even one that only defines macros. An entry can also refer
+    to the declarations stored under another key, e.g. one parse of a whole
+    header collection shared by the entries for each of its shards. The total
+    size of the cache is bounded by evicting the least recently used entries.
+
+    Attributes
+    ----------
+    cache_dir : str
+        The directory holding the cache entries
+    max_size : int
+        The maximum total size of the cache entries in bytes
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = CPPWG_DEFAULT_CACHE_MAX_SIZE):
+        self.cache_dir: str = os.path.abspath(cache_dir)
+        self.max_size: int = max_size
+
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def entry_path(self, key: str) -> str:
+        """
+        Get the path to the cache entry for a key.
+
+        Parameters
+        ----------
+        key : str
+            The cache key
+
+        Returns
+        -------
+        str
+            The path to the cache entry file
+        """
+        return os.path.join(self.cache_dir, key + CPPWG_CACHE_EXT)
+
+    def has_entry(self, key: str) -> bool:
+        """
+        Check whether there is a cache entry for a key, stale or not.
+
+        Parameters
+        ----------
+        key : str
+            The cache key
+
+        Returns
+        -------
+        bool
+            True if an entry has been stored under the key
+        """
+        return os.path.isfile(self.entry_path(key))
+
+    @staticmethod
+    def key(
+        header_collection: str,
+        castxml_cflags: str,
+        source_includes: List[str],
+        castxml_version: str,
+        castxml_start: Optional[List[str]] = None,
+        stream_xml: bool = False,
+        low_memory: bool = False,
+        castxml_pch: Optional[str] = None,
+    ) -> str:
+        """
+        Compute the cache key for a parse.
+
+        Parameters
+        ----------
+        header_collection : str
+            The path to the header collection file
+        castxml_cflags : str
+            The cflags passed to CastXML
+        source_includes : List[str]
+            The list of source include paths
+        castxml_version : str
+            The CastXML version string
+        castxml_start : Optional[List[str]]
+            The declarations CastXML starts its output from, if restricted
+        stream_xml : bool
+            Whether out-of-tree declarations are dropped from the CastXML output
+        low_memory : bool
+            Whether declarations not referenced from the source tree are released
+        castxml_pch : Optional[str]
+            The path to the precompiled header passed to CastXML, if any
+
+        Returns
+        -------
+        str
+            The cache key
+        """
+        sig = hashlib.sha1()
+
+        # Declarations such as explicit instantiations are located in the header
+        # collection itself, so its path is part of the key as well as its contents.
+        sig.update(header_collection.encode("utf-8"))
+        with open(header_collection, "rb") as hpp_file:
+            sig.update(hpp_file.read())
+
+        sig.update(castxml_cflags.encode("utf-8"))
+        for include_path in source_includes:
+            sig.update(include_path.encode("utf-8"))
+        sig.update(castxml_version.encode("utf-8"))
+        for start_decl in castxml_start or []:
+            sig.update(start_decl.encode("utf-8"))
+        sig.update(f"stream_xml={stream_xml},low_memory={low_memory}".encode("utf-8"))
+
+        # The PCH changes the preprocessor state. A rebuilt PCH has a new mtime,
+        # which is cheaper to check than hashing the whole PCH.
+        if castxml_pch:
+            sig.update(castxml_pch.encode("utf-8"))
+            if os.path.isfile(castxml_pch):
+                stat = os.stat(castxml_pch)
+                sig.update(f"{stat.st_mtime_ns},{stat.st_size}".encode("utf-8"))
+
+        # Pickled declarations are only compatible with the same pygccxml
+        sig.update(pygccxml_version.encode("utf-8"))
+
+        return sig.hexdigest()
+
+    def load(
+        self, key: str, header_collection: Optional[str] = None
+    ) -> Optional[Tuple[List[declaration_t], List[str]]]:
+        """
+        Load the declarations cached under a key.
+
+        Parameters
+        ----------
+        key : str
+            The cache key
+        header_collection : Optional[str]
+            The path to the header collection being parsed. Declarations that an
+            entry refers to and that are located in the other parse's header
+            collection, such as explicit instantiations, are located in this
+            header collection instead.
+
+        Returns
+        -------
+        Optional[Tuple[List[declaration_t], List[str]]]
+            The cached declarations and the files the entry depends on, or None
+            if there is no valid entry
+        """
+        logger = logging.getLogger()
+
+        entry_path = self.entry_path(key)
+        if not os.path.isfile(entry_path):
+            return None
+
+        try:
+            with open(entry_path, "rb") as entry_file:
+                # The dependency hashes are stored ahead of the declarations so
+                # that stale entries can be rejected without unpickling them.
+                dependencies: Dict[str, Tuple[int, int, str]] = pickle.load(entry_file)
+
+                stale_filepath = find_stale_dependency(dependencies)
+                if stale_filepath:
+                    logger.info(
+                        f"Parse cache entry is stale: {stale_filepath} changed."
+                    )
+                    return None
+
+                # Either the declarations or the key and header collection of
+                # the entry holding them
+                entry: Union[List[declaration_t], Tuple[str, str]] = pickle.load(
+                    entry_file
+                )
+
+        except (pickle.UnpicklingError, AttributeError, EOFError, ImportError):
+            logger.warning(f"Ignoring corrupt parse cache entry: {entry_path}")
+            return None
+
+        # Mark the entry as recently used
+        os.utime(entry_path)
+
+        if isinstance(entry, tuple):
+            target_key, target_header_collection = entry
+
+            target_entry = self.load(target_key)
+            if target_entry is None:
+                return None
+            decls = target_entry[0]
+
+            # The declarations have just been unpickled, so aren't shared
+            if header_collection:
+                for decl in make_flatten(decls):
+                    if (
+                        decl.location
+                        and decl.location.file_name == target_header_collection
+                    ):
+                        decl.location.file_name = header_collection
+
+            return decls, sorted(dependencies)
+
+        logger.info(f"Loaded declarations from parse cache: {entry_path}")
+
+        return entry, sorted(dependencies)
+
+    def store(
+        self, key: str, decls: List[declaration_t], dependencies: List[str]
+    ) -> None:
+        """
+        Store declarations in the cache under a key.
+
+        Parameters
+        ----------
+        key : str
+            The cache key
+        decls : List[declaration_t]
+            The declarations to cache
+        dependencies : List[str]
+            The files that were included while parsing the declarations
+        """
+        logger = logging.getLogger()
+
+        dependency_signatures = sign_dependencies(dependencies)
+
+        # Write to a temporary file first so that a concurrent or interrupted
+        # run never sees a partially written entry.
+        entry_path = self.entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "wb") as entry_file:
+            pickle.dump(dependency_signatures, entry_file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(decls, entry_file, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp_path, entry_path)
+
+        logger.info(f"Stored declarations in parse cache: {entry_path}")
+
+        self.evict()
+
+    def store_reference(
+        self,
+        key: str,
+        target_key: str,
+        target_header_collection: str,
+        dependencies: List[str],
+    ) -> None:
+        """
+        Store a reference to the declarations cached under another key.
+
+        Parameters
+        ----------
+        key : str
+            The cache key
+        target_key : str
+            The key of the entry holding the declarations
+        target_header_collection : str
+            The path to the header collection the declarations were parsed from
+        dependencies : List[str]
+            The files that were included while parsing the declarations
+        """
+        logger = logging.getLogger()
+
+        entry_path = self.entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "wb") as entry_file:
+            pickle.dump(
+                sign_dependencies(dependencies), entry_file, pickle.HIGHEST_PROTOCOL
+            )
+            pickle.dump(
+                (target_key, target_header_collection),
+                entry_file,
+                pickle.HIGHEST_PROTOCOL,
+            )
+
+        os.replace(tmp_path, entry_path)
+
+        logger.info(f"Stored parse cache reference to {target_key}: {entry_path}")
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_size."""
+        logger = logging.getLogger()
+
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(CPPWG_CACHE_EXT):
+                filepath = os.path.join(self.cache_dir, filename)
+                stat = os.stat(filepath)
+                entries.append((stat.st_mtime, stat.st_size, filepath))
+
+        total_size = sum(size for _, size, _ in entries)
+
+        # Evict oldest first, but always keep the most recent entry
+        entries.sort()
+        for _, size, filepath in entries[:-1]:
+            if total_size <= self.max_size:
+                break
+            logger.info(f"Evicting parse cache entry: {filepath}")
+            os.remove(filepath)
+            total_size -= size
@@ -0,0 +1,281 @@
+"""Builder for precompiled headers used when parsing with CastXML."""
+
+import hashlib
+import logging
+import os
+import re
+import shlex
+import subprocess
+import tempfile
+from typing import List, Optional
+
+from pygccxml import parser
+
+from cppwg.utils import utils
+from cppwg.utils.constants import CPPWG_PCH_HEADER_FILENAME
+
+# Matches the clang version in `clang --version` and `castxml --version` output
+CLANG_VERSION_REGEX = re.compile(r"clang version (\S+)")
+
+
+class CppPchBuilder:
+    """
+    Builds a clang precompiled header (PCH) of third-party headers.
+
+    CastXML spends most of its time parsing large third-party headers such as
+    Boost, PETSc or VTK, which rarely change. These can be precompiled once and
+    passed to every CastXML run with `-include-pch`.
+
+    CastXML cannot emit a PCH itself, so the PCH is built with a separate clang
+    compiler. This must be the same clang that CastXML is built against (e.g.
+    the distribution clang for a distribution CastXML package), as clang
+    rejects PCH files from other versions. The PCH is not built if the clang
+    versions differ, and a PCH is only used once CastXML has been checked to
+    accept it, emulating the PCH compiler so that the predefined macros match.
+    The PCH is keyed by a hash of the header list, the flags and the compiler
+    version, and is rebuilt if any of the headers it includes change.
+
+    Attributes
+    ----------
+    pch_headers : List[str]
+        The headers to precompile e.g. ["<vector>", "petsc.h"]
+    pch_compiler : str
+        The path to the clang compiler used to build the PCH
+    castxml_binary : str
+        The path to the CastXML binary the PCH is used with
+    source_includes : List[str]
+        The list of source include paths
+    castxml_cflags : str
+        Optional cflags to be passed to CastXML e.g. "-std=c++17"
+    wrapper_root : str
+        The output directory for the PCH header
+    output_dir : str
+        The directory to save the PCH to
+    """
+
+    def __init__(
+        self,
+        pch_headers: List[str],
+        pch_compiler: str,
+        castxml_binary: str,
+        source_includes: List[str],
+        castxml_cflags: str,
+        wrapper_root: str,
+        output_dir: str,
+    ):
+        self.pch_headers: List[str] = pch_headers
+        self.pch_compiler: str = pch_compiler
+        self.castxml_binary: str = castxml_binary
+        self.source_includes: List[str] = source_includes
+        self.castxml_cflags: str = castxml_cflags
+        self.wrapper_root: str = wrapper_root
+        self.output_dir: str = output_dir
+
+    def write_pch_header(self) -> str:
+        """
+        Write a header file that includes all the headers to precompile.
+
+        Returns
+        -------
+        str
+            The path to the PCH header file
+        """
+        hpp_string = ""
+        for pch_header in self.pch_headers:
+            if pch_header[0] == "<":
+                # e.g. #include <vector>
+                hpp_string += f"#include {pch_header}\n"
+            else:
+                # e.g. #include "petsc.h"
+                hpp_string += f'#include "{pch_header}"\n'
+
+        pch_header_path = os.path.join(self.wrapper_root, CPPWG_PCH_HEADER_FILENAME)
+
+        # Avoid touching an unchanged header so the PCH isn't considered stale
+        if os.path.isfile(pch_header_path):
+            with open(pch_header_path, "r") as hpp_file:
+                if hpp_file.read() == hpp_string:
+                    return pch_header_path
+
+        with open(pch_header_path, "w") as hpp_file:
+            hpp_file.write(hpp_string)
+
+        return pch_header_path
+
+    def is_stale(self, pch_path: str, depfile_path: str) -> bool:
+        """
+        Check whether a PCH needs to be rebuilt.
+
+        Parameters
+        ----------
+        pch_path : str
+            The path to the PCH
+        depfile_path : str
+            The path to the depfile written when the PCH was built
+
+        Returns
+        -------
+        bool
+            True if the PCH is missing, older than any file it includes, or
+            includes a file that no longer exists
+        """
+        if not os.path.isfile(pch_path) or not os.path.isfile(depfile_path):
+            return True
+
+        pch_mtime = os.path.getmtime(pch_path)
+
+        for filepath in utils.read_depfile(depfile_path, existing_only=False):
+            if not os.path.isfile(filepath) or os.path.getmtime(filepath) > pch_mtime:
+                return True
+
+        return False
+
+    def is_accepted(self, pch_path: str, castxml_clang_version: str) -> bool:
+        """
+        Check whether CastXML accepts a PCH.
+
+        CastXML parses an empty header with the PCH, configured as when parsing
+        the header collection. Acceptance is recorded in a stamp file next to
+        the PCH, holding CastXML's clang version, so later runs skip the check.
+
+        Parameters
+        ----------
+        pch_path : str
+            The path to the PCH
+        castxml_clang_version : str
+            The clang version CastXML is built against
+
+        Returns
+        -------
+        bool
+            True if CastXML parsed the empty header with the PCH
+        """
+        logger = logging.getLogger()
+
+        stamp_path = pch_path + ".accepted"
+        if os.path.isfile(stamp_path) and os.path.getmtime(
+            stamp_path
+        ) >= os.path.getmtime(pch_path):
+            with open(stamp_path, "r") as stamp_file:
+                if stamp_file.read() == castxml_clang_version:
+                    return True
+
+        xml_generator_config = parser.xml_generator_configuration_t(
+            xml_generator_path=self.castxml_binary,
+            xml_generator="castxml",
+            compiler_path=self.pch_compiler,
+            cflags=f"{self.castxml_cflags} -include-pch {shlex.quote(pch_path)}",
+            include_paths=self.source_includes,
+        )
+
+        with tempfile.TemporaryDirectory() as probe_dir:
+            probe_path = os.path.join(probe_dir, "pch_probe.hpp")
+            with open(probe_path, "w"):
+                pass
+
+            try:
+                parser.source_reader_t(xml_generator_config).create_xml_file(
+                    probe_path, os.path.join(probe_dir, "pch_probe.xml")
+                )
+            except RuntimeError as error:
+                logger.warning(
+                    f"CastXML rejected the precompiled header {pch_path} - "
+                    f"parsing without it.\n{error}"
+                )
+                return False
+
+        with open(stamp_path, "w") as stamp_file:
+            stamp_file.write(castxml_clang_version)
+
+        return True
+
+    def build(self) -> Optional[str]:
+        """
+        Build the PCH if needed.
+
+        Returns
+        -------
+        Optional[str]
+            The path to the PCH, or None if it could not be built
+        """
+        logger = logging.getLogger()
+
+        if not self.pch_headers:
+            return None
+
+        try:
+            compiler_version = subprocess.check_output(
+                [self.pch_compiler, "--version"], stderr=subprocess.STDOUT
+            )
+        except (OSError, subprocess.CalledProcessError):
+            logger.warning(f"Could not run PCH compiler: {self.pch_compiler}")
+            return None
+
+        # clang only accepts PCH files from the same version
+        castxml_version = subprocess.check_output([self.castxml_binary, "--version"])
+        castxml_clang_match = CLANG_VERSION_REGEX.search(
+            castxml_version.decode("utf-8", errors="replace")
+        )
+        compiler_clang_match = CLANG_VERSION_REGEX.search(
+            compiler_version.decode("utf-8", errors="replace")
+        )
+        if not castxml_clang_match or not compiler_clang_match:
+            logger.warning(
+                f"Could not find the clang versions of {self.pch_compiler} and "
+                f"{self.castxml_binary} - parsing without a precompiled header."
+            )
+            return None
+
+        castxml_clang_version = castxml_clang_match.group(1)
+        if compiler_clang_match.group(1) != castxml_clang_version:
+            logger.warning(
+                f"PCH compiler {self.pch_compiler} is clang "
+                f"{compiler_clang_match.group(1)}, but CastXML is built against "
+                f"clang {castxml_clang_version} - parsing without a precompiled "
+                "header."
+            )
+            return None
+
+        pch_header_path = self.write_pch_header()
+
+        # Key the PCH by everything that affects its contents
+        sig = hashlib.sha1()
+        sig.update(compiler_version)
+        sig.update(self.castxml_cflags.encode("utf-8"))
+        for include_path in self.source_includes:
+            sig.update(include_path.encode("utf-8"))
+        for pch_header in self.pch_headers:
+            sig.update(pch_header.encode("utf-8"))
+
+        pch_path = os.path.join(self.output_dir, f"cppwg_{sig.hexdigest()}.pch")
+        depfile_path = pch_path + ".d"
+
+        if not self.is_stale(pch_path, depfile_path):
+            if not self.is_accepted(pch_path, castxml_clang_version):
+                return None
+
+            logger.info(f"Using precompiled header: {pch_path}")
+            return pch_path
+
+        if not os.path.isdir(self.output_dir):
+            os.makedirs(self.output_dir)
+
+        cmd = [self.pch_compiler, "-x", "c++-header"]
+        cmd += shlex.split(self.castxml_cflags)
+        cmd += [f"-I{include_path}" for include_path in self.source_includes]
+        cmd += ["-MD", "-MF", depfile_path, pch_header_path, "-o", pch_path]
+
+        logger.info(f"Building precompiled header: {pch_path}")
+        try:
+            subprocess.check_output(cmd, stderr=subprocess.STDOUT)
+        except subprocess.CalledProcessError as error:
+            logger.warning(
+                "Could not build precompiled header - parsing without it.\n"
+                + error.output.decode("utf-8", errors="replace")
+            )
+            return None
+
+        if not self.is_accepted(pch_path, castxml_clang_version):
+            return None
+
+        return pch_path
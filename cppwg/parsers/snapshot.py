@@ -0,0 +1,184 @@
+"""Snapshot of the source declarations from a previous run."""
+
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+from typing import Dict, List, Optional, Tuple
+
+from pygccxml.declarations.namespace import namespace_t
+
+from cppwg.parsers.parse_cache import (
+    CppParseCache,
+    find_stale_dependency,
+    sign_dependencies,
+)
+from cppwg.utils.constants import CPPWG_SNAPSHOT_FILENAME
+
+
+class CppDeclarationSnapshot:
+    """
+    Binary snapshot of the filtered source declarations in the wrapper root.
+
+    Unlike the parse cache, which stores every declaration CastXML produced
+    for a header collection, the snapshot stores only the source namespace
+    that the writers work with. A warm run with unchanged inputs loads it
+    through a memory map and skips CastXML, XML reading and filtering. The
+    source declarations are pickled along with their enclosing scopes, so the
+    caller should prune out-of-tree declarations that the source tree does not
+    reference before storing the snapshot.
+
+    Attributes
+    ----------
+    snapshot_path : str
+        The path to the snapshot file
+    """
+
+    def __init__(self, wrapper_root: str):
+        self.snapshot_path: str = os.path.join(wrapper_root, CPPWG_SNAPSHOT_FILENAME)
+
+    @staticmethod
+    def key(
+        header_collections: List[str],
+        castxml_cflags: str,
+        source_includes: List[str],
+        castxml_version: str,
+        castxml_start: Optional[List[str]] = None,
+        stream_xml: bool = False,
+        low_memory: bool = False,
+        castxml_pch: Optional[str] = None,
+    ) -> str:
+        """
+        Compute the snapshot key for a set of header collections.
+
+        Parameters
+        ----------
+        header_collections : List[str]
+            The paths to the header collection files that were parsed
+        castxml_cflags : str
+            The cflags passed to CastXML
+        source_includes : List[str]
+            The list of source include paths
+        castxml_version : str
+            The CastXML version string
+        castxml_start : Optional[List[str]]
+            The declarations CastXML starts its output from, if restricted
+        stream_xml : bool
+            Whether the CastXML output was filtered down to the source tree
+        low_memory : bool
+            Whether unreferenced declarations were released after filtering
+        castxml_pch : Optional[str]
+            The path to the precompiled header passed to CastXML, if any
+
+        Returns
+        -------
+        str
+            The snapshot key
+        """
+        sig = hashlib.sha1()
+
+        for header_collection in header_collections:
+            collection_key = CppParseCache.key(
+                header_collection,
+                castxml_cflags,
+                source_includes,
+                castxml_version,
+                castxml_start,
+                stream_xml,
+                low_memory,
+                castxml_pch,
+            )
+            sig.update(collection_key.encode("utf-8"))
+
+        return sig.hexdigest()
+
+    def load(self, key: str) -> Optional[namespace_t]:
+        """
+        Load the source namespace if the snapshot matches the key.
+
+        Parameters
+        ----------
+        key : str
+            The snapshot key for the current inputs
+
+        Returns
+        -------
+        Optional[namespace_t]
+            The snapshot source namespace, or None if there is no valid snapshot
+        """
+        logger = logging.getLogger()
+
+        if not os.path.isfile(self.snapshot_path):
+            return None
+
+        try:
+            with open(self.snapshot_path, "rb") as snapshot_file, mmap.mmap(
+                snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as snapshot_map:
+                # The key and dependency hashes are stored ahead of the source
+                # namespace so that stale snapshots are rejected without
+                # unpickling the declarations.
+                snapshot_key: str = pickle.load(snapshot_map)
+                if snapshot_key != key:
+                    logger.info("Declaration snapshot is stale: inputs changed.")
+                    return None
+
+                dependencies: Dict[str, Tuple[int, int, str]] = pickle.load(
+                    snapshot_map
+                )
+
+                stale_filepath = find_stale_dependency(dependencies)
+                if stale_filepath:
+                    logger.info(
+                        f"Declaration snapshot is stale: {stale_filepath} changed."
+                    )
+                    return None
+
+                source_ns: namespace_t = pickle.load(snapshot_map)
+
+        except (
+            pickle.UnpicklingError,
+            AttributeError,
+            EOFError,
+            ImportError,
+            ValueError,
+        ):
+            logger.warning(
+                f"Ignoring corrupt declaration snapshot: {self.snapshot_path}"
+            )
+            return None
+
+        logger.info(f"Loaded source declarations from snapshot: {self.snapshot_path}")
+
+        return source_ns
+
+    def store(self, key: str, source_ns: namespace_t, dependencies: List[str]) -> None:
+        """
+        Write the source namespace to the snapshot.
+
+        Parameters
+        ----------
+        key : str
+            The snapshot key for the current inputs
+        source_ns : namespace_t
+            The namespace containing C++ declarations from the source tree
+        dependencies : List[str]
+            The files that were included while parsing the declarations
+        """
+        logger = logging.getLogger()
+
+        # Write to a temporary file first so that an interrupted run never
+        # leaves a partially written snapshot.
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "wb") as snapshot_file:
+            pickle.dump(key, snapshot_file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(
+                sign_dependencies(dependencies), snapshot_file, pickle.HIGHEST_PROTOCOL
+            )
+            pickle.dump(source_ns, snapshot_file, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp_path, self.snapshot_path)
+
+        logger.info(f"Stored source declarations in snapshot: {self.snapshot_path}")
@@ -1,13 +1,19 @@
 """Parser for C++ source code."""
 
+import gc
 import logging
-from pathlib import Path
-from typing import List, Optional
+import os
+import shlex
+from typing import Dict, List, Optional, Set, Tuple
 
 from pygccxml import declarations, parser
 from pygccxml.declarations import declaration_t
-from pygccxml.declarations.mdecl_wrapper import mdecl_wrapper_t
 from pygccxml.declarations.namespace import namespace_t
+from pygccxml.parser import declarations_joiner
+
+from cppwg.parsers.castxml_filter import CastXmlFilter
+from cppwg.parsers.parse_cache import CppParseCache
+from cppwg.utils import utils
 
 # declaration_t is the base type for all declarations in pygccxml including:
 # - class_declaration_t (pygccxml.declarations.class_declaration.class_declaration_t)
@@ -38,10 +44,40 @@ class CppSourceParser:
             The list of source include paths
         castxml_cflags : str
             Optional cflags to be passed to CastXML e.g. "-std=c++17"
+        castxml_version : str
+            The CastXML version string, used to key cached parse results
+        cache : Optional[CppParseCache]
+            Optional on-disk cache of parse results
+        depfile : str
+            The path to the header dependency file written by CastXML when
+            caching or tracking dependencies, stored next to the header collection
+        castxml_pch : Optional[str]
+            Optional path to a precompiled header to pass to CastXML
+        pch_compiler : Optional[str]
+            The compiler the precompiled header was built with, which CastXML
+            emulates when using it so that the predefined macros match
+        castxml_start : Optional[List[str]]
+            Optional namespaces to restrict the CastXML output to e.g. ["foo"]
+        stream_xml : bool
+            Stream the CastXML output and drop out-of-tree declarations before
+            pygccxml reads it
+        track_dependencies : bool
+            Have CastXML write the header dependencies even if not caching
+        low_memory : bool
+            Release declarations that are not referenced from the source tree
+            once the source namespace has been built
+        source_prefix : str
+            The source root path with a trailing separator, for prefix matching
+        source_files : Dict[str, bool]
+            Memoized results of is_source_file for each file seen
         global_ns : namespace_t
-            The namespace containing all parsed C++ declarations
+            The namespace containing all parsed C++ declarations; released
+            after filtering in low memory mode
         source_ns : namespace_t
             The namespace containing C++ declarations from the source tree
+        dependencies : List[str]
+            The files the parsed declarations depend on, from the cache entry
+            they were loaded from or the depfile of a fresh parse
     """
 
     def __init__(
@@ -51,59 +87,285 @@ class CppSourceParser:
         castxml_binary: str,
         source_includes: List[str],
         castxml_cflags: str = "",
+        castxml_version: str = "",
+        cache_dir: Optional[str] = None,
+        castxml_pch: Optional[str] = None,
+        castxml_start: Optional[List[str]] = None,
+        stream_xml: bool = False,
+        track_dependencies: bool = False,
+        low_memory: bool = False,
+        pch_compiler: Optional[str] = None,
     ):
         self.source_root: str = source_root
         self.wrapper_header_collection: str = wrapper_header_collection
         self.castxml_binary: str = castxml_binary
         self.source_includes: List[str] = source_includes
         self.castxml_cflags: str = castxml_cflags
+        self.castxml_version: str = castxml_version
+
+        self.cache: Optional[CppParseCache] = None
+        if cache_dir:
+            self.cache = CppParseCache(cache_dir)
+
+        self.depfile: str = os.path.splitext(wrapper_header_collection)[0] + ".d"
+
+        self.castxml_pch: Optional[str] = castxml_pch
+        self.pch_compiler: Optional[str] = pch_compiler
+        self.castxml_start: Optional[List[str]] = castxml_start
+        self.stream_xml: bool = stream_xml
+        self.track_dependencies: bool = track_dependencies
+        self.low_memory: bool = low_memory
+        self.source_prefix: str = os.path.join(os.path.normpath(source_root), "")
+        self.source_files: Dict[str, bool] = {}
 
         self.source_ns: Optional[namespace_t] = None
         self.global_ns: Optional[namespace_t] = None
+        self.dependencies: List[str] = []
 
-    def parse(self) -> namespace_t:
+    def is_source_file(self, file_name: str) -> bool:
         """
-        Parse the C++ source code from the header collection using CastXML and pygccxml.
+        Check whether a file's declarations belong to the source tree.
+
+        Declarations from the wrapper_header_collection file are included for
+        explicit instantiations, typedefs etc. The result is memoized, as most
+        declarations come from a handful of large third-party headers.
+
+        Parameters
+        ----------
+        file_name : str
+            The path to the file containing the declarations
 
         Returns
         -------
-        namespace_t
-            The namespace containing C++ declarations from the source tree
+        bool
+            True if the file is in the source tree or is the header collection
+        """
+        if file_name not in self.source_files:
+            self.source_files[file_name] = (
+                os.path.normpath(file_name).startswith(self.source_prefix)
+                or file_name == self.wrapper_header_collection
+            )
+
+        return self.source_files[file_name]
+
+    def get_cache_key(self) -> str:
+        """
+        Get the parse cache key for the header collection and parse options.
+
+        Returns
+        -------
+        str
+            The cache key
+        """
+        return CppParseCache.key(
+            self.wrapper_header_collection,
+            self.castxml_cflags,
+            self.source_includes,
+            self.castxml_version,
+            self.castxml_start,
+            self.stream_xml,
+            self.low_memory,
+            self.castxml_pch,
+        )
+
+    def read_depfile(self) -> List[str]:
+        """
+        Read the header dependencies written by CastXML.
+
+        Returns
+        -------
+        List[str]
+            Every file included while parsing the header collection, or an
+            empty list if no depfile was written
+        """
+        if not os.path.isfile(self.depfile):
+            return []
+
+        filepaths = set(utils.read_depfile(self.depfile))
+        filepaths.add(self.wrapper_header_collection)
+
+        return sorted(filepaths)
+
+    def read_declarations(
+        self, xml_generator_config: parser.xml_generator_configuration_t
+    ) -> List[declaration_t]:
+        """
+        Run CastXML on the header collection and build declarations with pygccxml.
+
+        If streaming, the XML written by CastXML is filtered down to the source
+        tree before pygccxml builds any declarations from it.
+
+        Parameters
+        ----------
+        xml_generator_config : parser.xml_generator_configuration_t
+            The CastXML configuration
+
+        Returns
+        -------
+        List[declaration_t]
+            The declarations parsed from the header collection
+        """
+        if not self.stream_xml:
+            return parser.parse(
+                files=[self.wrapper_header_collection],
+                config=xml_generator_config,
+                compilation_mode=parser.COMPILATION_MODE.ALL_AT_ONCE,
+            )
+
+        xml_path = os.path.splitext(self.wrapper_header_collection)[0] + ".xml"
+        filtered_xml_path = (
+            os.path.splitext(self.wrapper_header_collection)[0] + "_filtered.xml"
+        )
+
+        try:
+            reader = parser.source_reader_t(xml_generator_config)
+            reader.create_xml_file(self.wrapper_header_collection, xml_path)
+
+            CastXmlFilter(xml_path, self.is_source_file).filter(filtered_xml_path)
+            os.remove(xml_path)
+
+            decls = parser.parse_xml_file(filtered_xml_path, xml_generator_config)
+
+        finally:
+            for path in (xml_path, filtered_xml_path):
+                if os.path.isfile(path):
+                    os.remove(path)
+
+        # Join namespaces etc. split across the XML as pygccxml does when parsing
+        for decl in decls:
+            if isinstance(decl, namespace_t):
+                declarations_joiner.join_declarations(decl)
+
+        return decls
+
+    def run_castxml(self) -> List[declaration_t]:
+        """
+        Run CastXML on the header collection and read its output with pygccxml.
+
+        Returns
+        -------
+        List[declaration_t]
+            The declarations parsed from the header collection
         """
         logger = logging.getLogger()
 
+        # Have CastXML write the header dependencies when caching, so that the
+        # cached declarations can be checked against every included file. Any
+        # depfile from a previous run is removed so it can't be mistaken for
+        # this run's dependencies.
+        cflags = self.castxml_cflags
+        if self.cache or self.track_dependencies:
+            cflags += f" -MD -MF {shlex.quote(self.depfile)}"
+            if os.path.isfile(self.depfile):
+                os.remove(self.depfile)
+
+        pch_cflags = ""
+        compiler_path = None
+        if self.castxml_pch:
+            pch_cflags = f" -include-pch {shlex.quote(self.castxml_pch)}"
+            compiler_path = self.pch_compiler
+
         # Configure the XML generator (CastXML)
         xml_generator_config = parser.xml_generator_configuration_t(
             xml_generator_path=self.castxml_binary,
             xml_generator="castxml",
-            cflags=self.castxml_cflags,
+            compiler_path=compiler_path,
+            cflags=cflags + pch_cflags,
             include_paths=self.source_includes,
+            start_with_declarations=self.castxml_start,
         )
 
         # Parse all the C++ source code to extract declarations
         logger.info("Parsing source code for declarations.")
-        decls: List[declaration_t] = parser.parse(
-            files=[self.wrapper_header_collection],
-            config=xml_generator_config,
-            compilation_mode=parser.COMPILATION_MODE.ALL_AT_ONCE,
-        )
+        try:
+            return self.read_declarations(xml_generator_config)
+        except RuntimeError as error:
+            if not self.castxml_pch:
+                raise
+
+            # The PCH builder checks that CastXML accepts the PCH, but a parse
+            # error may still be caused by it
+            logger.warning(
+                f"Parsing with precompiled header failed - retrying without it.\n{error}"
+            )
+            xml_generator_config = parser.xml_generator_configuration_t(
+                xml_generator_path=self.castxml_binary,
+                xml_generator="castxml",
+                cflags=cflags,
+                include_paths=self.source_includes,
+                start_with_declarations=self.castxml_start,
+            )
+            return self.read_declarations(xml_generator_config)
+
+    def parse(self) -> namespace_t:
+        """
+        Parse the C++ source code from the header collection.
+
+        The header collection is parsed using CastXML and pygccxml, unless
+        its declarations are found in the parse cache.
+
+        Returns
+        -------
+        namespace_t
+            The namespace containing C++ declarations from the source tree
+        """
+        logger = logging.getLogger()
+
+        # Check for cached declarations from a previous parse of the same inputs
+        decls: Optional[List[declaration_t]] = None
+
+        if self.cache:
+            cache_key = self.get_cache_key()
+            cache_entry = self.cache.load(cache_key, self.wrapper_header_collection)
+            if cache_entry is not None:
+                decls, self.dependencies = cache_entry
+
+        if decls is None:
+            decls = self.run_castxml()
+
+            # Headers that only define macros declare nothing, so only the
+            # depfile lists every file the declarations depend on
+            if self.cache or self.track_dependencies:
+                self.dependencies = self.read_depfile()
+
+            if self.cache:
+                if self.dependencies:
+                    self.cache.store(cache_key, decls, self.dependencies)
+                else:
+                    logger.warning(
+                        "Not caching declarations: castxml wrote no header "
+                        f"dependencies to {self.depfile}."
+                    )
 
         # Get access to the global namespace
         self.global_ns: namespace_t = declarations.get_global_namespace(decls)
 
-        # Filter declarations for which files exist
+        # Filter declarations in our source tree
         logger.info("Filtering source declarations.")
-        query = declarations.custom_matcher_t(lambda decl: decl.location is not None)
-        filtered_decls: mdecl_wrapper_t = self.global_ns.decls(function=query)
-
-        # Filter declarations in our source tree; include declarations from the
-        # wrapper_header_collection file for explicit instantiations, typedefs etc.
-        source_decls: List[declaration_t] = [
-            decl
-            for decl in filtered_decls
-            if Path(self.source_root) in Path(decl.location.file_name).parents
-            or decl.location.file_name == self.wrapper_header_collection
-        ]
+        source_decls: List[declaration_t] = []
+        num_decls = 0
+        kept_files: Set[str] = set()
+        dropped_files: Set[str] = set()
+
+        for decl in declarations.make_flatten(self.global_ns.declarations):
+            # Skip declarations for which files don't exist
+            if decl.location is None:
+                continue
+            num_decls += 1
+
+            file_name = decl.location.file_name
+            if self.is_source_file(file_name):
+                source_decls.append(decl)
+                kept_files.add(file_name)
+            else:
+                dropped_files.add(file_name)
+
+        logger.info(
+            f"Kept {len(source_decls)} source declarations from "
+            f"{len(kept_files)} files; dropped "
+            f"{num_decls - len(source_decls)} declarations from "
+            f"{len(dropped_files)} files."
+        )
 
         # Create a source namespace module for the filtered declarations
         self.source_ns = namespace_t(name="source", declarations=source_decls)
@@ -112,4 +374,225 @@ class CppSourceParser:
         logger.info("Optimizing source declaration queries.")
         self.source_ns.init_optimizer()
 
+        if self.low_memory:
+            peak_memory = utils.get_peak_memory()
+
+            prune_declarations(source_decls)
+            self.global_ns = None
+            del decls
+            gc.collect()
+
+            logger.info(
+                f"Peak memory: {peak_memory or 0:.0f} MiB; after filtering: "
+                f"{utils.get_current_memory() or 0:.0f} MiB."
+            )
+
         return self.source_ns
+
+
+def referenced_declarations(decl: declaration_t) -> List[declaration_t]:
+    """
+    Get the declarations referred to by a declaration's types and bases.
+
+    Parameters
+    ----------
+    decl : declaration_t
+        The declaration to inspect
+
+    Returns
+    -------
+    List[declaration_t]
+        The declarations named by the declaration's return, argument,
+        variable and typedef types, and its base classes
+    """
+    types: List[declarations.type_t] = []
+
+    if isinstance(decl, declarations.calldef_t):
+        if decl.return_type is not None:
+            types.append(decl.return_type)
+        types += [argument.decl_type for argument in decl.arguments]
+
+    elif isinstance(decl, (declarations.variable_t, declarations.typedef_t)):
+        types.append(decl.decl_type)
+
+    referenced: List[declaration_t] = []
+
+    if isinstance(decl, declarations.class_t):
+        referenced += [base.related_class for base in decl.bases]
+
+    # Unwrap pointers, references, cv-qualifiers, function types etc.
+    while types:
+        decl_type = types.pop()
+
+        if isinstance(decl_type, declarations.declarated_t):
+            referenced.append(decl_type.declaration)
+
+        elif isinstance(decl_type, declarations.compound_t):
+            types.append(decl_type.base)
+
+        elif isinstance(decl_type, declarations.calldef_type_t):
+            types.append(decl_type.return_type)
+            types += decl_type.arguments_types
+
+    return referenced
+
+
+def prune_declarations(source_decls: List[declaration_t]) -> None:
+    """
+    Remove declarations that are not referenced from the source tree.
+
+    Source declarations keep their enclosing scopes alive through their
+    parent, so releasing the global namespace alone frees nothing, and
+    pickling them copies every declaration that was parsed. Instead, every
+    scope outside the source tree is pruned down to the declarations that
+    are reachable from the source declarations through parents, types and
+    base classes, so that the rest can be garbage collected.
+
+    Parameters
+    ----------
+    source_decls : List[declaration_t]
+        The declarations from the source tree
+    """
+    logger = logging.getLogger()
+
+    source_ids: Set[int] = {id(decl) for decl in source_decls}
+    referenced: Dict[int, declaration_t] = {}
+
+    stack: List[declaration_t] = list(source_decls)
+    while stack:
+        decl = stack.pop()
+        if decl is None or id(decl) in referenced:
+            continue
+        referenced[id(decl)] = decl
+
+        stack.append(decl.parent)
+        stack += referenced_declarations(decl)
+
+    for decl in referenced.values():
+        # Typedefs of a class e.g. `shared_ptr<Foo>::element_type` refer back
+        # to it, but don't need to be kept alive by it
+        if isinstance(decl, (declarations.class_t, declarations.class_declaration_t)):
+            decl.aliases = [alias for alias in decl.aliases if id(alias) in referenced]
+
+        if id(decl) in source_ids:
+            continue
+
+        if isinstance(decl, namespace_t):
+            decl.declarations = [
+                member for member in decl.declarations if id(member) in referenced
+            ]
+
+        elif isinstance(decl, declarations.class_t):
+            decl.public_members = [
+                member for member in decl.public_members if id(member) in referenced
+            ]
+            decl.protected_members = [
+                member for member in decl.protected_members if id(member) in referenced
+            ]
+            decl.private_members = [
+                member for member in decl.private_members if id(member) in referenced
+            ]
+            decl.derived = [
+                derived
+                for derived in decl.derived
+                if id(derived.related_class) in referenced
+            ]
+
+    logger.info(
+        f"Kept {len(referenced) - len(source_ids)} declarations referenced "
+        "from the source tree."
+    )
+
+
+def parse_in_worker(
+    source_parser: CppSourceParser,
+) -> Tuple[namespace_t, List[str]]:
+    """
+    Parse a header collection in a worker process.
+
+    The source namespace is pickled to return it to the parent process, so
+    unreferenced declarations are pruned first rather than copied back. The
+    parser's dependencies are returned with it, as the parser itself is not.
+
+    Parameters
+    ----------
+    source_parser : CppSourceParser
+        The parser for the header collection
+
+    Returns
+    -------
+    Tuple[namespace_t, List[str]]
+        The namespace containing C++ declarations from the source tree, and
+        the files they depend on
+    """
+    source_ns = source_parser.parse()
+
+    # Low memory parses have already been pruned
+    if source_parser.global_ns is not None:
+        prune_declarations(source_ns.declarations)
+
+    return source_ns, source_parser.dependencies
+
+
+def merge_source_namespaces(source_namespaces: List[namespace_t]) -> namespace_t:
+    """
+    Merge source namespaces parsed from separate header collections.
+
+    Declarations from headers shared between header collections are parsed
+    more than once. Duplicates are identified by their kind and signature, as
+    the location of a template instantiation depends on the header collection
+    it was instantiated from. Each outermost source declaration is merged
+    together with the source declarations it encloses, e.g. a class with its
+    members, so that every merged declaration's parent is merged too. Where
+    duplicate classes differ, the one with the most members is kept as it is
+    the most complete instantiation.
+
+    Parameters
+    ----------
+    source_namespaces : List[namespace_t]
+        The source namespaces to merge
+
+    Returns
+    -------
+    namespace_t
+        A single namespace containing the merged declarations
+    """
+    logger = logging.getLogger()
+    logger.info("Merging source declarations.")
+
+    # The outermost declarations and the declarations they enclose, keyed by
+    # the outermost declaration's kind and signature
+    merged_decls: Dict[Tuple[str, str], List[declaration_t]] = {}
+
+    for source_ns in source_namespaces:
+        source_ids: Set[int] = {id(decl) for decl in source_ns.declarations}
+
+        decl_groups: Dict[int, Tuple[declaration_t, List[declaration_t]]] = {}
+        for decl in source_ns.declarations:
+            outer_decl = decl
+            while id(outer_decl.parent) in source_ids:
+                outer_decl = outer_decl.parent
+            decl_groups.setdefault(id(outer_decl), (outer_decl, []))[1].append(decl)
+
+        for outer_decl, decl_group in decl_groups.values():
+            key = (type(outer_decl).__name__, str(outer_decl))
+
+            if key in merged_decls:
+                if not isinstance(outer_decl, declarations.class_t):
+                    continue
+                if len(decl_group) <= len(merged_decls[key]):
+                    continue
+
+            merged_decls[key] = decl_group
+
+    merged_ns = namespace_t(
+        name="source",
+        declarations=[
+            decl for decl_group in merged_decls.values() for decl in decl_group
+        ],
+    )
+
+    logger.info("Optimizing source declaration queries.")
+    merged_ns.init_optimizer()
+
+    return merged_ns
@@ -0,0 +1,201 @@
+"""Index of the template class signatures declared in source files."""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from cppwg.parsers.header_scanner import STRIP_REGEX
+
+TEMPLATE_REGEX = re.compile(r"\btemplate\s*<")
+
+# Matches a class definition following a template parameter list, up to the
+# base list or body e.g. `class Foo : public Bar<DIM>` or `class Foo final {`
+CLASS_REGEX = re.compile(r"\s*class\s+(\w+)\s*(?:final\s*)?(?=\{|:(?!:))")
+
+WHITESPACE_REGEX = re.compile(r"\s+")
+
+
+class CppTemplateIndex:
+    """
+    The template signatures of the classes defined in each source file.
+
+    Each file is read once, with comments, literals and directives removed, and
+    every `template <...> class Foo` definition is recorded, including those
+    split over several lines. Signatures are stored without whitespace e.g.
+    "<unsignedDIM_A,unsignedDIM_B>" so they can be compared with the template
+    substitutions in the package info.
+
+    Attributes
+    ----------
+    signatures : Dict[str, Dict[str, List[str]]]
+        The template signatures of each class, in the order they are defined,
+        keyed by file path and then by class name
+    """
+
+    def __init__(self):
+        self.signatures: Dict[str, Dict[str, List[str]]] = {}
+
+    @staticmethod
+    def scan_file(filepath: str) -> Dict[str, List[str]]:
+        """
+        Find the template class definitions in a file.
+
+        Parameters
+        ----------
+        filepath : str
+            The path to the source file
+
+        Returns
+        -------
+        Dict[str, List[str]]
+            The template signatures of each class defined in the file, keyed by
+            class name e.g. {"Foo": ["<unsignedDIM>"]}
+        """
+        with open(filepath, "r", errors="replace") as in_file:
+            content = STRIP_REGEX.sub(" ", in_file.read())
+
+        signatures: Dict[str, List[str]] = {}
+
+        for match in TEMPLATE_REGEX.finditer(content):
+            # Find the end of the parameter list, allowing for nested brackets
+            # e.g. template <typename T, typename A = std::allocator<T>>
+            start = match.end() - 1
+            angle_depth = 0
+            paren_depth = 0
+            end = None
+            for idx in range(start, len(content)):
+                char = content[idx]
+                if char in "{;":
+                    break
+                elif char == "(":
+                    paren_depth += 1
+                elif char == ")":
+                    paren_depth -= 1
+                elif paren_depth:
+                    # Skip comparisons in default arguments e.g. (N > 1)
+                    continue
+                elif char == "<":
+                    angle_depth += 1
+                elif char == ">":
+                    angle_depth -= 1
+                    if angle_depth == 0:
+                        end = idx + 1
+                        break
+
+            if end is None:
+                continue
+
+            class_match = CLASS_REGEX.match(content, end)
+            if not class_match:
+                continue
+
+            signature = WHITESPACE_REGEX.sub("", content[start:end])
+            signatures.setdefault(class_match.group(1), []).append(signature)
+
+        return signatures
+
+    def build(self, filepaths: List[str], max_workers: Optional[int] = None) -> None:
+        """
+        Scan files that have not been indexed yet, in parallel.
+
+        Parameters
+        ----------
+        filepaths : List[str]
+            The paths to the source files; missing files are skipped
+        max_workers : Optional[int]
+            The number of threads reading files; defaults to the
+            ThreadPoolExecutor default
+        """
+        filepaths = sorted(
+            {
+                filepath
+                for filepath in filepaths
+                if filepath not in self.signatures and os.path.isfile(filepath)
+            }
+        )
+        if not filepaths:
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for filepath, signatures in zip(
+                filepaths, executor.map(CppTemplateIndex.scan_file, filepaths)
+            ):
+                self.signatures[filepath] = signatures
+
+    def get_signatures(self, filepath: str, class_name: str) -> List[str]:
+        """
+        Get the template signatures of a class defined in a file.
+
+        The file is scanned if it is not in the index yet.
+
+        Parameters
+        ----------
+        filepath : str
+            The path to the source file
+        class_name : str
+            The name of the class e.g. "Foo"
+
+        Returns
+        -------
+        List[str]
+            The signatures of the class's definitions in the file e.g.
+            ["<unsignedDIM>"]; empty if the file does not define it as a template
+        """
+        if filepath not in self.signatures:
+            self.signatures[filepath] = CppTemplateIndex.scan_file(filepath)
+
+        return self.signatures[filepath].get(class_name, [])
+
+    def canonical_signature(self, signature: str) -> str:
+        """
+        Get the form of a template substitution signature stored in the index.
+
+        Parameters
+        ----------
+        signature : str
+            The signature from the package info e.g. "<unsigned DIM>"
+
+        Returns
+        -------
+        str
+            The signature without whitespace e.g. "<unsignedDIM>"
+        """
+        return WHITESPACE_REGEX.sub("", signature)
+
+    def find_substitution(
+        self,
+        filepath: str,
+        class_name: str,
+        template_substitutions: List[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the template substitution matching a class defined in a file.
+
+        Parameters
+        ----------
+        filepath : str
+            The path to the source file
+        class_name : str
+            The name of the class e.g. "Foo"
+        template_substitutions : List[Dict[str, Any]]
+            The template substitutions for the class and its parents e.g.
+            [{"signature": "<unsigned DIM>", "replacement": [[2], [3]]}]
+
+        Returns
+        -------
+        Optional[Dict[str, Any]]
+            The first substitution matching the last template definition of the
+            class that matches any, or None if there is none
+        """
+        substitution = None
+
+        for signature in self.get_signatures(filepath, class_name):
+            for template_substitution in template_substitutions:
+                if signature == self.canonical_signature(
+                    template_substitution["signature"]
+                ):
+                    substitution = template_substitution
+                    break
+
+        return substitution
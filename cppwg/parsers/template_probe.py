@@ -0,0 +1,280 @@
+"""Template class signatures read from declarations parsed with libclang."""
+
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from cppwg.parsers.libclang_parser import cindex
+from cppwg.parsers.template_index import CppTemplateIndex
+from cppwg.utils.constants import CPPWG_TEMPLATE_PROBE_NAMESPACE
+
+# Cursors whose children may include class template definitions
+SCOPE_CURSOR_KINDS = (
+    "NAMESPACE",
+    "LINKAGE_SPEC",
+    "UNEXPOSED_DECL",
+    "CLASS_DECL",
+    "STRUCT_DECL",
+    "CLASS_TEMPLATE",
+)
+
+
+class CppTemplateProbe(CppTemplateIndex):
+    """
+    The template signatures of class templates, from a libclang parse.
+
+    The source files are included in a single probe translation unit, along
+    with a class template declared with each template substitution signature.
+    Parameters are compared by kind and canonical type, so e.g.
+    `template <std::size_t N>` matches the signature "<unsigned long N>", and
+    definitions split over several lines or spelt differently are found. A
+    substitution matches a definition with the same parameter names, or failing
+    that, with the same parameter kinds and types.
+
+    Attributes
+    ----------
+    probe_path : str
+        The name of the probe translation unit, which is not written to disk
+    parse_args : List[str]
+        The libclang command line arguments e.g. ["-x", "c++", "-I/src"]
+    substitution_signatures : List[str]
+        The template substitution signatures to declare in the probe
+    params : Dict[str, Tuple[Tuple[str, str], ...]]
+        The kind or type and name of each parameter, keyed by canonical signature
+    canonical_signatures : Dict[str, str]
+        The canonical form of each substitution signature, keyed by the signature
+        without whitespace
+    """
+
+    def __init__(
+        self,
+        probe_path: str,
+        parse_args: List[str],
+        substitution_signatures: List[str],
+    ):
+        super(CppTemplateProbe, self).__init__()
+
+        self.probe_path: str = probe_path
+        self.parse_args: List[str] = parse_args
+        self.substitution_signatures: List[str] = substitution_signatures
+
+        self.params: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+        self.canonical_signatures: Dict[str, str] = {}
+
+    def get_canonical_signature(self, cursor: "cindex.Cursor") -> str:
+        """
+        Get the canonical signature of a class template.
+
+        Parameters
+        ----------
+        cursor : cindex.Cursor
+            The class template cursor
+
+        Returns
+        -------
+        str
+            The signature with canonical parameter types e.g. "<unsigned int DIM>"
+        """
+        params: List[Tuple[str, str]] = []
+
+        for child in cursor.get_children():
+            kind = child.kind.name
+            if kind == "TEMPLATE_TYPE_PARAMETER":
+                params.append(("typename", child.spelling))
+            elif kind == "TEMPLATE_NON_TYPE_PARAMETER":
+                params.append((child.type.get_canonical().spelling, child.spelling))
+            elif kind == "TEMPLATE_TEMPLATE_PARAMETER":
+                params.append(("template", child.spelling))
+
+        signature = "<" + ",".join(f"{kind} {name}".strip() for kind, name in params)
+        signature += ">"
+        self.params[signature] = tuple(params)
+
+        return signature
+
+    def build(self, filepaths: List[str], max_workers: Optional[int] = None) -> None:
+        """
+        Parse the source files and substitution signatures in a probe.
+
+        Parameters
+        ----------
+        filepaths : List[str]
+            The paths to the source files; missing files are skipped
+        max_workers : Optional[int]
+            Unused, as the files are parsed in one translation unit
+        """
+        logger = logging.getLogger()
+
+        filepaths = sorted(
+            {
+                os.path.abspath(filepath)
+                for filepath in filepaths
+                if filepath not in self.signatures and os.path.isfile(filepath)
+            }
+        )
+        if not filepaths:
+            return
+
+        # Declare the substitution signatures after the includes, so that any
+        # types they use are declared
+        probe_source = "".join(f'#include "{filepath}"\n' for filepath in filepaths)
+        probe_source += f"namespace {CPPWG_TEMPLATE_PROBE_NAMESPACE} {{\n"
+
+        # The substitution signatures keyed by the name of their declaration
+        probe_signatures: Dict[str, str] = {}
+        for idx, signature in enumerate(self.substitution_signatures):
+            probe_signatures[f"Signature{idx}"] = signature
+            probe_source += f"template {signature} class Signature{idx};\n"
+
+        probe_source += "}\n"
+
+        logger.info(f"Probing {len(filepaths)} source files for class templates.")
+
+        translation_unit = cindex.Index.create().parse(
+            self.probe_path,
+            args=self.parse_args,
+            unsaved_files=[(self.probe_path, probe_source)],
+            options=cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES,
+        )
+
+        # Declarations after an error may be missing or misread, so don't
+        # match templates against a partial parse
+        errors = [
+            diagnostic
+            for diagnostic in translation_unit.diagnostics
+            if diagnostic.severity >= cindex.Diagnostic.Error
+        ]
+        if errors:
+            for diagnostic in errors:
+                logger.error(str(diagnostic))
+            raise RuntimeError(f"Error probing class templates in {self.probe_path}")
+
+        for filepath in filepaths:
+            self.signatures[filepath] = {}
+
+        def visit(cursor: "cindex.Cursor") -> None:
+            for child in cursor.get_children():
+                if child.kind.name not in SCOPE_CURSOR_KINDS:
+                    continue
+
+                location_file = child.location.file
+                if not location_file:
+                    continue
+
+                location_path = os.path.abspath(location_file.name)
+
+                if location_path == self.probe_path:
+                    if child.kind.name == "NAMESPACE":
+                        visit(child)
+                    elif child.spelling in probe_signatures:
+                        signature = super(CppTemplateProbe, self).canonical_signature(
+                            probe_signatures[child.spelling]
+                        )
+                        self.canonical_signatures[signature] = (
+                            self.get_canonical_signature(child)
+                        )
+                    continue
+
+                if location_path not in self.signatures:
+                    continue
+
+                if child.kind.name == "CLASS_TEMPLATE" and child.is_definition():
+                    self.signatures[location_path].setdefault(
+                        child.spelling, []
+                    ).append(self.get_canonical_signature(child))
+
+                visit(child)
+
+        visit(translation_unit.cursor)
+
+    def canonical_signature(self, signature: str) -> str:
+        """
+        Get the canonical form of a template substitution signature.
+
+        Parameters
+        ----------
+        signature : str
+            The signature from the package info e.g. "<unsigned DIM>"
+
+        Returns
+        -------
+        str
+            The signature with canonical parameter types e.g. "<unsigned int DIM>",
+            or without whitespace if it could not be parsed
+        """
+        signature = super(CppTemplateProbe, self).canonical_signature(signature)
+        return self.canonical_signatures.get(signature, signature)
+
+    def get_signatures(self, filepath: str, class_name: str) -> List[str]:
+        """
+        Get the canonical template signatures of a class defined in a file.
+
+        The file is probed on its own if it is not in the index yet.
+
+        Parameters
+        ----------
+        filepath : str
+            The path to the source file
+        class_name : str
+            The name of the class e.g. "Foo"
+
+        Returns
+        -------
+        List[str]
+            The signatures of the class's definitions in the file e.g.
+            ["<unsigned int DIM>"]
+        """
+        filepath = os.path.abspath(filepath)
+        if filepath not in self.signatures:
+            self.build([filepath])
+
+        return self.signatures.get(filepath, {}).get(class_name, [])
+
+    def find_substitution(
+        self,
+        filepath: str,
+        class_name: str,
+        template_substitutions: List[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the template substitution matching a class defined in a file.
+
+        Parameters
+        ----------
+        filepath : str
+            The path to the source file
+        class_name : str
+            The name of the class e.g. "Foo"
+        template_substitutions : List[Dict[str, Any]]
+            The template substitutions for the class and its parents
+
+        Returns
+        -------
+        Optional[Dict[str, Any]]
+            The substitution matching the class's definition with the same
+            parameter names, or else the same parameter kinds and types
+        """
+        filepath = os.path.abspath(filepath)
+
+        substitution = super(CppTemplateProbe, self).find_substitution(
+            filepath, class_name, template_substitutions
+        )
+        if substitution:
+            return substitution
+
+        # Fall back to comparing parameters without their names
+        for signature in self.get_signatures(filepath, class_name):
+            structure = [kind for kind, _ in self.params.get(signature, ())]
+
+            for template_substitution in template_substitutions:
+                canonical_signature = self.canonical_signature(
+                    template_substitution["signature"]
+                )
+                if canonical_signature not in self.params:
+                    continue
+
+                if structure == [kind for kind, _ in self.params[canonical_signature]]:
+                    substitution = template_substitution
+                    break
+
+        return substitution
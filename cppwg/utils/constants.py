@@ -3,8 +3,21 @@
 CPPWG_SOURCEROOT_STRING = "CPPWG_SOURCEROOT"
 CPPWG_ALL_STRING = "CPPWG_ALL"
 
+# Prefixes for glob and regex patterns in the type exclusion lists
+CPPWG_GLOB_PREFIX = "glob:"
+CPPWG_REGEX_PREFIX = "regex:"
+
 CPPWG_EXT = "cppwg"
 CPPWG_HEADER_COLLECTION_FILENAME = "wrapper_header_collection.hpp"
+CPPWG_HEADER_COLLECTION_NAMESPACE = "cppwg"
+CPPWG_HEADER_COLLECTION_SHARD_FILENAME = "wrapper_header_collection_{}.hpp"
+
+# Template instantiation forms for the header collection, keyed by mode
+CPPWG_TEMPLATE_INSTANTIATIONS = {
+    "explicit": "template class {};\n",
+    "implicit": 'static_assert(sizeof({}) > 0, "");\n',
+}
+CPPWG_DEFAULT_TEMPLATE_INSTANTIATION = "explicit"
 
 CPPWG_TRUE_STRINGS = ["ON", "YES", "Y", "TRUE", "T"]
 CPPWG_FALSE_STRINGS = ["OFF", "NO", "N", "FALSE", "F"]
@@ -12,3 +25,12 @@ CPPWG_FALSE_STRINGS = ["OFF", "NO", "N", "FALSE", "F"]
 CPPWG_DEFAULT_WRAPPER_DIR = "cppwg_wrappers"
 
 CPPWG_CLASS_OVERRIDE_SUFFIX = "_Overrides"
+
+CPPWG_CACHE_EXT = ".cppwg_cache"
+CPPWG_DEFAULT_CACHE_MAX_SIZE = 1024**3  # 1 GiB
+CPPWG_INCREMENTAL_DIRNAME = ".cppwg_incremental"
+CPPWG_PCH_HEADER_FILENAME = "wrapper_pch_headers.hpp"
+CPPWG_SNAPSHOT_FILENAME = ".cppwg_snapshot"
+CPPWG_HEADER_MANIFEST_FILENAME = ".cppwg_header_manifest"
+CPPWG_TEMPLATE_PROBE_FILENAME = "wrapper_template_probe.cpp"
+CPPWG_TEMPLATE_PROBE_NAMESPACE = "cppwg_template_probe"
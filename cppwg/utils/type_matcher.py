@@ -0,0 +1,92 @@
+"""Matcher for the C++ type exclusion patterns in the package info."""
+
+import fnmatch
+import logging
+import re
+from typing import FrozenSet, Iterable, List, Optional
+
+from cppwg.utils.constants import CPPWG_GLOB_PREFIX, CPPWG_REGEX_PREFIX
+
+
+class CppTypeMatcher:
+    """
+    A set of type exclusion patterns compiled for repeated matching.
+
+    Types are matched with their whitespace removed, as in the writers e.g.
+    "::std::vector<unsignedint>const&". Patterns prefixed with "glob:" match the
+    whole type, and patterns prefixed with "regex:" match anywhere in the type
+    unless anchored. Other patterns are type names, which either match the
+    whole type or, for substring matchers, any part of it. Exact names are kept
+    in a frozenset, and glob and substring patterns are combined into a single
+    regex. Regex patterns are compiled separately, as backreferences and inline
+    flags in one would otherwise apply across the combined regex.
+
+    Attributes
+    ----------
+    exact_types : FrozenSet[str]
+        The type names matched exactly, without whitespace
+    pattern_regex : Optional[re.Pattern]
+        The combined regex for the glob and substring patterns, or None if
+        there are none
+    user_regexes : List[re.Pattern]
+        The compiled regex patterns
+    """
+
+    def __init__(self, patterns: Iterable[str], substring: bool = False):
+        logger = logging.getLogger()
+
+        exact_types = set()
+        regexes = []
+        self.user_regexes: List[re.Pattern] = []
+
+        for pattern in patterns:
+            if pattern.startswith(CPPWG_GLOB_PREFIX):
+                glob = pattern.split(":", 1)[1].replace(" ", "")
+                regexes.append(f"^{fnmatch.translate(glob)}")
+
+            elif pattern.startswith(CPPWG_REGEX_PREFIX):
+                try:
+                    self.user_regexes.append(re.compile(pattern.split(":", 1)[1]))
+                except re.error:
+                    logger.error(f"Invalid exclude pattern: {pattern}")
+                    raise ValueError()
+
+            elif substring:
+                regexes.append(re.escape(pattern.replace(" ", "")))
+
+            else:
+                exact_types.add(pattern.replace(" ", ""))
+
+        self.exact_types: FrozenSet[str] = frozenset(exact_types)
+
+        self.pattern_regex: Optional[re.Pattern] = None
+        if regexes:
+            self.pattern_regex = re.compile(
+                "|".join(f"(?:{regex})" for regex in regexes)
+            )
+
+    def __bool__(self) -> bool:
+        """Whether there are any patterns to match."""
+        return bool(self.exact_types or self.pattern_regex or self.user_regexes)
+
+    def matches(self, type_string: str) -> bool:
+        """
+        Check if a type matches any of the patterns.
+
+        Parameters
+        ----------
+        type_string : str
+            The type without whitespace e.g. "::std::vector<unsignedint>const&"
+
+        Returns
+        -------
+        bool
+            True if the type matches a pattern, False otherwise
+        """
+        if type_string in self.exact_types:
+            return True
+
+        if self.pattern_regex and self.pattern_regex.search(type_string):
+            return True
+
+        return any(regex.search(type_string) for regex in self.user_regexes)
@@ -1,6 +1,12 @@
 """Utility functions for the cppwg package."""
 
-from typing import Any, Dict
+import fnmatch
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Container, Dict, List, Optional, Tuple
 
 from cppwg.utils.constants import (
     CPPWG_ALL_STRING,
@@ -52,3 +58,275 @@ def substitute_bool_for_string(input_dict: Dict[Any, Any], key: Any) -> None:
 
     elif caps_string in CPPWG_FALSE_STRINGS:
         input_dict[key] = False
+
+
+def read_depfile(depfile_path: str, existing_only: bool = True) -> List[str]:
+    r"""
+    Read the dependencies from a make-style depfile.
+
+    The depfile is in the format emitted by the -MD option of the clang
+    frontend e.g. `target.o: a.hpp b.hpp \` with continuation lines.
+
+    Parameters
+    ----------
+    depfile_path : str
+        The path to the depfile
+    existing_only : bool
+        Whether to skip dependencies that don't exist on disk, such as the
+        temporary files pygccxml uses to include sources
+
+    Returns
+    -------
+    List[str]
+        The absolute paths of the dependencies
+    """
+    with open(depfile_path, "r") as depfile:
+        content = depfile.read()
+
+    # Drop the make target and join continuation lines
+    content = re.split(r":\s", content, maxsplit=1)[-1]
+    content = content.replace("\\\n", " ")
+
+    # Split on whitespace that isn't escaped e.g. "/path/with\ space.hpp"
+    filepaths = []
+    for token in re.split(r"(?<!\\)\s+", content.strip()):
+        filepath = token.replace("\\ ", " ")
+
+        if not filepath:
+            continue
+
+        # Skip temporary files e.g. the file pygccxml uses to include sources
+        if existing_only and not os.path.isfile(filepath):
+            continue
+
+        filepaths.append(os.path.abspath(filepath))
+
+    return filepaths
+
+
+def get_peak_memory() -> Optional[float]:
+    """
+    Get the peak resident memory of the current process.
+
+    Returns
+    -------
+    Optional[float]
+        The peak resident set size in MiB, or None if it can't be measured
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    if sys.platform == "darwin":
+        return max_rss / 1024**2
+
+    return max_rss / 1024
+
+
+def get_current_memory() -> Optional[float]:
+    """
+    Get the current resident memory of the current process.
+
+    Returns
+    -------
+    Optional[float]
+        The resident set size in MiB, or None if it can't be measured
+    """
+    try:
+        with open("/proc/self/statm", "r") as statm_file:
+            resident_pages = int(statm_file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
+def find_path_prefix(filepath: str, prefixes: Container[str]) -> Optional[str]:
+    """
+    Find the longest path in a collection that contains a file.
+
+    The file's parent directories are checked from the innermost outwards, so
+    the cost depends on the depth of the file rather than the number of paths.
+
+    Parameters
+    ----------
+    filepath : str
+        The path to the file e.g. "/src/geometry/shapes/Point.hpp"
+    prefixes : Container[str]
+        Normalized paths to look for e.g. {"/src/geometry", "/src/geometry/shapes"}
+
+    Returns
+    -------
+    Optional[str]
+        The longest path containing the file, or None if there is none
+    """
+    path = os.path.normpath(filepath)
+
+    while path not in prefixes:
+        parent_path = os.path.dirname(path)
+        if parent_path == path:
+            return None
+        path = parent_path
+
+    return path
+
+
+def compile_globs(patterns: List[str]) -> Optional[re.Pattern]:
+    """
+    Compile a list of glob patterns into a single regex.
+
+    Parameters
+    ----------
+    patterns : List[str]
+        The glob patterns e.g. ["*.hpp", "*.h"]
+
+    Returns
+    -------
+    Optional[re.Pattern]
+        A regex matching any of the patterns, or None if there are no patterns
+    """
+    if not patterns:
+        return None
+
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+def find_source_files(
+    source_root: str,
+    patterns: List[str],
+    excludes: Optional[List[str]] = None,
+    prune_paths: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    listings: Optional[Dict[str, Tuple[Optional[int], List[str], List[str]]]] = None,
+) -> List[str]:
+    """
+    Find the files under a source root whose names match a set of patterns.
+
+    Directories are listed with os.scandir, fanning out subdirectories across
+    a thread pool. Hidden directories, the directories in prune_paths, and
+    directories matching an exclude glob are skipped without being listed.
+    Symlinked directories are followed unless they link to a directory
+    containing them.
+
+    Directory listings from a previous search can be passed in, in which case
+    directories whose modification time is unchanged are not listed again.
+    The listings are updated in place for the next search.
+
+    Parameters
+    ----------
+    source_root : str
+        The directory to search
+    patterns : List[str]
+        Glob patterns for the file names e.g. ["*.hpp"]
+    excludes : Optional[List[str]]
+        Glob patterns for directories to skip, matched against the directory
+        name and its path relative to the source root e.g. ["build*", "apps/*/test"]
+    prune_paths : Optional[List[str]]
+        Directories to skip e.g. the wrapper root
+    max_workers : Optional[int]
+        The number of threads listing directories; defaults to the
+        ThreadPoolExecutor default
+    listings : Optional[Dict[str, Tuple[Optional[int], List[str], List[str]]]]
+        The matching files and subdirectories to search in each directory,
+        with the directory's modification time in ns, keyed by directory path.
+        The modification time is None for directories modified too recently
+        to rely on
+
+    Returns
+    -------
+    List[str]
+        The sorted absolute paths of the matching files
+    """
+    source_root = os.path.abspath(source_root)
+    pattern_regex = compile_globs(patterns)
+    exclude_regex = compile_globs(excludes)
+    prune_paths = {os.path.abspath(path) for path in prune_paths or []}
+
+    # The length of the prefix to strip for paths relative to the source root
+    root_length = len(os.path.join(source_root, ""))
+
+    # Directories modified within a second of being listed may change again
+    # without their modification time changing
+    settled_ns = time.time_ns() - 1_000_000_000
+    previous_listings = dict(listings or {})
+    if listings is not None:
+        listings.clear()
+
+    def scan_dir(dir_path: str) -> Tuple[List[str], List[str]]:
+        filepaths: List[str] = []
+        subdir_paths: List[str] = []
+
+        mtime_ns = None
+        if listings is not None:
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                pass
+
+            listing = previous_listings.get(dir_path)
+            if listing and mtime_ns is not None and listing[0] == mtime_ns:
+                listings[dir_path] = listing
+                return listing[1], listing[2]
+
+        try:
+            entries = list(os.scandir(dir_path))
+        except OSError:
+            # Skip unreadable directories, as os.walk does
+            return filepaths, subdir_paths
+
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if not is_dir:
+                if pattern_regex and pattern_regex.match(entry.name):
+                    filepaths.append(entry.path)
+                continue
+
+            if entry.name.startswith(".") or entry.path in prune_paths:
+                continue
+
+            if exclude_regex:
+                rel_path = entry.path[root_length:].replace(os.sep, "/")
+                if exclude_regex.match(entry.name) or exclude_regex.match(rel_path):
+                    continue
+
+            if entry.is_symlink():
+                # Skip links back to an enclosing directory, which never end
+                real_path = os.path.realpath(entry.path)
+                real_dir_path = os.path.realpath(dir_path)
+                if real_dir_path == real_path or real_dir_path.startswith(
+                    real_path + os.sep
+                ):
+                    continue
+
+            subdir_paths.append(entry.path)
+
+        if listings is not None:
+            if mtime_ns is not None and mtime_ns >= settled_ns:
+                mtime_ns = None
+            listings[dir_path] = (mtime_ns, filepaths, subdir_paths)
+
+        return filepaths, subdir_paths
+
+    filepaths: List[str] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(scan_dir, source_root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dir_filepaths, subdir_paths = future.result()
+                filepaths.extend(dir_filepaths)
+                pending.update(
+                    executor.submit(scan_dir, subdir_path)
+                    for subdir_path in subdir_paths
+                )
+
+    return sorted(filepaths)
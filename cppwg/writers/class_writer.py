@@ -2,7 +2,7 @@
 
 import logging
 import os
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 from pygccxml import declarations
 from pygccxml.declarations.calldef_members import member_function_t
@@ -31,9 +31,9 @@ class CppClassWrapperWriter(CppBaseWrapperWriter):
         String templates with placeholders for generating wrapper code
     exposed_class_full_names : List[str]
         A list of full names for all classes in the module
-    class_full_names : List[str]
+    class_full_names : Tuple[str, ...]
         A list of full names for this class e.g. ["Foo<2,2>", "Foo<3,3>"]
-    class_short_names : List[str]
+    class_short_names : Tuple[str, ...]
         A list of short names for this class e.g. ["Foo2_2", "Foo3_3"]
     class_decls : List[class_t]
         A list of class declarations associated with the class
@@ -60,10 +60,10 @@ class CppClassWrapperWriter(CppBaseWrapperWriter):
         self.class_info: CppClassInfo = class_info
 
         # Class full names eg. ["Foo<2,2>", "Foo<3,3>"]
-        self.class_full_names: List[str] = self.class_info.get_full_names()
+        self.class_full_names: Tuple[str, ...] = self.class_info.full_names
 
         # Class short names eg. ["Foo2_2", "Foo3_3"]
-        self.class_short_names: List[str] = self.class_info.get_short_names()
+        self.class_short_names: Tuple[str, ...] = self.class_info.short_names
 
         if len(self.class_full_names) != len(self.class_short_names):
             logger.error("Full and short name lists should be the same length")
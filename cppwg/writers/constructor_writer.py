@@ -86,17 +86,11 @@ class CppConstructorWrapperWriter(CppBaseWrapperWriter):
             return True
 
         # Check for excluded argument patterns
-        calldef_excludes = [
-            x.replace(" ", "")
-            for x in self.class_info.hierarchy_attribute_gather("calldef_excludes")
-        ]
-
-        ctor_arg_type_excludes = [
-            x.replace(" ", "")
-            for x in self.class_info.hierarchy_attribute_gather(
-                "constructor_arg_type_excludes"
-            )
-        ]
+        calldef_excludes = self.class_info.get_exclude_matcher("calldef_excludes")
+
+        ctor_arg_type_excludes = self.class_info.get_exclude_matcher(
+            "constructor_arg_type_excludes"
+        )
 
         for arg_type in self.ctor_decl.argument_types:
             # e.g. ::std::vector<unsigned int> const & -> ::std::vector<unsignedint>const&
@@ -107,13 +101,12 @@ class CppConstructorWrapperWriter(CppBaseWrapperWriter):
                 return True
 
             # Exclude constructors with args matching calldef_excludes
-            if arg_type_str in calldef_excludes:
+            if calldef_excludes.matches(arg_type_str):
                 return True
 
             # Exclude constructurs with args matching constructor_arg_type_excludes
-            for excluded_type in ctor_arg_type_excludes:
-                if excluded_type in arg_type_str:
-                    return True
+            if ctor_arg_type_excludes.matches(arg_type_str):
+                return True
 
         return False
 
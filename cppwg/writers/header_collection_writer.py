@@ -1,11 +1,18 @@
 """Writer for header collection hpp file."""
 
+import logging
 import os
-from typing import Dict
+from typing import Dict, List, Optional, Set
 
 from cppwg.input.class_info import CppClassInfo
 from cppwg.input.free_function_info import CppFreeFunctionInfo
+from cppwg.input.module_info import ModuleInfo
 from cppwg.input.package_info import PackageInfo
+from cppwg.utils import utils
+from cppwg.utils.constants import (
+    CPPWG_HEADER_COLLECTION_NAMESPACE,
+    CPPWG_TEMPLATE_INSTANTIATIONS,
+)
 
 
 class CppHeaderCollectionWriter:
@@ -13,9 +20,17 @@ class CppHeaderCollectionWriter:
     Class to manage the generation of the header collection file.
 
     The header collection file includes all the headers to be parsed by CastXML.
-    It also contains explicit template instantiations and their corresponding
-    typedefs (e.g. typedef Foo<2,2> Foo2_2) for all classes that are to be
-    automatically wrapped.
+    It also contains template instantiations and their corresponding typedefs
+    (e.g. typedef Foo<2,2> Foo2_2) for all classes that are to be automatically
+    wrapped.
+
+    Explicit instantiations (e.g. template class Foo<2,2>;) make clang
+    instantiate every member function body, although CastXML only reports
+    declarations. Implicit instantiations (e.g. a static_assert on
+    sizeof(Foo<2,2>)) only instantiate the class definition, which is enough
+    for CastXML to see all the class members. Unlike extern template
+    declarations, they don't suppress instantiations in the wrapper code that
+    includes the header collection.
 
     Attributes
     ----------
@@ -27,6 +42,13 @@ class CppHeaderCollectionWriter:
             The path to save the header collection file to
         hpp_collection_string : str
             The output string that gets written to the header collection file
+        module_info_collection : List[ModuleInfo]
+            The modules to collect headers for; defaults to all package modules
+        template_instantiation : str
+            How template classes are instantiated; either "explicit" or "implicit"
+        source_hpp_files : List[str]
+            The headers to include for modules that use all classes or free
+            functions; defaults to all the package's source headers
         class_dict : Dict[str, CppClassInfo]
             A dictionary of all class info objects
         free_func_dict : Dict[str, CppFreeFunctionInfo]
@@ -38,18 +60,41 @@ class CppHeaderCollectionWriter:
         package_info: PackageInfo,
         wrapper_root: str,
         hpp_collection_filepath: str,
+        module_info_collection: Optional[List[ModuleInfo]] = None,
+        template_instantiation: Optional[str] = None,
+        source_hpp_files: Optional[List[str]] = None,
     ):
+        logger = logging.getLogger()
 
         self.package_info: PackageInfo = package_info
         self.wrapper_root: str = wrapper_root
         self.hpp_collection_filepath: str = hpp_collection_filepath
         self.hpp_collection_string: str = ""
 
+        self.module_info_collection: List[ModuleInfo] = module_info_collection
+        if self.module_info_collection is None:
+            self.module_info_collection = self.package_info.module_info_collection
+
+        self.template_instantiation: str = template_instantiation
+        if self.template_instantiation is None:
+            self.template_instantiation = self.package_info.template_instantiation
+
+        self.source_hpp_files: List[str] = source_hpp_files
+        if self.source_hpp_files is None:
+            self.source_hpp_files = self.package_info.source_hpp_files
+
+        if self.template_instantiation not in CPPWG_TEMPLATE_INSTANTIATIONS:
+            logger.error(
+                f"Unknown template instantiation: {self.template_instantiation}. "
+                f"Expected one of: {', '.join(CPPWG_TEMPLATE_INSTANTIATIONS)}"
+            )
+            raise ValueError()
+
         # For convenience, collect all class and free function info into dicts keyed by name
         self.class_dict: Dict[str, CppClassInfo] = {}
         self.free_func_dict: Dict[str, CppFreeFunctionInfo] = {}
 
-        for module_info in self.package_info.module_info_collection:
+        for module_info in self.module_info_collection:
             for class_info in module_info.class_info_collection:
                 self.class_dict[class_info.name] = class_info
 
@@ -65,11 +110,32 @@ class CppHeaderCollectionWriter:
         bool
         """
         # True if any module uses all classes or all free functions
-        for module_info in self.package_info.module_info_collection:
+        for module_info in self.module_info_collection:
             if module_info.use_all_classes or module_info.use_all_free_functions:
                 return True
         return False
 
+    def get_include_all_paths(self) -> Optional[Set[str]]:
+        """
+        Get the source locations to include all headers from.
+
+        Returns
+        -------
+        Optional[Set[str]]
+            The source location paths of modules using all classes or all free
+            functions, or None if any of them covers the whole source tree
+        """
+        location_paths: Set[str] = set()
+
+        for module_info in self.module_info_collection:
+            if module_info.use_all_classes or module_info.use_all_free_functions:
+                module_location_paths = module_info.get_source_location_paths()
+                if module_location_paths is None:
+                    return None
+                location_paths.update(module_location_paths)
+
+        return location_paths
+
     def write(self) -> None:
         """Generate the header file output string and write it to file."""
         # Add opening header guard
@@ -81,75 +147,82 @@ class CppHeaderCollectionWriter:
         included_files = set()  # Keep track of included files to avoid duplicates
 
         if self.should_include_all():
-            # Include all the headers
-            for hpp_filepath in self.package_info.source_hpp_files:
+            # Include all the headers under the source locations of modules that
+            # use all classes or free functions
+            location_paths = self.get_include_all_paths()
+
+            for hpp_filepath in self.source_hpp_files:
+                if location_paths is not None:
+                    if not utils.find_path_prefix(hpp_filepath, location_paths):
+                        continue
+
                 hpp_filename = os.path.basename(hpp_filepath)
 
                 if hpp_filename not in included_files:
                     self.hpp_collection_string += f'#include "{hpp_filename}"\n'
                     included_files.add(hpp_filename)
 
-        else:
-            # Include specific headers needed by classes
-            for module_info in self.package_info.module_info_collection:
-                for class_info in module_info.class_info_collection:
-                    hpp_filename = None
+        # Include specific headers needed by listed classes
+        for module_info in self.module_info_collection:
+            for class_info in module_info.class_info_collection:
+                hpp_filename = None
 
-                    if class_info.source_file:
-                        hpp_filename = class_info.source_file
+                if class_info.source_file:
+                    hpp_filename = class_info.source_file
 
-                    elif class_info.source_file_full_path:
-                        hpp_filename = os.path.basename(
-                            class_info.source_file_full_path
-                        )
+                elif class_info.source_file_full_path:
+                    hpp_filename = os.path.basename(class_info.source_file_full_path)
 
-                    if hpp_filename and hpp_filename not in included_files:
-                        self.hpp_collection_string += f'#include "{hpp_filename}"\n'
-                        included_files.add(hpp_filename)
+                if hpp_filename and hpp_filename not in included_files:
+                    self.hpp_collection_string += f'#include "{hpp_filename}"\n'
+                    included_files.add(hpp_filename)
 
-                # Include specific headers needed by free functions
-                for free_function_info in module_info.free_function_info_collection:
-                    if free_function_info.source_file_full_path:
-                        hpp_filename = os.path.basename(
-                            free_function_info.source_file_full_path
-                        )
+            # Include specific headers needed by free functions
+            for free_function_info in module_info.free_function_info_collection:
+                if free_function_info.source_file_full_path:
+                    hpp_filename = os.path.basename(
+                        free_function_info.source_file_full_path
+                    )
 
-                        if hpp_filename not in included_files:
-                            self.hpp_collection_string += f'#include "{hpp_filename}"\n'
-                            included_files.add(hpp_filename)
+                    if hpp_filename not in included_files:
+                        self.hpp_collection_string += f'#include "{hpp_filename}"\n'
+                        included_files.add(hpp_filename)
 
         # Add the template instantiations e.g. `template class Foo<2,2>;`
         # and typdefs e.g. `typedef Foo<2,2> Foo2_2;`
+        template_instantiation = CPPWG_TEMPLATE_INSTANTIATIONS[
+            self.template_instantiation
+        ]
         template_instantiations = ""
         template_typedefs = ""
 
-        for module_info in self.package_info.module_info_collection:
+        for module_info in self.module_info_collection:
             for class_info in module_info.class_info_collection:
                 # Skip untemplated classes
                 if not class_info.template_arg_lists:
                     continue
 
                 # Class full names eg. ["Foo<2,2>", "Foo<3,3>"]
-                full_names = [
-                    name.replace(" ", "") for name in class_info.get_full_names()
-                ]
+                full_names = [name.replace(" ", "") for name in class_info.full_names]
 
                 # Class short names eg. ["Foo2_2", "Foo3_3"]
-                short_names = [
-                    name.replace(" ", "") for name in class_info.get_short_names()
-                ]
+                short_names = [name.replace(" ", "") for name in class_info.short_names]
 
                 for full_name, short_name in zip(full_names, short_names):
-                    template_instantiations += f"template class {full_name};\n"
+                    template_instantiations += template_instantiation.format(full_name)
                     template_typedefs += f"typedef {full_name} {short_name};\n"
 
         self.hpp_collection_string += "\n// Instantiate Template Classes\n"
         self.hpp_collection_string += template_instantiations
 
         self.hpp_collection_string += "\n// Typedefs for nicer naming\n"
-        self.hpp_collection_string += "namespace cppwg\n{\n"
+        self.hpp_collection_string += (
+            f"namespace {CPPWG_HEADER_COLLECTION_NAMESPACE}\n{{\n"
+        )
         self.hpp_collection_string += template_typedefs
-        self.hpp_collection_string += "} // namespace cppwg\n"
+        self.hpp_collection_string += (
+            f"}} // namespace {CPPWG_HEADER_COLLECTION_NAMESPACE}\n"
+        )
 
         # Add closing header guard
         self.hpp_collection_string += (
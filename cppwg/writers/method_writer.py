@@ -68,30 +68,31 @@ class CppMethodWrapperWriter(CppBaseWrapperWriter):
             return True
 
         # Check for excluded return types
-        calldef_excludes = [
-            x.replace(" ", "")
-            for x in self.class_info.hierarchy_attribute_gather("calldef_excludes")
-        ]
+        calldef_excludes = self.class_info.get_exclude_matcher("calldef_excludes")
 
-        return_type_excludes = [
-            x.replace(" ", "")
-            for x in self.class_info.hierarchy_attribute_gather("return_type_excludes")
-        ]
+        return_type_excludes = self.class_info.get_exclude_matcher(
+            "return_type_excludes"
+        )
 
         return_type = self.method_decl.return_type.decl_string.replace(" ", "")
-        if return_type in calldef_excludes or return_type in return_type_excludes:
+        if calldef_excludes.matches(return_type) or return_type_excludes.matches(
+            return_type
+        ):
             return True
 
+        if not calldef_excludes:
+            return False
+
         # Check for excluded argument patterns
         for argument_type in self.method_decl.argument_types:
             # e.g. ::std::vector<unsigned int> const & -> ::std::vector<unsigned
             arg_type_short = argument_type.decl_string.split()[0].replace(" ", "")
-            if arg_type_short in calldef_excludes:
+            if calldef_excludes.matches(arg_type_short):
                 return True
 
             # e.g. ::std::vector<unsigned int> const & -> ::std::vector<unsignedint>const&
             arg_type_full = argument_type.decl_string.replace(" ", "")
-            if arg_type_full in calldef_excludes:
+            if calldef_excludes.matches(arg_type_full):
                 return True
 
         return False
@@ -5,9 +5,9 @@ import os
 from typing import Dict, List
 
 from pygccxml.declarations.class_declaration import class_t
-from pygccxml.declarations.namespace import namespace_t
 
 from cppwg.input.module_info import ModuleInfo
+from cppwg.parsers.declaration_index import CppDeclarationIndex
 from cppwg.utils.constants import CPPWG_EXT, CPPWG_HEADER_COLLECTION_FILENAME
 from cppwg.writers.class_writer import CppClassWrapperWriter
 from cppwg.writers.free_function_writer import CppFreeFunctionWrapperWriter
@@ -24,8 +24,8 @@ class CppModuleWrapperWriter:
 
     Attributes
     ----------
-    source_ns : namespace_t
-        The pygccxml namespace containing declarations from the source code
+    decl_index : CppDeclarationIndex
+        Name-keyed index of the declarations from the source code
     module_info : ModuleInfo
         The module information to generate Python bindings for
     wrapper_templates : Dict[str, str]
@@ -40,13 +40,13 @@ class CppModuleWrapperWriter:
 
     def __init__(
         self,
-        source_ns: namespace_t,
+        decl_index: CppDeclarationIndex,
         module_info: ModuleInfo,
         wrapper_templates: Dict[str, str],
         wrapper_root: str,
         package_license: str = "",
     ):
-        self.source_ns: namespace_t = source_ns
+        self.decl_index: CppDeclarationIndex = decl_index
         self.module_info: ModuleInfo = module_info
         self.wrapper_templates: Dict[str, str] = wrapper_templates
         self.wrapper_root: str = wrapper_root
@@ -59,7 +59,7 @@ class CppModuleWrapperWriter:
         self.exposed_class_full_names: List[str] = []
 
         for class_info in self.module_info.class_info_collection:
-            for full_name in class_info.get_full_names():
+            for full_name in class_info.full_names:
                 self.exposed_class_full_names.append(full_name.replace(" ", ""))
 
     def write_module_wrapper(self) -> None:
@@ -92,7 +92,7 @@ class CppModuleWrapperWriter:
 
         # Add includes for class wrappers in the module
         for class_info in self.module_info.class_info_collection:
-            for short_name in class_info.get_short_names():
+            for short_name in class_info.short_names:
                 # Example: #include "Foo2_2.cppwg.hpp"
                 cpp_string += f'#include "{short_name}.{CPPWG_EXT}.hpp"\n'
 
@@ -115,7 +115,7 @@ class CppModuleWrapperWriter:
 
         # Add classes
         for class_info in self.module_info.class_info_collection:
-            for short_name in class_info.get_short_names():
+            for short_name in class_info.short_names:
                 # Example: register_Foo2_2_class(m);"
                 cpp_string += f"    register_{short_name}_class(m);\n"
 
@@ -148,10 +148,10 @@ class CppModuleWrapperWriter:
 
             # Get the declaration for each class and add it to the class writer
             # TODO: Consider using class_info.decl instead
-            for full_name in class_info.get_full_names():
+            for full_name in class_info.full_names:
                 name = full_name.replace(" ", "")  # e.g. Foo<2,2>
 
-                class_decl: class_t = self.source_ns.class_(name)
+                class_decl: class_t = self.decl_index.class_(name)
                 class_writer.class_decls.append(class_decl)
 
             # Write the class wrappers into /path/to/wrapper_root/modulename/
@@ -3,10 +3,10 @@
 
 // Includes
 #include "SimpleMathFunctions.hpp"
+#include "Point.hpp"
 #include "Shape.hpp"
 #include "Cuboid.hpp"
 #include "Rectangle.hpp"
-#include "Point.hpp"
 
 // Instantiate Template Classes
 template class Point<2>;
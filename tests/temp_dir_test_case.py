@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    """Test case that writes its input files to a temporary directory."""
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def tmp_path(self, *relative_path: str) -> str:
+        """
+        Get the path to a file in the temporary directory
+
+        Parameters
+        ----------
+        relative_path : str
+          The path components relative to the temporary directory
+
+        Returns
+        -------
+        str
+          The absolute path to the file
+        """
+        return os.path.join(self.tmp_dir.name, *relative_path)
+
+    def write_file(self, file_path: str, content: str) -> str:
+        """
+        Write a file, creating its directory if needed
+
+        Parameters
+        ----------
+        file_path : str
+          The path to the file, absolute or relative to the temporary directory
+        content : str
+          The content to write
+
+        Returns
+        -------
+        str
+          The absolute path to the file
+        """
+        file_path = self.tmp_path(file_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        with open(file_path, "w") as out_file:
+            out_file.write(content)
+
+        return file_path
@@ -0,0 +1,86 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from cppwg.parsers.castxml_filter import CastXmlFilter
+from tests.temp_dir_test_case import TempDirTestCase
+
+# The global namespace holds a source class and function, and an unused
+# out-of-tree class. The source function throws an out-of-tree class, which is
+# kept without its members.
+CASTXML_XML = """<?xml version="1.0"?>
+<CastXML format="1.4.0">
+  <Namespace id="_1" name="::" members="_2 _3 _4 _7"/>
+  <Class id="_2" name="Foo" context="_1" file="f1" line="3" members="_5" bases="_4"/>
+  <Function id="_3" name="foo" returns="_6" context="_1" file="f1" line="8" throw="_7">
+    <Argument name="x" type="_6"/>
+  </Function>
+  <Class id="_4" name="Base" context="_1" file="f2" line="1" members="_9"/>
+  <Method id="_5" name="bar" returns="_6" context="_2" file="f1" line="5"/>
+  <FundamentalType id="_6" name="int"/>
+  <Class id="_7" name="Error" context="_1" file="f2" line="4" members="_8"/>
+  <Method id="_8" name="what" returns="_6" context="_7" file="f2" line="6"/>
+  <Method id="_9" name="base" returns="_6" context="_4" file="f2" line="2"/>
+  <Class id="_10" name="Unused" context="_1" file="f2" line="9"/>
+  <File id="f1" name="/src/Foo.hpp"/>
+  <File id="f2" name="/usr/include/base.hpp"/>
+</CastXML>
+"""
+
+
+class TestCastXmlFilter(TempDirTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.xml_path = self.write_file("castxml.xml", CASTXML_XML)
+
+        self.xml_filter = CastXmlFilter(
+            self.xml_path, lambda file_name: file_name.startswith("/src/")
+        )
+
+    def test_scan(self) -> None:
+        """
+        Keep source declarations and what they reference, including thrown
+        types, but not the members of out-of-tree classes.
+        """
+        kept_ids, kept_files = self.xml_filter.scan()
+
+        self.assertEqual(kept_ids, {"_1", "_2", "_3", "_4", "_5", "_6", "_7"})
+        self.assertEqual(kept_files, {"f1", "f2"})
+
+    def test_filter(self) -> None:
+        """
+        Write the kept elements with the filtered out members removed.
+        """
+        output_path = self.tmp_path("filtered.xml")
+        self.xml_filter.filter(output_path)
+
+        root = ET.parse(output_path).getroot()
+        self.assertEqual(root.tag, "CastXML")
+        self.assertEqual(root.get("format"), "1.4.0")
+
+        elements = {element.get("id"): element for element in root}
+        self.assertEqual(
+            sorted(elements), ["_1", "_2", "_3", "_4", "_5", "_6", "_7", "f1", "f2"]
+        )
+
+        self.assertEqual(elements["_1"].get("members"), "_2 _3 _4 _7")
+        self.assertEqual(elements["_2"].get("members"), "_5")
+        self.assertEqual(elements["_4"].get("members"), "")
+        self.assertEqual(elements["_7"].get("members"), "")
+
+        # Nested elements are written with their parent
+        self.assertEqual(elements["_3"].find("Argument").get("name"), "x")
+
+    def test_no_elements(self) -> None:
+        """
+        Fail clearly on XML without any elements below the root.
+        """
+        self.write_file(self.xml_path, '<?xml version="1.0"?>\n<CastXML/>\n')
+
+        with self.assertLogs(level="ERROR"), self.assertRaises(ValueError):
+            self.xml_filter.filter(self.tmp_path("filtered.xml"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import os
+import unittest
+from typing import Optional
+
+from pygccxml import declarations
+
+from cppwg.generators import CppWrapperGenerator
+from tests.temp_dir_test_case import TempDirTestCase
+
+BOX_HPP = """
+#ifndef BOX_HPP_
+#define BOX_HPP_
+
+#include <vector>
+
+namespace geom
+{
+
+class Box
+{
+public:
+    Box(double width);
+
+    double GetWidth() const;
+
+    std::vector<double> GetSides() const;
+
+private:
+    double mWidth;
+};
+
+} // namespace geom
+
+#endif // BOX_HPP_
+"""
+
+GLOBAL_HPP = """
+#ifndef GLOBAL_HPP_
+#define GLOBAL_HPP_
+
+double Add(double a, double b);
+
+#endif // GLOBAL_HPP_
+"""
+
+PACKAGE_INFO_YAML = """
+name: pygeom
+modules:
+- name: geom
+  classes:
+  - name: Box
+"""
+
+
+class TestCastXmlStart(TempDirTestCase):
+
+    def setUp(self) -> None:
+        # Write a source tree that declares everything in the geom namespace
+        super().setUp()
+
+        self.source_root = self.tmp_path("src")
+        self.write_file("src/geom/Box.hpp", BOX_HPP)
+
+    def make_generator(
+        self, wrapper_dirname: str, start_namespaces: Optional[str] = None
+    ) -> CppWrapperGenerator:
+        """
+        Create a generator for the source tree
+
+        Parameters
+        ----------
+        wrapper_dirname : str
+          The name of the wrapper root directory in the temporary directory
+        start_namespaces : Optional[str]
+          The castxml_start_namespaces setting for the package info, if any
+
+        Returns
+        -------
+        CppWrapperGenerator
+          The generator, with its package info and source headers collected
+        """
+        package_info = PACKAGE_INFO_YAML
+        if start_namespaces:
+            package_info = f"castxml_start_namespaces: {start_namespaces}\n" + (
+                package_info
+            )
+
+        package_info_path = self.write_file(
+            f"{wrapper_dirname}_package_info.yaml", package_info
+        )
+
+        generator = CppWrapperGenerator(
+            self.source_root,
+            [os.path.join(self.source_root, "geom")],
+            os.path.join(self.tmp_dir.name, wrapper_dirname),
+            package_info_path=package_info_path,
+        )
+        generator.parse_package_info()
+        generator.collect_source_hpp_files()
+
+        return generator
+
+    def count_parsed_declarations(self, generator: CppWrapperGenerator) -> int:
+        # Source declarations keep the global namespace alive through their parents
+        global_ns = generator.source_ns.declarations[0]
+        while global_ns.parent is not None:
+            global_ns = global_ns.parent
+
+        return len(declarations.make_flatten(global_ns))
+
+    def test_start_namespaces_from_headers(self) -> None:
+        """
+        Restrict the castxml output to the namespaces declared in the source
+        headers, and check that the wrappers match an unrestricted run.
+        """
+        generator = self.make_generator("restricted")
+        self.assertEqual(generator.get_castxml_start_namespaces(), ["geom", "cppwg"])
+        generator.generate_wrapper()
+
+        unrestricted_generator = self.make_generator("unrestricted", "CPPWG_ALL")
+        self.assertIsNone(unrestricted_generator.get_castxml_start_namespaces())
+        unrestricted_generator.generate_wrapper()
+
+        # Unreferenced standard library declarations are left out
+        self.assertLess(
+            self.count_parsed_declarations(generator),
+            self.count_parsed_declarations(unrestricted_generator) / 10,
+        )
+
+        for filename in ["Box.cppwg.hpp", "Box.cppwg.cpp"]:
+            with open(os.path.join(generator.wrapper_root, "geom", filename)) as f:
+                restricted_wrapper = f.read()
+            with open(
+                os.path.join(unrestricted_generator.wrapper_root, "geom", filename)
+            ) as f:
+                unrestricted_wrapper = f.read()
+            self.assertEqual(restricted_wrapper, unrestricted_wrapper)
+
+    def test_start_namespaces_from_package_info(self) -> None:
+        """
+        Restrict the castxml output to the namespaces in the package info.
+        """
+        generator = self.make_generator("explicit", "[geom]")
+        self.assertEqual(generator.get_castxml_start_namespaces(), ["geom", "cppwg"])
+
+        # A single namespace may be given without a list
+        generator = self.make_generator("single", "geom")
+        self.assertEqual(generator.get_castxml_start_namespaces(), ["geom", "cppwg"])
+
+    def test_invalid_start_namespaces(self) -> None:
+        """
+        Fail if the namespaces in the package info are not a string or list.
+        """
+        generator = self.make_generator("invalid", "{geom: 1}")
+
+        with self.assertLogs(level="ERROR"), self.assertRaises(ValueError):
+            generator.get_castxml_start_namespaces()
+
+    def test_global_declarations(self) -> None:
+        """
+        Leave the castxml output unrestricted if a source header declares
+        anything outside a named namespace.
+        """
+        self.write_file("src/Global.hpp", GLOBAL_HPP)
+
+        generator = self.make_generator("global")
+        self.assertIsNone(generator.get_castxml_start_namespaces())
+
+
+if __name__ == "__main__":
+    unittest.main()
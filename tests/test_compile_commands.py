@@ -0,0 +1,157 @@
+import json
+import os
+import unittest
+from typing import Any, Dict, List
+
+from cppwg.parsers.compile_commands import CppCompileCommands
+from tests.temp_dir_test_case import TempDirTestCase
+
+
+class TestCompileCommands(TempDirTestCase):
+
+    def setUp(self) -> None:
+        # Write a source tree with a header included through another header
+        super().setUp()
+
+        self.source_root = self.tmp_path("src")
+        self.build_dir = self.tmp_path("build")
+
+        self.write_file("src/geom/Box.cpp", '#include "Box.hpp"\n#include <vector>\n')
+        self.write_file("src/geom/Box.hpp", "#include <Util.hpp>\n")
+        self.write_file("src/util/Util.hpp", '  #  include "Detail.hpp"\n')
+        self.write_file("src/util/Detail.hpp", "")
+        self.write_file("src/unused/Unused.hpp", "")
+        self.write_file("src/util/Util.cpp", '#include "Missing.hpp"\n')
+        self.write_file("external/Lib.cpp", "")
+
+        self.compile_commands_path = os.path.join(
+            self.build_dir, "compile_commands.json"
+        )
+
+    def write_compile_commands(self, entries: List[Dict[str, Any]]) -> None:
+        self.write_file(self.compile_commands_path, json.dumps(entries))
+
+    def parse(self) -> CppCompileCommands:
+        compile_commands = CppCompileCommands(
+            self.compile_commands_path, self.source_root
+        )
+        compile_commands.parse()
+        return compile_commands
+
+    def test_parse(self) -> None:
+        """
+        Collect the include paths, definitions and standard from the commands
+        for the translation units in the source tree.
+        """
+        self.write_compile_commands(
+            [
+                {
+                    "directory": self.build_dir,
+                    "command": "c++ -std=c++17 -I../src/geom -isystem /opt/include "
+                    "-DNDEBUG -D USE_MPI=1 -c ../src/geom/Box.cpp",
+                    "file": "../src/geom/Box.cpp",
+                },
+                {
+                    "directory": self.build_dir,
+                    "arguments": [
+                        "c++",
+                        "--std=c++14",
+                        "-I",
+                        "../src/util",
+                        "--include-directory=../src/geom",
+                        "-DNDEBUG=0",
+                        "--define-macro=VERBOSE",
+                        "-c",
+                        os.path.join(self.source_root, "util", "Util.cpp"),
+                    ],
+                    "file": os.path.join(self.source_root, "util", "Util.cpp"),
+                },
+                {
+                    "directory": self.build_dir,
+                    "command": "c++ -I/external/include -DEXTERNAL "
+                    "-c ../external/Lib.cpp",
+                    "file": "../external/Lib.cpp",
+                },
+            ]
+        )
+
+        with self.assertLogs(level="WARNING"):
+            compile_commands = self.parse()
+
+        self.assertEqual(
+            compile_commands.source_files,
+            [
+                os.path.join(self.source_root, "geom", "Box.cpp"),
+                os.path.join(self.source_root, "util", "Util.cpp"),
+            ],
+        )
+        self.assertEqual(
+            compile_commands.include_paths,
+            [
+                os.path.join(self.source_root, "geom"),
+                "/opt/include",
+                os.path.join(self.source_root, "util"),
+            ],
+        )
+        self.assertEqual(compile_commands.defines, ["NDEBUG", "USE_MPI=1", "VERBOSE"])
+        self.assertEqual(compile_commands.std, "c++17")
+
+    def test_find_reachable_headers(self) -> None:
+        """
+        Follow the include directives from the translation units through the
+        headers in the source tree.
+        """
+        self.write_compile_commands(
+            [
+                {
+                    "directory": self.build_dir,
+                    "command": "c++ -I../src/geom -I../src/util "
+                    "-c ../src/geom/Box.cpp",
+                    "file": "../src/geom/Box.cpp",
+                },
+                {
+                    "directory": self.build_dir,
+                    "command": "c++ -I../src/util -c ../src/util/Util.cpp",
+                    "file": "../src/util/Util.cpp",
+                },
+            ]
+        )
+
+        self.assertEqual(
+            self.parse().find_reachable_headers(),
+            {
+                os.path.join(self.source_root, "geom", "Box.hpp"),
+                os.path.join(self.source_root, "util", "Util.hpp"),
+                os.path.join(self.source_root, "util", "Detail.hpp"),
+            },
+        )
+
+    def test_no_source_files(self) -> None:
+        """
+        Fail if no translation units in the source tree are found.
+        """
+        self.write_compile_commands(
+            [
+                {
+                    "directory": self.build_dir,
+                    "command": "c++ -c ../external/Lib.cpp",
+                    "file": "../external/Lib.cpp",
+                }
+            ]
+        )
+
+        with self.assertLogs(level="ERROR"), self.assertRaises(ValueError):
+            self.parse()
+
+    def test_invalid_json(self) -> None:
+        """
+        Fail if the compilation database can't be read.
+        """
+        self.write_file(self.compile_commands_path, "[{")
+
+        with self.assertLogs(level="ERROR"), self.assertRaises(ValueError):
+            self.parse()
+
+
+if __name__ == "__main__":
+    unittest.main()
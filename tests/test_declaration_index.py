@@ -0,0 +1,78 @@
+import unittest
+
+from pygccxml.declarations.class_declaration import class_t
+from pygccxml.declarations.free_calldef import free_function_t
+from pygccxml.declarations.namespace import namespace_t
+from pygccxml.declarations.runtime_errors import declaration_not_found_t
+
+from cppwg.parsers.declaration_index import CppDeclarationIndex
+
+
+class TestDeclarationIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # Declare ::ns::Foo<2, 2>, ::ns::Foo<3, 3>, ::ns::Bar and ::ns::foo
+        global_ns = namespace_t("::")
+        source_ns = namespace_t("ns")
+        global_ns.adopt_declaration(source_ns)
+
+        for decl in [
+            class_t("Foo<2, 2>"),
+            class_t("Foo<3, 3>"),
+            class_t("Bar"),
+            free_function_t("foo"),
+            free_function_t("foo"),
+        ]:
+            source_ns.adopt_declaration(decl)
+
+        self.source_ns = source_ns
+        self.index = CppDeclarationIndex(source_ns)
+
+    def test_classes(self) -> None:
+        """
+        Look up classes by name and full name, with or without whitespace in
+        template arguments.
+        """
+        foo_2_2 = self.source_ns.class_("Foo<2, 2>")
+
+        for name in [
+            "Foo<2, 2>",
+            "Foo<2,2>",
+            "Foo< 2, 2 >",
+            "ns::Foo<2,2>",
+            "::ns::Foo<2, 2>",
+        ]:
+            self.assertEqual(self.index.classes(name), [foo_2_2], name)
+            self.assertIs(self.index.class_(name), foo_2_2, name)
+
+        self.assertEqual(self.index.classes("Foo<4,4>"), [])
+        self.assertEqual(self.index.classes("Baz"), [])
+
+    def test_class_lookups_match_queries(self) -> None:
+        """
+        Return the same classes as pygccxml queries.
+        """
+        for name in ["Foo<3,3>", "Bar", "::ns::Bar"]:
+            self.assertIs(self.index.class_(name), self.source_ns.class_(name), name)
+
+    def test_class_not_found(self) -> None:
+        """
+        Report missing classes as pygccxml does.
+        """
+        with self.assertRaises(declaration_not_found_t):
+            self.index.class_("Baz")
+
+    def test_free_functions(self) -> None:
+        """
+        Look up overloaded free functions by name and full name.
+        """
+        overloads = self.source_ns.free_functions("foo")
+        self.assertEqual(len(overloads), 2)
+
+        self.assertEqual(self.index.free_functions("foo"), list(overloads))
+        self.assertEqual(self.index.free_functions("::ns::foo"), list(overloads))
+        self.assertEqual(self.index.free_functions("bar"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
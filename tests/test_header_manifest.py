@@ -0,0 +1,54 @@
+import unittest
+
+from cppwg.parsers.header_manifest import CppHeaderManifest
+from tests.temp_dir_test_case import TempDirTestCase
+
+
+class TestHeaderManifest(TempDirTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.manifest = CppHeaderManifest(self.tmp_dir.name)
+        self.key = CppHeaderManifest.key("/src", ["*.hpp"], [], ["/src/wrapper"])
+        self.listings = {
+            "/src": (1000, ["/src/Foo.hpp"], ["/src/geom"]),
+            "/src/geom": (2000, ["/src/geom/Box.hpp"], []),
+        }
+
+    def test_store_and_load(self) -> None:
+        """
+        Load the directory listings stored for the same search.
+        """
+        self.assertEqual(self.manifest.load(self.key), {})
+
+        self.manifest.store(self.key, self.listings)
+        self.assertEqual(self.manifest.load(self.key), self.listings)
+
+    def test_search_options_changed(self) -> None:
+        """
+        Ignore listings stored for a search with different options.
+        """
+        self.manifest.store(self.key, self.listings)
+
+        for key in [
+            CppHeaderManifest.key("/other", ["*.hpp"], [], ["/src/wrapper"]),
+            CppHeaderManifest.key("/src", ["*.h"], [], ["/src/wrapper"]),
+            CppHeaderManifest.key("/src", ["*.hpp"], ["*test*"], ["/src/wrapper"]),
+            CppHeaderManifest.key("/src", ["*.hpp"], [], []),
+        ]:
+            self.assertNotEqual(key, self.key)
+            self.assertEqual(self.manifest.load(key), {})
+
+    def test_corrupt_manifest(self) -> None:
+        """
+        Ignore a manifest that can't be unpickled.
+        """
+        self.write_file(self.manifest.manifest_path, "corrupt")
+
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(self.manifest.load(self.key), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
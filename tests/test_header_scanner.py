@@ -0,0 +1,97 @@
+import unittest
+
+from cppwg.parsers.header_scanner import CppHeaderScanner
+from tests.temp_dir_test_case import TempDirTestCase
+
+
+class TestHeaderScanner(TempDirTestCase):
+
+    def scan(self, content: str) -> CppHeaderScanner:
+        """
+        Scan a header with the given content
+
+        Parameters
+        ----------
+        content : str
+          The content of the header
+
+        Returns
+        -------
+        CppHeaderScanner
+          The scanner, after scanning the header
+        """
+        scanner = CppHeaderScanner(self.write_file("Header.hpp", content))
+        scanner.scan()
+
+        return scanner
+
+    def test_namespaces(self) -> None:
+        """
+        Find the top-level namespaces and the classes and functions in them.
+        """
+        scanner = self.scan("""
+            #include <vector>
+            #define SCALE 2 // namespace global {
+
+            using namespace std;
+
+            namespace a::b
+            {
+            template <class T>
+            class EXPORT Foo : public Bar<T>
+            {
+                void Method(int x);
+            };
+
+            class Forward;
+
+            std::vector<double> Sides(const Foo<int>& foo = Foo<int>(1));
+
+            void Foo::Method(int x) {}
+            } // namespace a::b
+
+            namespace c
+            {
+            /* class Commented {}; */
+            inline namespace v1 { struct Bar final {}; }
+            }
+            """)
+
+        self.assertEqual(scanner.top_level_namespaces, {"a", "c"})
+        self.assertFalse(scanner.has_global_decls)
+        self.assertEqual(scanner.class_names, {"Foo", "Bar"})
+        self.assertEqual(scanner.free_function_names, {"Sides"})
+        self.assertFalse(scanner.has_macro_decls)
+        self.assertTrue(scanner.has_wrappable_decls)
+
+    def test_global_decls(self) -> None:
+        """
+        Report declarations outside a named namespace.
+        """
+        self.assertTrue(self.scan("double Add(double a, double b);").has_global_decls)
+        self.assertTrue(self.scan("namespace { int x; }").has_global_decls)
+        self.assertTrue(self.scan("DECLARE_GLOBALS()").has_global_decls)
+        self.assertFalse(self.scan("namespace a { int x; }").has_global_decls)
+
+    def test_macro_decls(self) -> None:
+        """
+        Report macro invocations at namespace scope, which may declare classes.
+        """
+        scanner = self.scan("namespace a { DECLARE_CLASS(Foo) }")
+
+        self.assertTrue(scanner.has_macro_decls)
+        self.assertFalse(scanner.class_names)
+        self.assertTrue(scanner.has_wrappable_decls)
+
+    def test_no_wrappable_decls(self) -> None:
+        """
+        Report headers that only declare variables or forward declarations.
+        """
+        scanner = self.scan("namespace a { class Foo; const int N = 2; }")
+
+        self.assertEqual(scanner.top_level_namespaces, {"a"})
+        self.assertFalse(scanner.has_wrappable_decls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import os
+import shutil
+import unittest
+from glob import glob
+from typing import Any, Dict, Optional, Tuple
+
+from pygccxml import declarations
+from pygccxml.declarations.namespace import namespace_t
+
+from cppwg.parsers.libclang_parser import CppLibclangParser, cindex
+from cppwg.parsers.source_parser import CppSourceParser
+from tests.temp_dir_test_case import TempDirTestCase
+
+
+def summarize_declarations(source_ns: namespace_t) -> Dict[Tuple[str, str], Any]:
+    """
+    Summarize the parts of the source declarations that the writers use
+
+    Parameters
+    ----------
+    source_ns : namespace_t
+      The namespace containing the source declarations
+
+    Returns
+    -------
+    Dict[Tuple[str, str], Any]
+      A summary of each class, free function and typedef, keyed by kind and
+      full name
+    """
+
+    def arguments(calldef: declarations.calldef_t) -> Tuple:
+        return tuple(
+            (argument.name, argument.decl_type.decl_string, argument.default_value)
+            for argument in calldef.arguments
+        )
+
+    summary: Dict[Tuple[str, str], Any] = {}
+
+    for class_decl in source_ns.classes(allow_empty=True):
+        summary[("class", declarations.full_name(class_decl))] = {
+            "location": class_decl.location.file_name,
+            "is_abstract": class_decl.is_abstract,
+            "bases": sorted(
+                (
+                    declarations.full_name(base.related_class),
+                    base.access_type,
+                    base.is_virtual,
+                )
+                for base in class_decl.bases
+            ),
+            # The writers leave out implicit copy constructors
+            "constructors": sorted(
+                (ctor.access_type, ctor.is_artificial, arguments(ctor))
+                for ctor in class_decl.constructors(allow_empty=True, recursive=False)
+                if not (ctor.is_artificial and declarations.is_copy_constructor(ctor))
+            ),
+            "member_functions": sorted(
+                (
+                    method.access_type,
+                    method.name,
+                    method.virtuality,
+                    method.has_const,
+                    method.has_static,
+                    method.return_type.decl_string,
+                    arguments(method),
+                )
+                for method in class_decl.member_functions(
+                    allow_empty=True, recursive=False
+                )
+            ),
+            "enumerations": sorted(
+                (enum.name, tuple(enum.values))
+                for enum in class_decl.enumerations(allow_empty=True, recursive=False)
+            ),
+        }
+
+    for free_function in source_ns.free_functions(allow_empty=True):
+        summary[("free_function", declarations.full_name(free_function))] = (
+            free_function.location.file_name,
+            free_function.return_type.decl_string,
+            arguments(free_function),
+        )
+
+    for typedef in source_ns.typedefs(allow_empty=True):
+        summary[("typedef", declarations.full_name(typedef))] = (
+            typedef.decl_type.decl_string
+        )
+
+    return summary
+
+
+@unittest.skipIf(cindex is None, "libclang is not installed")
+@unittest.skipIf(shutil.which("castxml") is None, "castxml is not installed")
+class TestLibclang(TempDirTestCase):
+
+    def setUp(self) -> None:
+        # Parse the reference header collection for the shapes example
+        super().setUp()
+
+        self.shapes_src = os.path.abspath("examples/shapes/src")
+        self.header_collection = os.path.abspath(
+            "examples/shapes/wrapper/wrapper_header_collection.hpp"
+        )
+        self.assertTrue(os.path.isfile(self.header_collection))
+
+        self.includes = sorted(glob(self.shapes_src + "/*/"))
+        self.castxml_binary = shutil.which("castxml")
+
+    def make_libclang_parser(
+        self, header_collection: Optional[str] = None, **kwargs
+    ) -> CppLibclangParser:
+        return CppLibclangParser(
+            self.shapes_src,
+            header_collection or self.header_collection,
+            self.castxml_binary,
+            self.includes,
+            "-std=c++17",
+            **kwargs,
+        )
+
+    def test_declarations_match_castxml(self) -> None:
+        """
+        Parse the shapes header collection with CastXML and with libclang and
+        compare the declarations that the writers use.
+        """
+        castxml_ns = CppSourceParser(
+            self.shapes_src,
+            self.header_collection,
+            self.castxml_binary,
+            self.includes,
+            "-std=c++17",
+        ).parse()
+
+        libclang_ns = self.make_libclang_parser().parse()
+
+        castxml_summary = summarize_declarations(castxml_ns)
+        libclang_summary = summarize_declarations(libclang_ns)
+
+        self.assertTrue(castxml_summary)
+        self.assertEqual(sorted(libclang_summary), sorted(castxml_summary))
+        for key, castxml_decl in castxml_summary.items():
+            self.assertEqual(libclang_summary[key], castxml_decl, key)
+
+    def test_reparse(self) -> None:
+        """
+        Reparse the translation unit kept from the previous parse.
+        """
+        libclang_parser = self.make_libclang_parser()
+        summary = summarize_declarations(libclang_parser.parse())
+        translation_unit = libclang_parser.translation_unit
+        self.assertIsNotNone(translation_unit)
+
+        with self.assertLogs(level="INFO") as logs:
+            self.assertEqual(summarize_declarations(libclang_parser.parse()), summary)
+        self.assertIn("INFO:root:Reparsing translation unit.", logs.output)
+        self.assertIs(libclang_parser.translation_unit, translation_unit)
+
+    def test_saved_translation_unit(self) -> None:
+        """
+        Load the saved translation unit when the parse cache has no entry.
+        """
+        # The depfile is written next to the header collection
+        header_collection = shutil.copy(self.header_collection, self.tmp_dir.name)
+
+        cache_dir = self.tmp_path("cache")
+        libclang_parser = self.make_libclang_parser(
+            header_collection, cache_dir=cache_dir
+        )
+        summary = summarize_declarations(libclang_parser.parse())
+        self.assertTrue(os.path.isfile(libclang_parser.ast_path))
+
+        for cache_entry in glob(os.path.join(cache_dir, "*.cppwg_cache")):
+            os.remove(cache_entry)
+
+        libclang_parser = self.make_libclang_parser(
+            header_collection, cache_dir=cache_dir
+        )
+        with self.assertLogs(level="INFO") as logs:
+            self.assertEqual(summarize_declarations(libclang_parser.parse()), summary)
+        self.assertIn(
+            f"INFO:root:Loaded translation unit: {libclang_parser.ast_path}",
+            logs.output,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
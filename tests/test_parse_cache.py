@@ -0,0 +1,168 @@
+import os
+import unittest
+
+from pygccxml.declarations.class_declaration import class_t
+from pygccxml.declarations.location import location_t
+from pygccxml.declarations.namespace import namespace_t
+
+from cppwg.parsers.parse_cache import CppParseCache
+from tests.temp_dir_test_case import TempDirTestCase
+
+
+class TestParseCache(TempDirTestCase):
+
+    def setUp(self) -> None:
+        # Write a header collection and a header it depends on
+        super().setUp()
+
+        self.header_collection = self.write_file(
+            "collection.hpp", '#include "Foo.hpp"\n'
+        )
+        self.dependency = self.write_file("Foo.hpp", "class Foo {};\n")
+
+        self.cache = CppParseCache(self.tmp_path("cache"))
+
+    def store_entry(self, key: str) -> None:
+        self.cache.store(key, [namespace_t("foo")], [self.dependency])
+
+    def test_store_and_load(self) -> None:
+        """
+        Load declarations stored under a key.
+        """
+        self.assertFalse(self.cache.has_entry("a"))
+        self.assertIsNone(self.cache.load("a"))
+
+        self.store_entry("a")
+        self.assertTrue(self.cache.has_entry("a"))
+
+        decls, dependencies = self.cache.load("a")
+        self.assertEqual([decl.name for decl in decls], ["foo"])
+        self.assertEqual(dependencies, [self.dependency])
+
+    def test_stale_dependency(self) -> None:
+        """
+        Reject an entry once a dependency changes or is removed, but not when
+        a dependency is only touched.
+        """
+        self.store_entry("a")
+
+        # Touching the file without changing it keeps the entry valid
+        stat = os.stat(self.dependency)
+        os.utime(self.dependency, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNotNone(self.cache.load("a"))
+
+        self.write_file(self.dependency, "class Foo { int x; };\n")
+        self.assertIsNone(self.cache.load("a"))
+        self.assertTrue(self.cache.has_entry("a"))
+
+        self.store_entry("b")
+        os.remove(self.dependency)
+        self.assertIsNone(self.cache.load("b"))
+
+    def test_reference(self) -> None:
+        """
+        Load the declarations an entry refers to, located in the loading
+        header collection instead of the referenced one.
+        """
+        global_ns = namespace_t("::")
+        instantiation = class_t("Foo<2>")
+        instantiation.location = location_t(self.header_collection, 2)
+        global_ns.adopt_declaration(instantiation)
+
+        self.cache.store("whole", [global_ns], [self.dependency])
+        self.cache.store_reference(
+            "shard", "whole", self.header_collection, [self.dependency]
+        )
+
+        decls, dependencies = self.cache.load("shard", "/wrapper/shard.hpp")
+        self.assertEqual(dependencies, [self.dependency])
+        self.assertEqual(
+            decls[0].class_("Foo<2>").location.file_name, "/wrapper/shard.hpp"
+        )
+
+        # The referenced entry is left as it was
+        decls, _ = self.cache.load("whole")
+        self.assertEqual(
+            decls[0].class_("Foo<2>").location.file_name, self.header_collection
+        )
+
+        # A reference is only valid while the entry it refers to is
+        os.remove(self.cache.entry_path("whole"))
+        self.assertIsNone(self.cache.load("shard", "/wrapper/shard.hpp"))
+
+    def test_corrupt_entry(self) -> None:
+        """
+        Ignore an entry that can't be unpickled.
+        """
+        self.write_file(self.cache.entry_path("a"), "")
+        with self.assertLogs(level="WARNING"):
+            self.assertIsNone(self.cache.load("a"))
+
+    def test_eviction(self) -> None:
+        """
+        Evict the least recently used entries once the cache exceeds its size.
+        """
+        for idx, key in enumerate(["a", "b", "c"]):
+            self.store_entry(key)
+            os.utime(self.cache.entry_path(key), (1000 * (idx + 1),) * 2)
+
+        # Loading an entry marks it as the most recently used
+        self.assertIsNotNone(self.cache.load("a"))
+
+        self.cache.max_size = 2 * os.path.getsize(self.cache.entry_path("a"))
+        self.cache.evict()
+
+        self.assertTrue(self.cache.has_entry("a"))
+        self.assertFalse(self.cache.has_entry("b"))
+        self.assertTrue(self.cache.has_entry("c"))
+
+        # The most recent entry is kept even if it doesn't fit
+        self.cache.max_size = 0
+        self.cache.evict()
+        self.assertEqual(
+            os.listdir(self.cache.cache_dir),
+            [os.path.basename(self.cache.entry_path("a"))],
+        )
+
+    def test_key(self) -> None:
+        """
+        Compute different keys for different inputs and parse modes.
+        """
+        args = (self.header_collection, "-std=c++17", ["/src"], "castxml 0.4")
+        key = CppParseCache.key(*args)
+
+        self.assertEqual(key, CppParseCache.key(*args))
+        self.assertNotEqual(key, CppParseCache.key(*args, castxml_start=["foo"]))
+        self.assertNotEqual(key, CppParseCache.key(*args, stream_xml=True))
+        self.assertNotEqual(key, CppParseCache.key(*args, low_memory=True))
+        self.assertNotEqual(
+            key, CppParseCache.key(self.header_collection, "", ["/src"], "castxml 0.4")
+        )
+
+        # The header collection contents are part of the key
+        self.write_file(self.header_collection, '#include "Bar.hpp"\n')
+        self.assertNotEqual(key, CppParseCache.key(*args))
+
+    def test_key_pch(self) -> None:
+        """
+        Compute different keys with a different or rebuilt precompiled header.
+        """
+        args = (self.header_collection, "-std=c++17", ["/src"], "castxml 0.4")
+
+        pch_path = self.write_file("cppwg.pch", "pch")
+        pch_key = CppParseCache.key(*args, castxml_pch=pch_path)
+
+        self.assertNotEqual(pch_key, CppParseCache.key(*args))
+        self.assertEqual(pch_key, CppParseCache.key(*args, castxml_pch=pch_path))
+
+        other_pch_path = self.write_file("other.pch", "pch")
+        self.assertNotEqual(
+            pch_key, CppParseCache.key(*args, castxml_pch=other_pch_path)
+        )
+
+        os.utime(pch_path, (1000, 1000))
+        self.assertNotEqual(pch_key, CppParseCache.key(*args, castxml_pch=pch_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+import os
+import shutil
+import subprocess
+import unittest
+from typing import List, Optional
+
+from cppwg.parsers.pch_builder import CLANG_VERSION_REGEX, CppPchBuilder
+from cppwg.parsers.source_parser import CppSourceParser
+from tests.temp_dir_test_case import TempDirTestCase
+
+# Reports a clang version and writes an invalid PCH and its depfile, passing
+# preprocessing on to the system compiler
+FAKE_COMPILER_SH = """#!/bin/sh
+if [ "$1" = "--version" ]; then
+    echo "clang version {version}"
+    exit 0
+fi
+case " $* " in
+    # Report the predefined macros to CastXML when it emulates this compiler
+    *" -E "*) exec c++ "$@" ;;
+esac
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -o) pch_path="$2"; shift ;;
+        -MF) depfile_path="$2"; shift ;;
+    esac
+    shift
+done
+echo "not a pch" > "$pch_path"
+echo "$pch_path:" > "$depfile_path"
+"""
+
+
+def get_clang_version(compiler: Optional[str]) -> Optional[str]:
+    """
+    Get the clang version of a compiler or CastXML binary
+
+    Parameters
+    ----------
+    compiler : Optional[str]
+      The path to the compiler or CastXML binary
+
+    Returns
+    -------
+    Optional[str]
+      The clang version e.g. "13.0.0", or None if it isn't clang
+    """
+    if not compiler:
+        return None
+
+    version = subprocess.check_output([compiler, "--version"]).decode("utf-8")
+    match = CLANG_VERSION_REGEX.search(version)
+
+    return match.group(1) if match else None
+
+
+CASTXML_BINARY = shutil.which("castxml")
+CASTXML_CLANG_VERSION = get_clang_version(CASTXML_BINARY)
+
+
+class TestPchBuilder(TempDirTestCase):
+
+    def setUp(self) -> None:
+        # Write a PCH built from one header, with a depfile listing the header
+        super().setUp()
+
+        self.header_path = self.write_file("third_party.hpp", "class ThirdParty {};\n")
+        os.utime(self.header_path, (1000, 1000))
+
+        self.pch_path = self.write_file("cppwg.pch", "")
+        os.utime(self.pch_path, (2000, 2000))
+
+        self.depfile_path = self.pch_path + ".d"
+        self.write_depfile([self.header_path])
+
+        self.builder = CppPchBuilder(
+            ["<vector>", "third_party.hpp"],
+            "clang++",
+            "castxml",
+            [self.tmp_dir.name],
+            "-std=c++17",
+            self.tmp_dir.name,
+            self.tmp_dir.name,
+        )
+
+    def write_depfile(self, dependencies: List[str]) -> None:
+        self.write_file(
+            self.depfile_path, f"{self.pch_path}: \\\n  " + " \\\n  ".join(dependencies)
+        )
+
+    def test_up_to_date(self) -> None:
+        """
+        Reuse a PCH that is newer than the files it includes.
+        """
+        self.assertFalse(self.builder.is_stale(self.pch_path, self.depfile_path))
+
+    def test_missing_pch(self) -> None:
+        """
+        Rebuild a PCH that is missing or has no depfile.
+        """
+        self.assertTrue(
+            self.builder.is_stale(self.pch_path + ".missing", self.depfile_path)
+        )
+        self.assertTrue(
+            self.builder.is_stale(self.pch_path, self.depfile_path + ".missing")
+        )
+
+    def test_newer_dependency(self) -> None:
+        """
+        Rebuild a PCH that is older than a file it includes.
+        """
+        os.utime(self.header_path, (3000, 3000))
+        self.assertTrue(self.builder.is_stale(self.pch_path, self.depfile_path))
+
+    def test_missing_dependency(self) -> None:
+        """
+        Rebuild a PCH that includes a file that no longer exists.
+        """
+        missing_path = self.tmp_path("removed.hpp")
+        self.write_depfile([self.header_path, missing_path])
+
+        self.assertTrue(self.builder.is_stale(self.pch_path, self.depfile_path))
+
+    def test_write_pch_header(self) -> None:
+        """
+        Write a header including the headers to precompile, and leave it
+        untouched when it hasn't changed.
+        """
+        pch_header_path = self.builder.write_pch_header()
+        with open(pch_header_path, "r") as hpp_file:
+            self.assertEqual(
+                hpp_file.read(), '#include <vector>\n#include "third_party.hpp"\n'
+            )
+
+        os.utime(pch_header_path, (1000, 1000))
+        self.builder.write_pch_header()
+        self.assertEqual(os.path.getmtime(pch_header_path), 1000)
+
+
+@unittest.skipIf(CASTXML_BINARY is None, "castxml is not installed")
+class TestPchBuilderCastXml(TempDirTestCase):
+
+    def make_builder(self, pch_compiler: str) -> CppPchBuilder:
+        self.write_file("src/ThirdParty.hpp", "class ThirdParty {};\n")
+
+        return CppPchBuilder(
+            ["<vector>", "ThirdParty.hpp"],
+            pch_compiler,
+            CASTXML_BINARY,
+            [self.tmp_path("src")],
+            "-std=c++17",
+            self.tmp_dir.name,
+            self.tmp_path("pch"),
+        )
+
+    def make_fake_compiler(self, version: str) -> str:
+        compiler_path = self.write_file(
+            "fake-clang++", FAKE_COMPILER_SH.format(version=version)
+        )
+        os.chmod(compiler_path, 0o755)
+
+        return compiler_path
+
+    def test_version_mismatch(self) -> None:
+        """
+        Don't build a PCH with a clang that differs from CastXML's.
+        """
+        builder = self.make_builder(self.make_fake_compiler("1.0.0"))
+
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertIsNone(builder.build())
+
+        self.assertIn("clang 1.0.0", logs.output[0])
+        self.assertFalse(os.path.isdir(self.tmp_path("pch")))
+
+    def test_rejected_pch(self) -> None:
+        """
+        Don't use a PCH that CastXML rejects.
+        """
+        builder = self.make_builder(self.make_fake_compiler(CASTXML_CLANG_VERSION))
+
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertIsNone(builder.build())
+
+        self.assertIn("CastXML rejected the precompiled header", logs.output[0])
+
+    @unittest.skipIf(
+        get_clang_version(shutil.which("clang++")) != CASTXML_CLANG_VERSION,
+        "no clang++ matching the clang version of castxml is installed",
+    )
+    def test_accepted_pch(self) -> None:
+        """
+        Build a PCH that CastXML accepts, and parse a header collection with it
+        without falling back to parsing without it.
+        """
+        builder = self.make_builder(shutil.which("clang++"))
+
+        with self.assertNoLogs(level="WARNING"):
+            pch_path = builder.build()
+        self.assertTrue(os.path.isfile(pch_path))
+        self.assertTrue(os.path.isfile(pch_path + ".accepted"))
+
+        header_collection = self.write_file(
+            "wrapper/wrapper_header_collection.hpp", '#include "ThirdParty.hpp"\n'
+        )
+        source_parser = CppSourceParser(
+            self.tmp_path("src"),
+            header_collection,
+            CASTXML_BINARY,
+            [self.tmp_path("src")],
+            "-std=c++17",
+            castxml_pch=pch_path,
+            pch_compiler=shutil.which("clang++"),
+        )
+
+        with self.assertNoLogs(level="WARNING"):
+            source_ns = source_parser.parse()
+        self.assertEqual(source_ns.class_("ThirdParty").name, "ThirdParty")
+
+
+if __name__ == "__main__":
+    unittest.main()
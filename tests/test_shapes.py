@@ -1,5 +1,8 @@
+import json
 import os
+import shutil
 import subprocess
+import tempfile
 import unittest
 from glob import glob
 from typing import List
@@ -54,56 +57,211 @@ def compare_files(file_path_a: str, file_path_b: str) -> bool:
 
 class TestShapes(unittest.TestCase):
 
-    def test_wrapper_generation(self) -> None:
-        """
-        Generate wrappers and compare with the reference wrappers.
-        """
-
+    def setUp(self) -> None:
         # Set paths to the shapes code, reference and generated wrappers, etc.
-        shapes_root = os.path.abspath("examples/shapes")
-        shapes_src = os.path.join(shapes_root, "src")
+        self.shapes_root = os.path.abspath("examples/shapes")
+        self.shapes_src = os.path.join(self.shapes_root, "src")
+
+        self.wrapper_root_ref = os.path.join(self.shapes_root, "wrapper")
+        self.wrapper_root_gen = os.path.join(self.shapes_root, "gen_wrapper")
+
+        self.assertTrue(os.path.isdir(self.shapes_root))
+        self.assertTrue(os.path.isdir(self.shapes_src))
+        self.assertTrue(os.path.isdir(self.wrapper_root_ref))
+
+        self.generate_script = os.path.abspath("cppwg/__main__.py")
+        self.package_info_path = os.path.join(
+            self.wrapper_root_ref, "package_info.yaml"
+        )
+        self.assertTrue(os.path.isfile(self.package_info_path))
+
+        self.includes = glob(self.shapes_src + "/*/")
 
-        wrapper_root_ref = os.path.join(shapes_root, "wrapper")
-        wrapper_root_gen = os.path.join(shapes_root, "gen_wrapper")
+        # Remove wrappers generated by previous tests
+        shutil.rmtree(self.wrapper_root_gen, ignore_errors=True)
 
-        self.assertTrue(os.path.isdir(shapes_root))
-        self.assertTrue(os.path.isdir(shapes_src))
-        self.assertTrue(os.path.isdir(wrapper_root_ref))
+    def generate_and_compare(
+        self, extra_args: List[str], pass_includes: bool = True
+    ) -> None:
+        """
+        Generate wrappers and compare with the reference wrappers.
 
-        generate_script = os.path.abspath("cppwg/__main__.py")
-        package_info_path = os.path.join(wrapper_root_ref, "package_info.yaml")
-        self.assertTrue(os.path.isfile(package_info_path))
+        Parameters
+        ----------
+        extra_args : List[str]
+            Extra command line arguments to pass to cppwg
+        pass_includes : bool
+            Pass the shapes include paths to cppwg with --includes
+        """
 
-        includes = glob(shapes_src + "/*/")
+        # Remove wrappers from a previous run, keeping any cached state, so
+        # that only wrappers written by this run are compared
+        for dirpath, _, filenames in os.walk(self.wrapper_root_gen):
+            for filename in filenames:
+                if filename.endswith(".cppwg.cpp") or filename.endswith(".cppwg.hpp"):
+                    os.remove(os.path.join(dirpath, filename))
 
         # Generate the wrappers
-        subprocess.call(
+        result = subprocess.run(
             [
                 "python",
-                generate_script,
-                shapes_src,
+                self.generate_script,
+                self.shapes_src,
                 "--wrapper_root",
-                wrapper_root_gen,
+                self.wrapper_root_gen,
                 "--package_info",
-                package_info_path,
-                "--includes",
+                self.package_info_path,
             ]
-            + includes
+            + extra_args
+            + (["--includes"] + self.includes if pass_includes else [])
         )
 
-        self.assertTrue(os.path.isdir(wrapper_root_gen))
+        self.assertEqual(result.returncode, 0)
+        self.assertTrue(os.path.isdir(self.wrapper_root_gen))
 
         # Compare the generated files with reference files
-        for dirpath, _, filenames in os.walk(wrapper_root_ref):
+        for dirpath, _, filenames in os.walk(self.wrapper_root_ref):
             for filename in filenames:
                 if filename.endswith(".cppwg.cpp") or filename.endswith(".cppwg.hpp"):
                     file_ref = os.path.join(dirpath, filename)
-                    file_gen = file_ref.replace(wrapper_root_ref, wrapper_root_gen, 1)
+                    file_gen = file_ref.replace(
+                        self.wrapper_root_ref, self.wrapper_root_gen, 1
+                    )
 
                     self.assertTrue(os.path.isfile(file_ref))
                     self.assertTrue(os.path.isfile(file_gen))
                     self.assertTrue(compare_files(file_gen, file_ref))
 
+    def test_wrapper_generation(self) -> None:
+        """
+        Generate wrappers and compare with the reference wrappers.
+        """
+        self.generate_and_compare([])
+
+    def test_wrapper_generation_cached(self) -> None:
+        """
+        Generate wrappers twice with a parse cache and compare both runs with
+        the reference wrappers.
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # The first run populates the cache, the second run reads from it
+            self.generate_and_compare(["--cache_dir", cache_dir])
+            self.assertTrue(os.listdir(cache_dir))
+
+            shutil.rmtree(self.wrapper_root_gen)
+            self.generate_and_compare(["--cache_dir", cache_dir])
+
+    def test_wrapper_generation_incremental(self) -> None:
+        """
+        Generate wrappers twice incrementally, reusing the declarations from the
+        first run, and compare both runs with the reference wrappers.
+        """
+        self.generate_and_compare(["--incremental"])
+        self.generate_and_compare(["--incremental"])
+
+    def test_wrapper_generation_parallel(self) -> None:
+        """
+        Generate wrappers by parsing per-module header collections in parallel
+        and compare with the reference wrappers.
+        """
+        self.generate_and_compare(["--jobs", "2"])
+
+    def test_wrapper_generation_stream_xml(self) -> None:
+        """
+        Generate wrappers from CastXML output filtered down to the source tree
+        and compare with the reference wrappers.
+        """
+        self.generate_and_compare(["--stream_xml"])
+
+    def test_wrapper_generation_low_memory(self) -> None:
+        """
+        Generate wrappers after releasing declarations that are not referenced
+        from the source tree and compare with the reference wrappers.
+        """
+        self.generate_and_compare(["--low_memory"])
+
+    def test_wrapper_generation_snapshot(self) -> None:
+        """
+        Generate wrappers twice, loading the source declarations from a snapshot
+        on the second run, and compare both runs with the reference wrappers.
+        """
+        self.generate_and_compare(["--snapshot"])
+        self.assertTrue(
+            os.path.isfile(os.path.join(self.wrapper_root_gen, ".cppwg_snapshot"))
+        )
+        self.generate_and_compare(["--snapshot"])
+
+    def test_wrapper_generation_implicit_instantiation(self) -> None:
+        """
+        Generate wrappers with implicitly instantiated template classes in the
+        header collection and compare with the reference wrappers.
+        """
+        self.generate_and_compare(["--template_instantiation", "implicit"])
+
+    def test_wrapper_generation_libclang(self) -> None:
+        """
+        Generate wrappers by parsing with libclang instead of CastXML and
+        compare with the reference wrappers.
+        """
+        self.generate_and_compare(["--parser", "libclang"])
+
+    def test_wrapper_generation_template_signatures(self) -> None:
+        """
+        Generate wrappers with class template signatures read from declarations
+        parsed by libclang and compare with the reference wrappers.
+        """
+        self.generate_and_compare(["--template_signatures", "libclang"])
+
+    def write_compile_commands(self, build_dir: str) -> str:
+        """
+        Write a compilation database for the shapes sources.
+
+        Parameters
+        ----------
+        build_dir : str
+            The directory to write compile_commands.json to
+
+        Returns
+        -------
+        str
+            The path to the compilation database
+        """
+        compile_commands_path = os.path.join(build_dir, "compile_commands.json")
+
+        includes = " ".join(f"-I{include}" for include in self.includes)
+        compile_commands = [
+            {
+                "directory": build_dir,
+                "command": f"c++ -std=c++17 {includes} -c {source_file}",
+                "file": source_file,
+            }
+            for source_file in glob(self.shapes_src + "/*/*.cpp")
+        ]
+        with open(compile_commands_path, "w") as compile_commands_file:
+            json.dump(compile_commands, compile_commands_file)
+
+        return compile_commands_path
+
+    def test_wrapper_generation_compile_commands(self) -> None:
+        """
+        Generate wrappers with the include paths and flags taken from a
+        compilation database and compare with the reference wrappers.
+        """
+        with tempfile.TemporaryDirectory() as build_dir:
+            compile_commands_path = self.write_compile_commands(build_dir)
+            self.generate_and_compare(["--compile_commands", compile_commands_path])
+
+    def test_wrapper_generation_compile_commands_only(self) -> None:
+        """
+        Generate wrappers with the include paths taken only from a compilation
+        database, without --includes, and compare with the reference wrappers.
+        """
+        with tempfile.TemporaryDirectory() as build_dir:
+            compile_commands_path = self.write_compile_commands(build_dir)
+            self.generate_and_compare(
+                ["--compile_commands", compile_commands_path], pass_includes=False
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from pygccxml.declarations.namespace import namespace_t
+
+from cppwg.parsers.snapshot import CppDeclarationSnapshot
+from tests.temp_dir_test_case import TempDirTestCase
+
+
+class TestSnapshot(TempDirTestCase):
+
+    def setUp(self) -> None:
+        # Write a header collection and a header it depends on
+        super().setUp()
+
+        self.header_collection = self.write_file(
+            "collection.hpp", '#include "Foo.hpp"\n'
+        )
+        self.dependency = self.write_file("Foo.hpp", "class Foo {};\n")
+
+        self.snapshot = CppDeclarationSnapshot(self.tmp_dir.name)
+        self.key = CppDeclarationSnapshot.key(
+            [self.header_collection], "-std=c++17", ["/src"], "castxml 0.4"
+        )
+
+    def test_store_and_load(self) -> None:
+        """
+        Load the source namespace from a snapshot with a matching key.
+        """
+        self.assertIsNone(self.snapshot.load(self.key))
+
+        self.snapshot.store(self.key, namespace_t("source"), [self.dependency])
+
+        source_ns = self.snapshot.load(self.key)
+        self.assertEqual(source_ns.name, "source")
+
+        self.assertIsNone(self.snapshot.load("other"))
+
+    def test_stale_dependency(self) -> None:
+        """
+        Reject the snapshot once a dependency changes.
+        """
+        self.snapshot.store(self.key, namespace_t("source"), [self.dependency])
+
+        self.write_file(self.dependency, "class Foo { int x; };\n")
+        self.assertIsNone(self.snapshot.load(self.key))
+
+    def test_corrupt_snapshot(self) -> None:
+        """
+        Ignore a snapshot that can't be unpickled.
+        """
+        self.write_file(self.snapshot.snapshot_path, "corrupt")
+        with self.assertLogs(level="WARNING"):
+            self.assertIsNone(self.snapshot.load(self.key))
+
+    def test_key(self) -> None:
+        """
+        Compute different keys for different header collections and modes.
+        """
+        args = ([self.header_collection], "-std=c++17", ["/src"], "castxml 0.4")
+
+        self.assertEqual(self.key, CppDeclarationSnapshot.key(*args))
+        self.assertNotEqual(
+            self.key, CppDeclarationSnapshot.key(*args, castxml_start=["foo"])
+        )
+        self.assertNotEqual(
+            self.key, CppDeclarationSnapshot.key(*args, stream_xml=True)
+        )
+        self.assertNotEqual(
+            self.key, CppDeclarationSnapshot.key(*args, low_memory=True)
+        )
+        self.assertNotEqual(
+            self.key,
+            CppDeclarationSnapshot.key(
+                [self.header_collection, self.dependency],
+                "-std=c++17",
+                ["/src"],
+                "castxml 0.4",
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
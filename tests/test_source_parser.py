@@ -0,0 +1,104 @@
+import unittest
+from typing import List
+
+from pygccxml.declarations import make_flatten
+from pygccxml.declarations.calldef_members import member_function_t
+from pygccxml.declarations.class_declaration import class_t
+from pygccxml.declarations.free_calldef import free_function_t
+from pygccxml.declarations.namespace import namespace_t
+
+from cppwg.parsers.source_parser import CppSourceParser, merge_source_namespaces
+from tests.temp_dir_test_case import TempDirTestCase
+
+
+def make_source_ns(method_names: List[str]) -> namespace_t:
+    """
+    Make a source namespace as parsed from one header collection
+
+    Parameters
+    ----------
+    method_names : List[str]
+      The names of the methods of the class Foo
+
+    Returns
+    -------
+    namespace_t
+      The source namespace, holding ::Foo, its nested class and methods, and
+      the free function ::foo
+    """
+    global_ns = namespace_t("::")
+
+    foo_class = class_t("Foo")
+    global_ns.adopt_declaration(foo_class)
+
+    foo_class.adopt_declaration(class_t("Nested"), "public")
+    for method_name in method_names:
+        foo_class.adopt_declaration(member_function_t(name=method_name), "public")
+
+    global_ns.adopt_declaration(free_function_t("foo"))
+
+    return namespace_t("source", declarations=make_flatten(global_ns.declarations))
+
+
+class TestSourceParser(TempDirTestCase):
+
+    def test_merge_source_namespaces(self) -> None:
+        """
+        Merge duplicate classes together with their members, keeping the class
+        with the most members.
+        """
+        small_ns = make_source_ns(["bar"])
+        large_ns = make_source_ns(["bar", "baz"])
+
+        merged_ns = merge_source_namespaces([small_ns, large_ns, small_ns])
+
+        foo_class = merged_ns.class_("Foo")
+        self.assertIs(foo_class, large_ns.class_("Foo"))
+        self.assertEqual(len(merged_ns.free_functions("foo")), 1)
+        self.assertEqual(
+            sorted(
+                decl.name
+                for decl in merged_ns.declarations
+                if isinstance(decl, member_function_t)
+            ),
+            ["bar", "baz"],
+        )
+
+        # Every merged member belongs to a merged class
+        merged_ids = {id(decl) for decl in merged_ns.declarations}
+        for decl in merged_ns.declarations:
+            if isinstance(decl.parent, class_t):
+                self.assertIn(id(decl.parent), merged_ids)
+
+        self.assertEqual(len(merged_ns.declarations), 5)
+
+    def test_cached_dependencies(self) -> None:
+        """
+        Take the dependencies from the cache entry that was loaded, not from a
+        depfile left by another parse.
+        """
+        header_collection = self.write_file(
+            "wrapper/collection.hpp", '#include "Foo.hpp"\n'
+        )
+        dependency = self.write_file("src/Foo.hpp", "class Foo {};\n")
+
+        source_parser = CppSourceParser(
+            self.tmp_path("src"),
+            header_collection,
+            "castxml",
+            [self.tmp_path("src")],
+            cache_dir=self.tmp_path("cache"),
+        )
+        source_parser.cache.store(
+            source_parser.get_cache_key(),
+            [namespace_t("::")],
+            [header_collection, dependency],
+        )
+        self.write_file(source_parser.depfile, "collection.o: /other/Bar.hpp\n")
+
+        source_parser.parse()
+        self.assertEqual(source_parser.dependencies, [dependency, header_collection])
+
+
+if __name__ == "__main__":
+    unittest.main()
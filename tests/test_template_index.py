@@ -0,0 +1,99 @@
+import unittest
+
+from cppwg.parsers.template_index import CppTemplateIndex
+from tests.temp_dir_test_case import TempDirTestCase
+
+FOO_HPP = """
+#include <memory>
+
+// template <class Commented> class Foo {};
+
+template <unsigned ELEMENT_DIM,
+          unsigned SPACE_DIM = ELEMENT_DIM>
+class Foo : public Base<SPACE_DIM>
+{
+    template <typename T> void Method(T t);
+};
+
+template <typename T, typename A = std::allocator<T>>
+class Bar final
+{
+};
+
+template <unsigned N, bool B = (N > 1)>
+class Baz
+{
+};
+
+template <unsigned DIM>
+class Forward;
+
+template <unsigned DIM>
+void Function();
+
+template <>
+class Foo<2, 2>
+{
+};
+"""
+
+
+class TestTemplateIndex(TempDirTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.hpp_path = self.write_file("Foo.hpp", FOO_HPP)
+
+    def test_scan_file(self) -> None:
+        """
+        Find the template class definitions, including multi-line and nested
+        parameter lists, but not declarations, specializations or functions.
+        """
+        self.assertEqual(
+            CppTemplateIndex.scan_file(self.hpp_path),
+            {
+                "Foo": ["<unsignedELEMENT_DIM,unsignedSPACE_DIM=ELEMENT_DIM>"],
+                "Bar": ["<typenameT,typenameA=std::allocator<T>>"],
+                "Baz": ["<unsignedN,boolB=(N>1)>"],
+            },
+        )
+
+    def test_build(self) -> None:
+        """
+        Index files in parallel, skipping missing files.
+        """
+        index = CppTemplateIndex()
+        index.build([self.hpp_path, self.tmp_path("Missing.hpp")])
+
+        self.assertEqual(list(index.signatures), [self.hpp_path])
+        self.assertEqual(
+            index.get_signatures(self.hpp_path, "Baz"), ["<unsignedN,boolB=(N>1)>"]
+        )
+        self.assertEqual(index.get_signatures(self.hpp_path, "Forward"), [])
+
+    def test_find_substitution(self) -> None:
+        """
+        Find the template substitution matching a class definition.
+        """
+        index = CppTemplateIndex()
+
+        dim_substitution = {"signature": "<unsigned DIM>", "replacement": [[2], [3]]}
+        foo_substitution = {
+            "signature": "<unsigned ELEMENT_DIM, unsigned SPACE_DIM=ELEMENT_DIM>",
+            "replacement": [[2, 2], [3, 3]],
+        }
+
+        self.assertIs(
+            index.find_substitution(
+                self.hpp_path, "Foo", [dim_substitution, foo_substitution]
+            ),
+            foo_substitution,
+        )
+        self.assertIsNone(
+            index.find_substitution(self.hpp_path, "Bar", [dim_substitution])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+
+from cppwg.utils.type_matcher import CppTypeMatcher
+
+
+class TestTypeMatcher(unittest.TestCase):
+
+    def test_exact(self) -> None:
+        """
+        Match type names against the whole type, ignoring whitespace.
+        """
+        matcher = CppTypeMatcher(["unsigned int", "::std::vector<double> const &"])
+
+        self.assertTrue(matcher.matches("unsignedint"))
+        self.assertTrue(matcher.matches("::std::vector<double>const&"))
+        self.assertFalse(matcher.matches("unsignedint*"))
+        self.assertFalse(matcher.matches("::std::vector<double>"))
+        self.assertIsNone(matcher.pattern_regex)
+
+    def test_substring(self) -> None:
+        """
+        Match type names against any part of the type for substring matchers.
+        """
+        matcher = CppTypeMatcher(["std::vector<double>", "Foo*"], substring=True)
+
+        self.assertTrue(matcher.matches("::std::vector<double>const&"))
+        self.assertTrue(matcher.matches("Foo*const"))
+        self.assertFalse(matcher.matches("Foo&"))
+        self.assertFalse(matcher.matches("::std::vector<int>"))
+
+    def test_glob(self) -> None:
+        """
+        Match glob patterns against the whole type.
+        """
+        matcher = CppTypeMatcher(["glob:::std::vector<*>", "glob:Foo<?>"])
+
+        self.assertTrue(matcher.matches("::std::vector<double>"))
+        self.assertTrue(matcher.matches("::std::vector<unsignedint>"))
+        self.assertTrue(matcher.matches("Foo<2>"))
+        self.assertFalse(matcher.matches("Foo<22>"))
+        self.assertFalse(matcher.matches("Bar::std::vector<double>"))
+        self.assertFalse(matcher.exact_types)
+
+    def test_regex(self) -> None:
+        """
+        Match regex patterns anywhere in the type unless anchored.
+        """
+        matcher = CppTypeMatcher([r"regex:Foo<\d+>", r"regex:^Bar$"])
+
+        self.assertTrue(matcher.matches("::ns::Foo<23>const&"))
+        self.assertTrue(matcher.matches("Bar"))
+        self.assertFalse(matcher.matches("Foo<T>"))
+        self.assertFalse(matcher.matches("Bar*"))
+
+    def test_regex_backreference(self) -> None:
+        """
+        Match backreferences against the groups of their own regex pattern.
+        """
+        matcher = CppTypeMatcher([r"regex:^(\w+)\*$", r"regex:^(\w+)<\1>$"])
+
+        self.assertTrue(matcher.matches("Foo<Foo>"))
+        self.assertTrue(matcher.matches("Bar*"))
+        self.assertFalse(matcher.matches("Foo<Bar>"))
+
+    def test_regex_inline_flags(self) -> None:
+        """
+        Apply inline flags to their own regex pattern only.
+        """
+        matcher = CppTypeMatcher(["regex:^Foo$", "regex:(?i)mesh"])
+
+        self.assertTrue(matcher.matches("TetrahedralMESH"))
+        self.assertTrue(matcher.matches("Foo"))
+        self.assertFalse(matcher.matches("FOO"))
+
+    def test_mixed(self) -> None:
+        """
+        Match any of a mix of exact, glob and regex patterns.
+        """
+        matcher = CppTypeMatcher(["double*", "glob:*Mesh*", "regex:^PETSc"])
+
+        self.assertTrue(matcher.matches("double*"))
+        self.assertTrue(matcher.matches("::TetrahedralMesh<2,2>"))
+        self.assertTrue(matcher.matches("PETScVec"))
+        self.assertFalse(matcher.matches("double"))
+        self.assertFalse(matcher.matches("Vec"))
+
+    def test_empty(self) -> None:
+        """
+        Match nothing without patterns.
+        """
+        matcher = CppTypeMatcher([])
+
+        self.assertFalse(matcher)
+        self.assertFalse(matcher.matches("double"))
+        self.assertTrue(CppTypeMatcher(["double"]))
+
+    def test_invalid_regex(self) -> None:
+        """
+        Fail on an invalid regex pattern.
+        """
+        with self.assertLogs(level="ERROR"), self.assertRaises(ValueError):
+            CppTypeMatcher(["regex:Foo<("])
+
+
+if __name__ == "__main__":
+    unittest.main()